@@ -8,8 +8,12 @@ Created: 11 December 2025
 """
 
 #importing packages
+import inspect
+import math
 import pandas as pd 
-from src.analytics import SalesAnalytics
+from src.analytics import HIGH_RISK_ORDERS, SalesAnalytics
+from src.pagination import PAGE_SIZE, csv_file
+from src.downsample import plot_data, render_mode
 import plotly.express as px
 import streamlit as st
 
@@ -17,13 +21,117 @@ import streamlit as st
 st.set_page_config(layout="wide")
 st.title("E-COMMERCE SALES DATA ANALYSIS")
 st.sidebar.title("Types of Analysis That Can Be Performed On The Data")
+#Results kept for every session of this process: dropped after RESULT_TTL seconds
+#or beyond RESULT_MAX_ENTRIES (least recently used first)
+RESULT_TTL=3600
+RESULT_MAX_ENTRIES=256
+
+@st.cache_resource
+def load_analytics():
+    """One SalesAnalytics (and connection pool) per process, not one per rerun.
+    Compact dtypes: smaller frames to send to the browser."""
+    return SalesAnalytics().compact()
+
+@st.cache_data(ttl=RESULT_TTL, max_entries=RESULT_MAX_ENTRIES, show_spinner="Running analysis...")
+def cached_result(_analytics, name, args, kwargs, context, version):
+    """Result of analytics.<name>(*args, **kwargs); the key is everything but _analytics
+    (the filters and modes in context, the data version in version)."""
+    return getattr(_analytics, name)(*args, **dict(kwargs))
+
+def run(func, *args, **kwargs):
+    """Call an analysis method through the cache shared by reruns and sessions."""
+    owner = func.__self__
+    return cached_result(owner, func.__name__, args, tuple(sorted(kwargs.items())),
+                         owner._cache_context(), owner._data_version())
+
+#Rows per page of the large result tables (the only rows sent to the browser)
+VIEW_PAGE_ROWS=500
+
+@st.cache_data(ttl=RESULT_TTL, max_entries=RESULT_MAX_ENTRIES, show_spinner=False)
+def cached_page(_analytics, name, kwargs, context, version):
+    """First page of analytics.<name>(**kwargs), a *_pages method (None past the last row)."""
+    return next(getattr(_analytics, name)(**dict(kwargs)), None)
+
+def page(pages, **kwargs):
+    """One page of a *_pages method through the cache shared by reruns and sessions."""
+    owner = pages.__self__
+    return cached_page(owner, pages.__name__, tuple(sorted(kwargs.items())),
+                       owner._cache_context(), owner._data_version())
+
+def shown(label, choice) -> bool:
+    """True from a click on the sidebar button until another analysis is picked,
+    so the table's own widgets (pages, sorting, search) can rerun the script."""
+    if st.sidebar.button(label):
+        st.session_state['shown'] = choice
+    return st.session_state.get('shown') == choice
+
+def result_table(key, pages, count, **args):
+    """
+    Paginated table of a large result: only the page on screen is read,
+    sorted and searched on the server (in SQL for row-level results),
+    the row count comes from count() and the CSV download is written page by page.
+    pages / count: SalesAnalytics *_pages / *_count methods, args: their fixed arguments
+    """
+    columns = list(getattr(page(pages, page_size=1, **args), 'columns', []))
+    search_col, sort_col, order_col = st.columns([2, 2, 1])
+    search = search_col.text_input("Search", key=f"{key}_search") or None
+    sort = sort_col.selectbox("Sort by", ["(default)"] + columns, key=f"{key}_sort")
+    descending = order_col.checkbox("Descending", key=f"{key}_descending")
+    view = dict(args, sort=None if sort == "(default)" else sort, ascending=not descending, search=search)
+    #cursor of every page read so far (keyset pagination), restarted when the view changes
+    state = st.session_state.get(key)
+    if state is None or state['view'] != view:
+        state = st.session_state[key] = {'view': view, 'cursors': [None]}
+    cursors = state['cursors']
+
+    df = page(pages, page_size=VIEW_PAGE_ROWS, after=cursors[-1], **view)
+    df = df if df is not None else pd.DataFrame(columns=columns)
+    rows, exact = run(count, **args, search=search)
+    st.plotly_chart(auto_plot(df), width='stretch')
+    st.dataframe(df, hide_index=True, height=350)
+
+    last = df.attrs.get('after') if len(df) == VIEW_PAGE_ROWS else None
+    previous_col, next_col, info_col, download_col = st.columns([1, 1, 3, 2])
+    previous_col.button("Previous", key=f"{key}_previous", disabled=len(cursors) == 1, on_click=cursors.pop)
+    next_col.button("Next", key=f"{key}_next", disabled=last is None, on_click=cursors.append, args=(last,))
+    info_col.caption(f"Page {len(cursors):,} of {'' if exact else '~'}{max(math.ceil(rows / VIEW_PAGE_ROWS), 1):,}"
+                     f" ({'' if exact else '~'}{rows:,} rows)")
+    #built when clicked, PAGE_SIZE rows in memory at a time
+    download_col.download_button("Download CSV", data=lambda: csv_file(pages(page_size=PAGE_SIZE, **view)),
+                                 file_name=f"{key}.csv", mime="text/csv", key=f"{key}_download", on_click="ignore")
+
 #Calling SalesAnalytics class
-analytics=SalesAnalytics()
-#Descriptive analysis Functions
-Total_orders=analytics.Count_Total_Orders()
+analytics=load_analytics()
+st.sidebar.caption(f"Data as of {run(analytics.data_as_of)} UTC")
+#Filters pushed into every query below (nothing selected = all rows)
+with st.sidebar.expander("Filters"):
+    chosen={name: st.multiselect(name.replace('_', ' ').title(), values)
+            for name, values in run(analytics.filter_options).items()}
+analytics=analytics.filter(**chosen)
+#Estimates from the sample / heavy-hitter sketches kept at ingestion (csv_to_database --approximate)
+if st.sidebar.checkbox("Approximate answers (faster)"):
+    analytics=analytics.approximate()
+#Charts plot every row instead of the top bars / downsampled points
+st.sidebar.checkbox("Full-fidelity charts (slower)", key='full_charts')
+
+def needs_parameter(func) -> bool:
+    """True if func has a required argument (e.g. limit) besides self."""
+    return any(p.default is inspect.Parameter.empty
+               for p in inspect.signature(func).parameters.values())
+
+def date_range_args(func) -> dict:
+    """Sidebar date range for functions that accept start_date/end_date."""
+    if 'start_date' not in inspect.signature(func).parameters:
+        return {}
+    if not st.sidebar.checkbox("Filter by order date"):
+        return {}
+    start_date = st.sidebar.date_input("From", value=None)
+    end_date = st.sidebar.date_input("To", value=None)
+    return {'start_date': start_date, 'end_date': end_date}
 
 def auto_plot(df: pd.DataFrame):
-    """Automatically generates a Plotly figure from any DataFrame."""
+    """Automatically generates a Plotly figure from any DataFrame.
+    At most MAX_BARS bars / MAX_POINTS points unless full fidelity is on (see downsample.py)."""
     # Identify numeric and categorical columns
     numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
     categorical_cols = df.select_dtypes(exclude=['number']).columns.tolist()
@@ -33,15 +141,25 @@ def auto_plot(df: pd.DataFrame):
         return fig
     # Choose y axis (first numeric column)
     y = numeric_cols[0]
-    # Case 2: No categorical column → use index as x
-    if len(categorical_cols) == 0:
-        x = df.index
-        fig = px.line(df, x=x, y=y, title=f"{y} over index")
+    # Choose x axis (first non-numeric column, the index if there is none)
+    x = categorical_cols[0] if categorical_cols else None
+    data, chart, x, note = plot_data(df, x, y, full=st.session_state.get('full_charts', False))
+    # Case 2: Time series or no categorical column → line (LTTB-downsampled, WebGL when large)
+    if chart == 'line':
+        title = f"{y} over {x}" + (f" ({note})" if note else "")
+        fig = px.line(data, x=x, y=y, title=title, render_mode=render_mode(len(data)))
         return fig
-    # Choose x axis (first non-numeric column)
-    x = categorical_cols[0]
+    title = f"{y} by {x}"
+    # Approximate answers: their confidence bounds as error bars
+    bounds = {}
+    if f"{y}_low" in data.columns and f"{y}_high" in data.columns:
+        bounds = {'error_y': data[f"{y}_high"] - data[y], 'error_y_minus': data[y] - data[f"{y}_low"]}
+        info = df.attrs.get('approximate', {})
+        title += f" (approximate, {info.get('confidence', 0):.0%} confidence)"
+    if note:
+        title += f" ({note})"
     # Plot auto figure
-    fig = px.bar(df, x=x, y=y, title=f"{y} by {x}")
+    fig = px.bar(data, x=x, y=y, title=title, **bounds)
     return fig
 
 
@@ -72,19 +190,20 @@ elif Type_analysis =='Descriptive Analysis':
     choice = st.sidebar.selectbox("Choose analysis", analysis_functions.keys())
     func = analysis_functions[choice]
     if func:
-        if func.__code__.co_argcount > 1:   
+        if needs_parameter(func):
             param = st.sidebar.number_input("Enter parameter value:", value=5)
             if st.sidebar.button("Show"):
 
-                df = func(param)
+                df = run(func, param)
                 fig = auto_plot(df)
                 st.plotly_chart(fig,width='stretch')
 
                 st.data_editor(df,hide_index=True,height=350)
         else:                              
+            date_args = date_range_args(func)
             if st.sidebar.button("Show"):
 
-                df = func()
+                df = run(func, **date_args)
                 fig = auto_plot(df)
                 st.plotly_chart(fig,width='stretch')
 
@@ -97,9 +216,14 @@ elif Type_analysis =='Predictive Analysis':
     analysis_functions = {
         "Unselected":None,
         "RFM Signals":analytics.RFM_signals,
+        "RFM Scores & Segments":analytics.RFM_scores,
         "Seasonal Demands": analytics.Seasonal_demands,
-        "Products Performance Trends":analytics.Product_performance,
+        "Product Monthly Performance":analytics.Product_performance,
+        "Products Performance Trends":analytics.Product_trends,
+        "Rising Products":analytics.Rising_products,
+        "Falling Products":analytics.Falling_products,
         "Monthly Sales For Forecasting":analytics.Monthly_sales_forecasting,
+        "Forecast Accuracy (Backtest)":analytics.Forecast_accuracy,
         "High risk orders":analytics.High_risk_orders
     }
     choice = st.sidebar.selectbox("Choose analysis", analysis_functions.keys())
@@ -107,7 +231,7 @@ elif Type_analysis =='Predictive Analysis':
     if func:
         if choice == "RFM Signals":
             if st.sidebar.button("Show RFM Signals"):
-                rfm_dict = func()   
+                rfm_dict = run(func)   
 
                 for name, df in rfm_dict.items():
                     st.subheader(name)  
@@ -117,30 +241,31 @@ elif Type_analysis =='Predictive Analysis':
 
                     st.data_editor(df, hide_index=True,height=350)
         elif choice == "High risk orders":
-            if st.sidebar.button("Show orders"):
-                hro_dict = func()   
-
-                for name, df in hro_dict.items():
-                    st.subheader(name)     
-
-                    fig = auto_plot(df)
-                    st.plotly_chart(fig,width='stretch')    
-
-                    st.data_editor(df, hide_index=True,height=350)
+            if shown("Show orders", choice):
+                #one page of each result at a time (keyset pagination), with an estimated total
+                for name in HIGH_RISK_ORDERS:
+                    st.subheader(name)
+                    result_table(name, analytics.High_risk_orders_pages, analytics.High_risk_orders_count, kind=name)
+        elif choice == "Product Monthly Performance":
+            date_args = date_range_args(func)
+            if shown("Show", choice):
+                result_table(choice, analytics.Product_performance_pages, analytics.Product_performance_count,
+                             **date_args)
 
-        elif func.__code__.co_argcount > 1:    
+        elif needs_parameter(func):
             param = st.sidebar.number_input("Enter parameter value:", value=5)
             if st.sidebar.button("Show"):
 
-                df=func(param)
+                df=run(func, param)
                 fig = auto_plot(df)
                 st.plotly_chart(fig,width='stretch')
 
                 st.data_editor(df,hide_index=True,height=350)
         else:                                
+            date_args = date_range_args(func)
             if st.sidebar.button("Show"):
 
-                df=func()
+                df=run(func, **date_args)
                 fig = auto_plot(df)
                 st.plotly_chart(fig,width='stretch')
 
@@ -162,19 +287,24 @@ else:
     func = analysis_functions[choice]
 
     if func:
-        if func.__code__.co_argcount > 1:    
+        if choice == "Customer Churning":
+            #one row per customer: a page at a time
+            if shown("Show", choice):
+                result_table(choice, analytics.Churning_customers_pages, analytics.Churning_customers_count)
+        elif needs_parameter(func):
             param = st.sidebar.number_input("Enter parameter value:", value=5)
             if st.sidebar.button("Show"):
                 
-                df=func(param)
+                df=run(func, param)
                 fig = auto_plot(df)
                 st.plotly_chart(fig,width='stretch')
 
                 st.data_editor(df,hide_index=True,height=350)
         else:                                
+            date_args = date_range_args(func)
             if st.sidebar.button("Show"):
 
-                df=func()
+                df=run(func, **date_args)
                 fig = auto_plot(df)
                 st.plotly_chart(fig,width='stretch')
 
@@ -20,7 +20,7 @@ SELECT product,
        SUM(profit) AS profit
 FROM cleaned_sales_data
 GROUP BY product
-HAVING sales < 500 AND profit < 0
+HAVING SUM(sales) < 500 AND SUM(profit) < 0
 ORDER BY sales ASC, profit ASC;
 
 --Products to promote (high sales + high profit)
@@ -30,7 +30,7 @@ SELECT product,
        SUM(profit) AS profit
 FROM cleaned_sales_data
 GROUP BY product
-HAVING sales > 5000 AND profit > 1000
+HAVING SUM(sales) > 5000 AND SUM(profit) > 1000
 ORDER BY profit DESC;
 
 --Customers to target for loyalty program
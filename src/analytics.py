@@ -16,7 +16,7 @@ The functions I plan on making are:
 -RFM (Recency, Frequency, Monetary) signals
 -Seasonal demand patterns
 -Product performance trend
--Forecasting signals (moving averages)
+-Forecasting signals (moving averages, exponential smoothing, seasonal naive)
 -High-risk orders (low profit or high aging)
 
 3.Prescriptive queries(understanding current data for future correction in services)
@@ -31,13 +31,97 @@ Author: Vishank
 Created: 11 December 2025
 '''
 import pandas as pd
-import sqlite3
+import copy
 import os
+import time
+from contextlib import nullcontext
 from typing import Dict
 
+from src.star_schema import DIMENSIONS, FACT_TABLE, is_star_view
+from src.rollup import has_rollup, rollup_name
+from src.partitions import is_partitioned, partitions_for_range
+from src.rfm import score_rfm
+from src.forecasting import ACCURACY_COLUMNS, FORECAST_HORIZON, backtest, forecast_frame, series_matrix
+from src.trends import TREND_METRICS, sales_matrix, top_k, trend_frame
+from src.result_cache import (CACHE_MAX_BYTES, cached, default_cache_dir, read_data_updated_at,
+                              read_data_version, shared_cache)
+from src.scan_planner import Aggregate, ScanPlanner, aggregate_query, run_batch
+from src.pagination import (PAGE_SIZE, RowQuery, estimate_count, frame_pages, frame_view, null_key, paginate,
+                            search_condition)
+from src.connection_pool import POOL_SIZE, shared_pool
+from src.profiler import PROFILER, profile_methods
+from src.approximate import (CONFIDENCE, has_sample, heavy_hitter_columns, heavy_hitters_eligible,
+                             heavy_hitters_query, heavy_hitters_result, sample_eligible, sample_name,
+                             sample_query, sample_result, z_score)
+from src.parallel_aggregate import SHARDS_PER_WORKER, read_shards, shard_ranges
+from src.compact_dtypes import compact_frame, compact_result
+
+BACKENDS = ('sqlite', 'duckdb')
+
+# Aggregates over the raw rows, and the same aggregates re-aggregated from the rollup
+# (func, arg) as in scan_planner.measure_sql
+RAW_MEASURES = {
+    'rows': ('count', '*'),
+    'orders': ('count', 'order_id'),
+    'sales': ('sum', 'sales'),
+    'profit': ('sum', 'profit'),
+    'shipping_cost': ('sum', 'shipping_cost'),
+    'avg_aging': ('avg', 'aging'),
+}
+ROLLUP_MEASURES = {
+    'rows': ('sum', 'row_count'),
+    'orders': ('sum', 'orders'),
+    'sales': ('sum', 'sales'),
+    'profit': ('sum', 'profit'),
+    'shipping_cost': ('sum', 'shipping_cost'),
+    'avg_aging': ('ratio', ('aging', 'aging_count')),
+}
+
+# filter name -> column; all are rollup dimensions, so filtered summaries
+# can still be answered from the rollup
+FILTER_COLUMNS = {
+    'region': 'region',
+    'segment': 'segment',
+    'category': 'product_category',
+    'ship_mode': 'ship_mode',
+}
+
+# High_risk_orders result -> (condition, sort keys); order_id is unique and breaks ties
+HIGH_RISK_ORDERS = {
+    'L_Profit': ("profit < 0", [('profit', True), ('order_id', True)]),
+    'H_Aging': ("aging > 10", [('aging', False), ('order_id', True)]),
+}
+
+# forecast level -> series column (None: one series of all sales)
+FORECAST_LEVELS = {
+    'total': None,
+    'category': 'product_category',
+    'product': 'product',
+}
+
+@profile_methods()
 class SalesAnalytics:
     #connecting the database
-    def __init__(self, db_relative_path="database/ecommerce.db"):
+    def __init__(self, db_relative_path="database/ecommerce.db", backend="sqlite",
+                 parquet_relative_path="database/cleaned_sales_data.parquet", use_rollup=True,
+                 use_cache=True, cache_dir=None, cache_max_bytes=CACHE_MAX_BYTES, pool_size=POOL_SIZE):
+        """
+        backend='sqlite' (default) queries the SQLite database.
+        backend='duckdb' runs the same queries with the embedded columnar engine
+        over the Parquet snapshot written at ingestion (csv_to_database --parquet).
+        use_rollup answers the summary methods from the pre-aggregated rollup
+        table when ingestion maintains one (csv_to_database --rollup).
+        use_cache serves repeated calls from the result cache (see result_cache.py):
+        memory LRU of cache_max_bytes plus Parquet files in cache_dir
+        (default: database/.cache/<file>/), invalidated when the data changes.
+        SQLite queries run on read-only connections from a pool of pool_size
+        shared by every instance in the process (see connection_pool.py), so
+        concurrent dashboard sessions read in parallel.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+        self.backend = backend
+
         # Absolute path to project root
         project_root = os.path.abspath(
             os.path.join(os.path.dirname(__file__), "..")
@@ -45,15 +129,598 @@ class SalesAnalytics:
 
         self.db_path = os.path.join(project_root, db_relative_path)
 
-        if not os.path.exists(self.db_path):
+        self.conn = None
+        self.pool = None
+        if backend == "duckdb":
+            self.parquet_path = os.path.join(project_root, parquet_relative_path)
+            self.conn = self._connect_duckdb()
+        else:
+            if not os.path.exists(self.db_path):
+                raise FileNotFoundError(
+                    f"Database not found at {self.db_path}"
+                )
+
+            self.pool = shared_pool(self.db_path, pool_size)
+        self.filters = {}
+        self.approximation = None
+        self.workers = None
+        self.compact_dtypes = False
+        self.layout = self._detect_layout()
+        self.dates = self._date_expressions()
+        if use_rollup and self.backend == "sqlite":
+            with self._connection() as conn:
+                self.rollup = has_rollup(conn)
+        else:
+            self.rollup = False
+
+        self._seen_data_version = None
+        self._version = None
+        self.cache = None
+        if use_cache:
+            source = self.parquet_path if backend == "duckdb" else self.db_path
+            self.cache = shared_cache(cache_dir or default_cache_dir(source), cache_max_bytes)
+
+    def _connect_duckdb(self):
+        """In-memory DuckDB connection with cleaned_sales_data as a view over the Parquet snapshot."""
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("backend='duckdb' needs the duckdb package (pip install duckdb)")
+
+        if not os.path.exists(self.parquet_path):
             raise FileNotFoundError(
-                f"Database not found at {self.db_path}"
+                f"Parquet snapshot not found at {self.parquet_path}"
             )
+        conn = duckdb.connect()
+        path = self.parquet_path.replace("'", "''")
+        conn.execute(f"CREATE VIEW cleaned_sales_data AS SELECT * FROM read_parquet('{path}')")
+        return conn
+
+    def filter(self, start_date=None, end_date=None, **filters) -> "SalesAnalytics":
+        """
+        Same analyses restricted to matching rows, pushed into the WHERE
+        clause of every query as bound parameters:
+            analytics.filter(region='West', start_date='2014-01-01').Categorical_Sales()
+
+        Args:
+            start_date, end_date: Inclusive order_date range (within the
+                                  range of an already filtered instance)
+            **filters: region / segment / category / ship_mode, each a value
+                       or a list of values
+
+        Returns:
+            SalesAnalytics: Filtered copy sharing this instance's connections and cache
+        """
+        unknown = set(filters) - set(FILTER_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown filter(s) {sorted(unknown)}, expected {sorted(FILTER_COLUMNS)}")
+        self._date_bounds(start_date, end_date)  # ValueError on bad dates
+        start_date, end_date = self._range(start_date, end_date)
+        filtered = copy.copy(self)
+        filtered.filters = {**self.filters}
+        for name, value in [('start_date', start_date), ('end_date', end_date), *filters.items()]:
+            if isinstance(value, (list, tuple, set)):
+                value = sorted(value)
+            if value is not None and value != []:
+                filtered.filters[name] = value
+        return filtered
+
+    def approximate(self, enabled=True, confidence=CONFIDENCE) -> "SalesAnalytics":
+        """
+        Same analyses answered from the sample table and heavy-hitter
+        sketches kept at ingestion (csv_to_database --approximate, see
+        approximate.py) where they can be:
+            analytics.approximate().Top_Customers(10)
+        Estimated results carry <measure>_low / <measure>_high bounds (and
+        `guaranteed` for top-k rows) and attrs['approximate']; the others
+        run exactly. approximate(False) goes back to exact answers.
+
+        Args:
+            enabled (bool): Approximate (True) or exact (False) answers
+            confidence (float): Confidence level of the sample bounds
+
+        Returns:
+            SalesAnalytics: Copy sharing this instance's connections and cache
+        """
+        z_score(confidence)  # ValueError on a bad level
+        approximated = copy.copy(self)
+        approximated.approximation = None
+        if enabled and self.backend == "sqlite":
+            with self._connection() as conn:
+                sample = has_sample(conn)
+                sketches = heavy_hitter_columns(conn)
+            if sample or sketches:
+                approximated.approximation = (confidence, sample, tuple(sorted(sketches.items())))
+        return approximated
+
+    def parallel(self, workers=None) -> "SalesAnalytics":
+        """
+        Same analyses with every aggregate over the raw rows split into
+        rowid-range shards that a pool of worker processes scans at the same
+        time (see parallel_aggregate.py); results match the serial path.
+            analytics.parallel(16).Products_profits()
+
+        Args:
+            workers (int): Worker processes (default: one per CPU);
+                           fewer than 2 scans serially
+
+        Returns:
+            SalesAnalytics: Copy sharing this instance's connections and cache
+        """
+        workers = os.cpu_count() if workers is None else int(workers)
+        parallel = copy.copy(self)
+        parallel.workers = workers if workers > 1 and self.backend == "sqlite" else None
+        return parallel
+
+    def compact(self, enabled=True) -> "SalesAnalytics":
+        """
+        Same analyses returning memory-optimized results: categorical
+        dimension columns, downcast numbers, datetime64 dates, Arrow-backed
+        strings (see compact_dtypes.py). The values are the same.
+            analytics.compact().High_risk_orders()
+
+        Args:
+            enabled (bool): Compact (True) or default (False) dtypes
+
+        Returns:
+            SalesAnalytics: Copy sharing this instance's connections and cache
+        """
+        compacted = copy.copy(self)
+        compacted.compact_dtypes = enabled
+        return compacted
+
+    def _finish_result(self, result):
+        """A method's result as returned and cached: in compact dtypes when enabled."""
+        return compact_result(result) if self.compact_dtypes else result
+
+    def filter_options(self) -> Dict[str, list]:
+        """Values each filter can take (from the rollup when there is one)."""
+        return {name: df['value'].tolist() for name, df in self._filter_values().items()}
+
+    @cached
+    def _filter_values(self) -> Dict[str, pd.DataFrame]:
+        values = {}
+        for name, column in FILTER_COLUMNS.items():
+            source = rollup_name() if self.rollup else self._from(column)
+            values[name] = self._read(f"SELECT DISTINCT {column} AS value FROM {source} "
+                                      f"WHERE {column} IS NOT NULL ORDER BY value")
+        return values
+
+    def _connection(self):
+        """
+        Context manager yielding a connection: the DuckDB one, or the calling
+        thread's connection from the SQLite pool
+        """
+        if self.pool is None:
+            return nullcontext(self.conn)
+        return self.pool.connection()
+
+    def _read(self, query: str, params=()) -> pd.DataFrame:
+        """Run a query on the selected backend and return a DataFrame (a profiler sample when profiling)."""
+        if not PROFILER.enabled:
+            return self._execute(query, params)
+        start = time.perf_counter()
+        df = self._execute(query, params)
+        seconds = time.perf_counter() - start
+        # the plan is fetched after the timing, so it does not count as query time
+        plan = self._explain(query, params) if PROFILER.explain else None
+        PROFILER.record('query', self._query_name(), seconds, result=df, plan=plan, sql=query,
+                        backend=self.backend)
+        return df
+
+    def _query_name(self):
+        """Name of a query sample: the SalesAnalytics method running it."""
+        span = PROFILER.current()
+        return span['name'] if span else 'SalesAnalytics'
+
+    def _explain(self, query: str, params=()):
+        """Lines of the query plan (EXPLAIN QUERY PLAN on SQLite, the operators of EXPLAIN on DuckDB)."""
+        try:
+            if self.backend == "duckdb":
+                # the plan is drawn as boxes: keep the operator names (the line under each box top)
+                rows = self.conn.execute("EXPLAIN " + query, list(params)).fetchall()
+                lines = [line for row in rows for line in str(row[-1]).splitlines()]
+                return [name.strip() for above, line in zip(lines, lines[1:]) if '┌' in above
+                        for name in line.split('│') if name.strip()]
+            with self._connection() as conn:
+                return [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + query, list(params))]
+        except Exception as e:  # profiling must never break a query
+            return [f"EXPLAIN failed: {e}"]
+
+    def _execute(self, query: str, params=()) -> pd.DataFrame:
+        if self.backend == "duckdb":
+            result = self.conn.execute(query, list(params))
+            types = [str(col[1]) for col in self.conn.description]
+            df = result.df()
+            # SUM of BIGINT is HUGEINT in DuckDB (float64 in pandas); SQLite returns int64
+            for col, col_type in zip(df.columns, types):
+                if col_type == 'HUGEINT' and df[col].notna().all():
+                    df[col] = df[col].astype('int64')
+            return df
+        with self._connection() as conn:
+            return pd.read_sql_query(query, conn, params=params)
+
+    def _detect_layout(self) -> str:
+        """
+        'star' if cleaned_sales_data is the star schema view (see star_schema.py),
+        'partitioned' if it is the view over time partitions (see partitions.py), else 'flat'.
+        """
+        if self.backend != "sqlite":
+            return 'flat'
+        with self._connection() as conn:
+            if is_star_view(conn):
+                return 'star'
+            if is_partitioned(conn):
+                return 'partitioned'
+        return 'flat'
+
+    def _any(self, expr: str) -> str:
+        """Non-grouped column in an aggregate query (SQLite allows it bare, DuckDB needs ANY_VALUE)."""
+        return f"ANY_VALUE({expr})" if self.backend == "duckdb" else expr
+
+    def _latest(self, expr: str) -> str:
+        """
+        Value of expr on the row with the latest order_date. SQLite gives bare
+        columns next to MAX() exactly that; DuckDB spells it arg_max.
+        """
+        return f"arg_max({expr}, order_date)" if self.backend == "duckdb" else expr
+
+    def _from(self, *columns, start_date=None, end_date=None) -> str:
+        """
+        FROM clause for a query that uses the given dimension columns.
+        Flat layout: the wide table. Star layout: the fact table joined
+        only to the dimension tables that hold those columns.
+        Partitioned layout with a date range: only the partitions that overlap it.
+        """
+        start_date, end_date = self._range(start_date, end_date)
+        if self.layout == 'partitioned' and (start_date or end_date):
+            start, end = self._date_bounds(start_date, end_date)
+            with self._connection() as conn:
+                tables = partitions_for_range(conn, 'cleaned_sales_data', start, end)
+            if not tables:
+                return "(SELECT * FROM cleaned_sales_data WHERE 0) AS cleaned_sales_data"
+            union = ' UNION ALL '.join(f'SELECT * FROM "{table}"' for table in tables)
+            return f"({union}) AS cleaned_sales_data"
+        if self.layout != 'star':
+            return "cleaned_sales_data"
+        source = FACT_TABLE
+        for dim_table, (key, dim_columns) in DIMENSIONS.items():
+            if any(col in dim_columns for col in columns):
+                source += f" LEFT JOIN {dim_table} USING ({key})"
+        return source
+
+    def _summary(self, start_date=None, end_date=None):
+        """
+        (use rollup, date expressions, measures) for a summary query.
+        Uses the rollup table when there is one (and no date range), the raw rows otherwise.
+        """
+        if self.rollup and not any(self._range(start_date, end_date)):
+            return True, self._date_expressions(rollup=True), ROLLUP_MEASURES
+        return False, self.dates, RAW_MEASURES
+
+    def _aggregate_source(self, rollup, columns=(), start_date=None, end_date=None):
+        """(FROM clause, WHERE clause, params) an Aggregate reads."""
+        if rollup:
+            where, params = self._where()
+            return rollup_name(), where, params
+        where, params = self._where(start_date, end_date)
+        return self._from(*columns, *self._filter_columns(), start_date=start_date, end_date=end_date), where, params
+
+    def _aggregate(self, aggregate: Aggregate) -> pd.DataFrame:
+        """Run one Aggregate as a single query (an estimate in approximate mode when possible)."""
+        if self.approximation is not None:
+            estimate = self._estimate(aggregate)
+            if estimate is not None:
+                return estimate
+        if self.workers and self._shards(aggregate.rollup, aggregate.columns,
+                                         aggregate.start_date, aggregate.end_date):
+            return self._planner().run({'aggregate': aggregate})['aggregate']
+        source, where, params = self._aggregate_source(aggregate.rollup, aggregate.columns,
+                                                       aggregate.start_date, aggregate.end_date)
+        query, having_params = aggregate.to_sql(source, where)
+        return self._read(query, [*params, *having_params])
+
+    def _planner(self, read=None) -> ScanPlanner:
+        """ScanPlanner over this instance's data (sharded when parallel)."""
+        return ScanPlanner(read or self._read, self._aggregate_source, self._combinable_keys(),
+                           self._dependent_keys(), self._any,
+                           shards=self._shards if self.workers else None, read_shards=self._read_shards)
+
+    def _shards(self, rollup, columns=(), start_date=None, end_date=None):
+        """
+        (FROM clause, WHERE clause, params) of every rowid-range shard of a
+        scan over the raw rows; None to scan them in one query (serial
+        instance, rollup, or too few rows)
+        """
+        if not self.workers or rollup:
+            return None
+        if self.layout == 'partitioned':
+            start, end = self._date_bounds(*self._range(start_date, end_date))
+            with self._connection() as conn:
+                tables = partitions_for_range(conn, 'cleaned_sales_data', start, end)
+            units = [(table, f'"{table}" AS cleaned_sales_data', 'cleaned_sales_data') for table in tables]
+        elif self.layout == 'star':
+            units = [(FACT_TABLE, self._from(*columns, *self._filter_columns()), FACT_TABLE)]
+        else:
+            units = [('cleaned_sales_data', 'cleaned_sales_data', 'cleaned_sales_data')]
+        with self._connection() as conn:
+            ranges = shard_ranges(conn, units, self.workers * SHARDS_PER_WORKER)
+        if len(ranges) < 2:
+            return None
+        shards = []
+        for source, qualifier, first, end in ranges:
+            where, params = self._where(start_date, end_date, [f"{qualifier}.rowid >= ?", f"{qualifier}.rowid < ?"])
+            shards.append((source, where, [first, end, *params]))
+        return shards
+
+    def _read_shards(self, queries) -> list:
+        """Run shard queries in the worker processes (one profiler sample for all of them)."""
+        start = time.perf_counter()
+        frames = read_shards(self.db_path, queries, self.workers)
+        PROFILER.record('query', self._query_name(), time.perf_counter() - start, result=dict(enumerate(frames)),
+                        sql=queries[0][0], backend=self.backend, shards=len(queries))
+        return frames
+
+    def _estimate(self, aggregate: Aggregate):
+        """Approximate result of an Aggregate (see approximate.py), None if it must run exactly."""
+        confidence, sample, sketches = self.approximation
+        sketches = dict(sketches)
+        if not self.filters and heavy_hitters_eligible(aggregate, sketches):
+            (_, column), k = aggregate.keys[0], int(aggregate.limit)
+            items = self._read(heavy_hitters_query(), [column, k + 1])
+            _, floor, total = sketches[column]
+            result = heavy_hitters_result(aggregate, items, floor)
+            result.attrs['approximate'] = {'method': 'heavy_hitters', 'confidence': 1.0,
+                                           'floor': floor, 'total': total}
+        elif sample and sample_eligible(aggregate):
+            where, params = self._where(aggregate.start_date, aggregate.end_date)
+            partials = self._read(sample_query(aggregate, sample_name(), where), params)
+            result = sample_result(aggregate, partials, confidence)
+            result.attrs['approximate'] = {'method': 'sample', 'confidence': confidence}
+        else:
+            return None
+        return result
+
+    def _forecasts(self, level, horizon, start_date=None, end_date=None) -> pd.DataFrame:
+        """History and forecast of every series of a forecast level (see forecasting.forecast_frame)."""
+        series = FORECAST_LEVELS.get(level)
+        labels, months, matrix = series_matrix(self._monthly_series(level, start_date, end_date), series)
+        return forecast_frame(labels, months, matrix, series, horizon)
+
+    def _trending(self, limit, rising, metric='slope', start_date=None, end_date=None) -> pd.DataFrame:
+        """Product_trends rows of the `limit` steepest rising (or falling) products by `metric`."""
+        if metric not in TREND_METRICS:
+            raise ValueError(f"Unknown trend metric {metric!r}, expected one of {TREND_METRICS}")
+        trends = self.Product_trends(start_date, end_date)
+        return trends.iloc[top_k(trends[metric].to_numpy(), limit, largest=rising)].reset_index(drop=True)
+
+    def _high_risk_query(self, kind, columns=None, sort=None, ascending=True, search=None) -> RowQuery:
+        """
+        RowQuery of one High_risk_orders result ('L_Profit' or 'H_Aging'),
+        optionally sorted on another column (order_id breaking ties) and
+        reduced to the rows with `search` in any column
+        """
+        if kind not in HIGH_RISK_ORDERS:
+            raise ValueError(f"Unknown high risk orders {kind!r}, expected one of {list(HIGH_RISK_ORDERS)}")
+        condition, keys = HIGH_RISK_ORDERS[kind]
+        # whole rows: the star view rather than the fact table; only the overlapping partitions
+        source = "cleaned_sales_data" if self.layout == 'star' else self._from()
+        where, params = self._where()
+        if sort is not None or search:
+            row_columns = self._read(f"SELECT * FROM {source} LIMIT 0").columns.tolist()
+        if sort is not None:
+            if sort not in row_columns:
+                raise ValueError(f"Unknown sort column {sort!r}")
+            # any column can hold NULLs: its null_key keeps the cursor comparable
+            keys = [null_key(sort, ascending), (sort, ascending)]
+            keys += [('order_id', True)] if sort != 'order_id' else []
+        matched = search_condition(columns or row_columns, search) if search else None
+        return RowQuery(source, keys, columns, where, params, [condition], matched)
 
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+    def _monthly_series(self, level='total', start_date=None, end_date=None) -> pd.DataFrame:
+        """[series column,] month, monthly_sales of one forecast level (one scan)."""
+        if level not in FORECAST_LEVELS:
+            raise ValueError(f"Unknown forecast level {level!r}, expected one of {list(FORECAST_LEVELS)}")
+        series = FORECAST_LEVELS[level]
+        if series is None or series in FILTER_COLUMNS.values():
+            rollup, d, m = self._summary(start_date=start_date, end_date=end_date)
+        else:  # products are not a rollup dimension
+            rollup, d, m = False, self.dates, RAW_MEASURES
+        keys = [(series, series)] if series else []
+        return self._aggregate(Aggregate(keys=keys + [('month_key', d['year_month_key'])],
+                                         labels=[('month', d['year_month'])],
+                                         measures=[('monthly_sales', *m['sales'])],
+                                         output=[name for name, _ in keys] + ['month', 'monthly_sales'],
+                                         columns=[series] if series else [], rollup=rollup,
+                                         start_date=start_date, end_date=end_date))
+
+    def _combinable_keys(self):
+        """
+        Low-cardinality key expressions the scan planner may group on in one
+        pass: the rollup dimensions and the calendar parts (the rollup grain)
+        """
+        keys = {'product_category', 'region', 'segment', 'ship_mode'}
+        for dates in (self.dates, self._date_expressions(rollup=True)):
+            keys.update(dates.values())
+        return keys
+
+    def _dependent_keys(self):
+        """Calendar expressions -> the year-month expression that determines them."""
+        dependent = {}
+        for dates in (self.dates, self._date_expressions(rollup=True)):
+            for expr in dates.values():
+                if expr != dates['year_month_key']:
+                    dependent[expr] = dates['year_month_key']
+        return dependent
+
+    @staticmethod
+    def _date_bounds(start_date=None, end_date=None):
+        """
+        ISO [start, end) bounds for an inclusive start_date..end_date range
+        (either may be None); raises ValueError on unparseable dates.
+        """
+        start = pd.Timestamp(start_date).strftime('%Y-%m-%d') if start_date else None
+        end = (pd.Timestamp(end_date) + pd.Timedelta(days=1)).strftime('%Y-%m-%d') if end_date else None
+        return start, end
+
+    def _range(self, start_date=None, end_date=None):
+        """
+        Date range of a call: its own arguments intersected with the instance
+        filter (see filter), never wider than the filter; start after end
+        matches no row
+        """
+        starts = [date for date in (start_date, self.filters.get('start_date')) if date]
+        ends = [date for date in (end_date, self.filters.get('end_date')) if date]
+        return (max(starts, key=pd.Timestamp) if starts else None,
+                min(ends, key=pd.Timestamp) if ends else None)
+
+    def _filter_columns(self):
+        """Dimension columns the instance filters read (star layout joins)."""
+        return [column for name, column in FILTER_COLUMNS.items() if name in self.filters]
+
+    def _where(self, start_date=None, end_date=None, conditions=()):
+        """
+        WHERE clause and bound parameters: the order_date range, the
+        instance filters and any extra conditions (SQL without values)
+        """
+        start, end = self._date_bounds(*self._range(start_date, end_date))
+        conditions, params = list(conditions), []
+        if start:
+            conditions.append("order_date >= ?")
+            params.append(start)
+        if end:
+            conditions.append("order_date < ?")
+            params.append(end)
+        for name, column in FILTER_COLUMNS.items():
+            value = self.filters.get(name)
+            if isinstance(value, list):
+                conditions.append(f"{column} IN ({', '.join('?' * len(value))})")
+                params.extend(value)
+            elif value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if not conditions:
+            return "", []
+        return "WHERE " + " AND ".join(conditions), params
+
+    def _date_expressions(self, rollup: bool = False) -> Dict[str, str]:
+        """
+        SQL expressions for the calendar groupings.
+        The star layout has precomputed integer year/month/year_month columns,
+        so dates are not re-parsed with strftime on every row.
+        The rollup is keyed by 'YYYY-MM' text (see rollup.py).
+        """
+        months = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+                  'August', 'September', 'October', 'November', 'December']
+        if rollup:
+            month_key = "substr(year_month, 6, 2)"
+            whens = ' '.join(f"WHEN '{i:02d}' THEN '{name}'" for i, name in enumerate(months, 1))
+            return {
+                'month_key': month_key,
+                'month_name': f"CASE {month_key} {whens} END",
+                'year': "substr(year_month, 1, 4)",
+                'year_key': "substr(year_month, 1, 4)",
+                'year_month': "year_month",
+                'year_month_key': "year_month",
+            }
+        if self.layout == 'star':
+            # qualified so they never resolve to a result alias such as "month"
+            month_key = f"{FACT_TABLE}.month"
+            whens = ' '.join(f"WHEN {i} THEN '{name}'" for i, name in enumerate(months, 1))
+            return {
+                'month_key': month_key,
+                'month_name': f"CASE {month_key} {whens} END",
+                'year': f"CAST({FACT_TABLE}.year AS TEXT)",
+                'year_key': f"{FACT_TABLE}.year",
+                'year_month': f"printf('%04d-%02d', {FACT_TABLE}.year_month / 100, "
+                              f"{FACT_TABLE}.year_month % 100)",
+                'year_month_key': f"{FACT_TABLE}.year_month",
+            }
+        # DuckDB's strftime needs a typed timestamp, SQLite parses the text itself
+        order_date = "CAST(order_date AS TIMESTAMP)" if self.backend == "duckdb" else "order_date"
+        month_key = f"strftime('%m', {order_date})"
+        whens = ' '.join(f"WHEN '{i:02d}' THEN '{name}'" for i, name in enumerate(months, 1))
+        return {
+            'month_key': month_key,
+            'month_name': f"CASE {month_key} {whens} END",
+            'year': f"strftime('%Y', {order_date})",
+            'year_key': f"strftime('%Y', {order_date})",
+            'year_month': f"strftime('%Y-%m', {order_date})",
+            'year_month_key': f"strftime('%Y-%m', {order_date})",
+        }
+
+    def _data_version(self) -> str:
+        """
+        Token that changes whenever the data behind the queries does.
+        SQLite: ingestion watermark + schema version, re-read only when
+        PRAGMA data_version reports a commit by another connection.
+        DuckDB: size and mtime of the Parquet snapshot.
+        """
+        if self.backend == "duckdb":
+            stat = os.stat(self.parquet_path)
+            return f"{stat.st_size}-{stat.st_mtime_ns}"
+        # data_version is only comparable on one connection: the pool's monitor
+        with self.pool.monitor() as conn:
+            changed = conn.execute("PRAGMA data_version").fetchone()[0]
+            if self._version is None or changed != self._seen_data_version:
+                self._seen_data_version = changed
+                schema = conn.execute("PRAGMA schema_version").fetchone()[0]
+                self._version = f"{read_data_version(conn)}-{schema}"
+        return self._version
+
+    def data_as_of(self) -> str:
+        """
+        When the data was last loaded (UTC): the ingestion watermark's time,
+        else the modification time of the database / Parquet file
+        """
+        if self.backend == "sqlite":
+            with self.pool.monitor() as conn:
+                updated_at = read_data_updated_at(conn)
+            if updated_at:
+                return updated_at
+        source = self.parquet_path if self.backend == "duckdb" else self.db_path
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(os.path.getmtime(source)))
+
+    def _cache_context(self):
+        """Instance settings that change results, part of every cache key."""
+        context = (self.backend, self.rollup, sorted(self.filters.items()))
+        if self.approximation is not None:
+            context += (self.approximation,)
+        if self.compact_dtypes:
+            context += ('compact',)
+        return context
+
+    def cache_info(self) -> Dict:
+        """Hit / miss / eviction counters and size of the result cache."""
+        return self.cache.info() if self.cache is not None else {}
+
+    def clear_cache(self):
+        """Drop every cached result (memory and disk)."""
+        if self.cache is not None:
+            self.cache.clear()
+
+    def run_batch(self, calls: Dict):
+        """
+        Run many methods with as few scans over the data as possible
+        (see scan_planner.py)
+
+        Args:
+            calls (dict): label -> (method name, kwargs)
+
+        Returns:
+            tuple: (label -> result, stats with scan count and wall time)
+        """
+        return run_batch(self, calls)
+
+    def pool_info(self) -> Dict:
+        """Connections open / in use and wait-time counters of the SQLite connection pool."""
+        return self.pool.info() if self.pool is not None else {}
 
     def close(self):
-        """Close database connection."""
+        """
+        Close database connection. The SQLite pool is shared with the other
+        instances of the process and is closed at exit (connection_pool.close_pools).
+        """
         if self.conn:
             self.conn.close()
 
@@ -62,131 +729,150 @@ class SalesAnalytics:
 #general summaries
 
     #for counting total orders
+    @cached
+    @aggregate_query
     def Count_Total_Orders(self)-> pd.DataFrame:
-        query="""SELECT COUNT(*) AS total_orders FROM cleaned_sales_data;"""
-        return pd.read_sql_query(query, self.conn)
+        rollup, _, m = self._summary()
+        return Aggregate(measures=[('total_orders', *m['rows'])], rollup=rollup)
     
     #for finding total profit along with total sales
+    @cached
+    @aggregate_query
     def Sales_generated_Profit(self)-> pd.DataFrame:
-        query="""SELECT SUM(sales) AS total_sales, SUM(profit) AS total_profit FROM cleaned_sales_data;"""
-        return pd.read_sql_query(query, self.conn)
+        rollup, _, m = self._summary()
+        return Aggregate(measures=[('total_sales', *m['sales']), ('total_profit', *m['profit'])],
+                         rollup=rollup)
     
     #sales of each category
+    @cached
+    @aggregate_query
     def Categorical_Sales(self)-> pd.DataFrame:
-        query="""SELECT product_category, SUM(sales) AS sales
-                FROM cleaned_sales_data
-                GROUP BY product_category
-                ORDER BY sales DESC;"""
-        return pd.read_sql_query(query, self.conn)
+        rollup, _, m = self._summary()
+        return Aggregate(keys=[('product_category', 'product_category')],
+                         measures=[('sales', *m['sales'])],
+                         columns=['product_category'], rollup=rollup,
+                         order_by=[('sales', False), ('product_category', True)])
     
     #sales of each region
+    @cached
+    @aggregate_query
     def Regional_Sales(self)-> pd.DataFrame:
-        query="""SELECT region, SUM(sales) AS sales
-            FROM cleaned_sales_data
-            GROUP BY region
-            ORDER BY sales DESC;"""
-        return pd.read_sql_query(query, self.conn)
+        rollup, _, m = self._summary()
+        return Aggregate(keys=[('region', 'region')],
+                         measures=[('sales', *m['sales'])],
+                         columns=['region'], rollup=rollup,
+                         order_by=[('sales', False), ('region', True)])
     
 #Time-based summaries
 
     #monthly sales
-    def Monthly_Sales(self)-> pd.DataFrame:
-        query="""SELECT 
-            CASE strftime('%m', order_date)
-            WHEN '01' THEN 'January' WHEN '02' THEN 'February' WHEN '03' THEN 'March'
-            WHEN '04' THEN 'April' WHEN '05' THEN 'May' WHEN '06' THEN 'June'
-            WHEN '07' THEN 'July' WHEN '08' THEN 'August' WHEN '09' THEN 'September' WHEN '10' THEN 'October'
-            WHEN '11' THEN 'November' WHEN '12' THEN 'December'
-            END AS month,
-            SUM(sales) AS sales
-            FROM cleaned_sales_data
-            GROUP BY strftime('%m', order_date)
-            ORDER BY strftime('%m', order_date);"""
-        return pd.read_sql_query(query, self.conn)
+    @cached
+    @aggregate_query
+    def Monthly_Sales(self, start_date=None, end_date=None)-> pd.DataFrame:
+        rollup, d, m = self._summary(start_date=start_date, end_date=end_date)
+        return Aggregate(keys=[('month_key', d['month_key'])],
+                         labels=[('month', d['month_name'])],
+                         measures=[('sales', *m['sales'])],
+                         output=['month', 'sales'], rollup=rollup,
+                         start_date=start_date, end_date=end_date,
+                         order_by=[('month_key', True)])
     
     #yearly sales
-    def Yearly_Sales(self)-> pd.DataFrame:
-        query="""SELECT strftime('%Y', order_date) AS year, SUM(sales) AS sales
-                FROM cleaned_sales_data
-                GROUP BY year;"""
-        return pd.read_sql_query(query, self.conn)
+    @cached
+    @aggregate_query
+    def Yearly_Sales(self, start_date=None, end_date=None)-> pd.DataFrame:
+        rollup, d, m = self._summary(start_date=start_date, end_date=end_date)
+        return Aggregate(keys=[('year_key', d['year_key'])],
+                         labels=[('year', d['year'])],
+                         measures=[('sales', *m['sales'])],
+                         output=['year', 'sales'], rollup=rollup,
+                         start_date=start_date, end_date=end_date,
+                         order_by=[('year_key', True)])
 
 #Top & bottom performer
 
     #Top products
 
+    @cached
+    @aggregate_query
     def Best_Products(self,limit:int)-> pd.DataFrame:
-        query=f"""SELECT product, SUM(sales) AS total_sales
-                FROM cleaned_sales_data
-                GROUP BY product
-                ORDER BY total_sales DESC
-                LIMIT {limit}"""
-        return pd.read_sql_query(query, self.conn)
+        return Aggregate(keys=[('product', 'product')],
+                         measures=[('total_sales', 'sum', 'sales')],
+                         columns=['product'],
+                         order_by=[('total_sales', False), ('product', True)], limit=limit)
 
     #worst products
 
+    @cached
+    @aggregate_query
     def Worst_Products(self,limit:int)-> pd.DataFrame:
-        query=f"""SELECT product, SUM(sales) AS total_sales
-                FROM cleaned_sales_data
-                GROUP BY product
-                ORDER BY total_sales ASC 
-                LIMIT {limit}"""
-        return pd.read_sql_query(query, self.conn)
+        return Aggregate(keys=[('product', 'product')],
+                         measures=[('total_sales', 'sum', 'sales')],
+                         columns=['product'],
+                         order_by=[('total_sales', True), ('product', True)], limit=limit)
     
     #Top customers
 
+    @cached
+    @aggregate_query
     def Top_Customers(self,limit:int)-> pd.DataFrame:
-        query=f"""SELECT customer_name, SUM(sales) AS total_sales
-                FROM cleaned_sales_data
-                GROUP BY customer_name
-                ORDER BY total_sales DESC
-                LIMIT {limit}"""
-        return pd.read_sql_query(query, self.conn)
+        return Aggregate(keys=[('customer_name', 'customer_name')],
+                         measures=[('total_sales', 'sum', 'sales')],
+                         columns=['customer_name'],
+                         order_by=[('total_sales', False), ('customer_name', True)], limit=limit)
 
 #Profitability
 
     #profit from each product
 
+    @cached
+    @aggregate_query
     def Products_profits(self)-> pd.DataFrame:
-        query="""SELECT product, SUM(profit) AS profit
-                FROM cleaned_sales_data
-                GROUP BY product
-                ORDER BY profit DESC;"""
-        return pd.read_sql_query(query, self.conn)
+        return Aggregate(keys=[('product', 'product')],
+                         measures=[('profit', 'sum', 'profit')],
+                         columns=['product'],
+                         order_by=[('profit', False), ('product', True)])
     
     #customer segment and profit from each segments
 
+    @cached
+    @aggregate_query
     def Customer_Segments_Profit(self)-> pd.DataFrame:
-        query="""SELECT segment, SUM(profit) AS segment_profit
-                FROM cleaned_sales_data
-                GROUP BY segment
-                ORDER BY segment_profit DESC;"""
-        return pd.read_sql_query(query, self.conn)
+        rollup, _, m = self._summary()
+        return Aggregate(keys=[('segment', 'segment')],
+                         measures=[('segment_profit', *m['profit'])],
+                         columns=['segment'], rollup=rollup,
+                         order_by=[('segment_profit', False), ('segment', True)])
         
 
 #2. Predictive queries
 
+    #RFM (Recency, Frequency, Monetary) scores and segments
+    #one scan for all three measures, scored with NumPy (see rfm.py)
+
+    @cached
+    def RFM_scores(self, as_of=None)-> pd.DataFrame:
+        where, params = self._where()
+        query=f"""SELECT customer_id,
+                    {self._latest('customer_name')} AS customer_name,
+                    MAX(order_date) AS last_order_date,
+                    COUNT(order_id) AS frequency,
+                    SUM(sales) AS monetary
+                FROM {self._from('customer_id', 'customer_name', *self._filter_columns())}
+                {where}
+                GROUP BY customer_id
+                ORDER BY customer_id;"""
+        return score_rfm(self._read(query, params), as_of)
+
     #RFM (Recency, Frequency, Monetary) signals
 
+    @cached
     def RFM_signals(self)-> Dict[str, pd.DataFrame]:
+        rfm=self.RFM_scores()
 
-        Recency_q="""SELECT customer_id,
-                        customer_name,
-                        MAX(order_date) AS last_order_date
-                    FROM cleaned_sales_data
-                    GROUP BY customer_id;"""
-        
-        Frequency_q="""SELECT customer_id, COUNT(order_id) AS total_orders
-                    FROM cleaned_sales_data
-                    GROUP BY customer_id;"""
-
-        Monetary_q="""SELECT customer_id, SUM(sales) AS total_sales
-                    FROM cleaned_sales_data
-                    GROUP BY customer_id;"""
-        
-        Recency=pd.read_sql_query(Recency_q, self.conn)
-        Frequency=pd.read_sql_query(Frequency_q, self.conn)
-        Monetary=pd.read_sql_query(Monetary_q, self.conn)
+        Recency=rfm[['customer_id', 'customer_name', 'last_order_date']]
+        Frequency=rfm[['customer_id', 'frequency']].rename(columns={'frequency': 'total_orders'})
+        Monetary=rfm[['customer_id', 'monetary']].rename(columns={'monetary': 'total_sales'})
 
         return {
             'Recency': Recency,
@@ -196,130 +882,181 @@ class SalesAnalytics:
 
     #Monthly sales for detecting seasonal demands
 
-    def Seasonal_demands(self)-> pd.DataFrame:
-        query="""SELECT 
-            CASE strftime('%m', order_date)
-            WHEN '01' THEN 'January' WHEN '02' THEN 'February' WHEN '03' THEN 'March'
-            WHEN '04' THEN 'April' WHEN '05' THEN 'May' WHEN '06' THEN 'June'
-            WHEN '07' THEN 'July' WHEN '08' THEN 'August' WHEN '09' THEN 'September' WHEN '10' THEN 'October'
-            WHEN '11' THEN 'November' WHEN '12' THEN 'December'
-            END AS months, COUNT(order_id) AS orders, SUM(sales) AS sales
-            FROM cleaned_sales_data
-            GROUP BY months
-            ORDER BY sales DESC;"""
-        return pd.read_sql_query(query, self.conn)
+    @cached
+    @aggregate_query
+    def Seasonal_demands(self, start_date=None, end_date=None)-> pd.DataFrame:
+        rollup, d, m = self._summary(start_date=start_date, end_date=end_date)
+        return Aggregate(keys=[('months', d['month_name'])],
+                         measures=[('orders', *m['orders']), ('sales', *m['sales'])],
+                         rollup=rollup, start_date=start_date, end_date=end_date,
+                         order_by=[('sales', False), ('months', True)])
     
     #Product performance trend
 
-    def Product_performance(self)-> pd.DataFrame:
-        query="""SELECT product,
-                strftime('%Y-%m', order_date) AS month,
-                SUM(sales) AS monthly_sales
-                FROM cleaned_sales_data
-                GROUP BY product, month
-                ORDER BY product, month;"""
-        return pd.read_sql_query(query, self.conn)
+    @cached
+    @aggregate_query
+    def Product_performance(self, start_date=None, end_date=None)-> pd.DataFrame:
+        d=self.dates
+        return Aggregate(keys=[('product', 'product'), ('month_key', d['year_month_key'])],
+                         labels=[('month', d['year_month'])],
+                         measures=[('monthly_sales', 'sum', 'sales')],
+                         output=['product', 'month', 'monthly_sales'], columns=['product'],
+                         start_date=start_date, end_date=end_date,
+                         order_by=[('product', True), ('month_key', True)])
+
+    #The same rows page by page, sorted and searched on the server (see pagination.frame_view)
+
+    def Product_performance_pages(self, start_date=None, end_date=None, page_size:int=PAGE_SIZE, columns=None,
+                                  after=None, sort=None, ascending=True, search=None):
+        view = frame_view(self.Product_performance(start_date, end_date), sort, ascending, search)
+        return frame_pages(view, None, page_size, columns, after)
+
+    def Product_performance_count(self, start_date=None, end_date=None, search=None):
+        return len(frame_view(self.Product_performance(start_date, end_date), search=search)), True
+
+    #Product x month sales matrix: float32, products as index, 'YYYY-MM' months as columns
+    #(a fraction of the long Product_performance table; see trends.py)
+
+    @cached
+    def Product_matrix(self, start_date=None, end_date=None)-> pd.DataFrame:
+        return sales_matrix(self._monthly_series('product', start_date, end_date), 'product')
+
+    #Trend of every product (slope, growth, volatility), computed on the matrix
+
+    @cached
+    def Product_trends(self, start_date=None, end_date=None)-> pd.DataFrame:
+        return trend_frame(self.Product_matrix(start_date, end_date))
+
+    #Products trending up / down the most
+
+    @cached
+    def Rising_products(self, limit:int, metric='slope', start_date=None, end_date=None)-> pd.DataFrame:
+        return self._trending(limit, True, metric, start_date, end_date)
+
+    @cached
+    def Falling_products(self, limit:int, metric='slope', start_date=None, end_date=None)-> pd.DataFrame:
+        return self._trending(limit, False, metric, start_date, end_date)
     
-    #Forecasting signals (moving averages)
-
-    def Monthly_sales_forecasting(self)-> pd.DataFrame:
-        query="""SELECT
-                strftime('%Y-%m', order_date) AS month,
-                SUM(sales) AS monthly_sales
-                FROM cleaned_sales_data
-                GROUP BY month
-                ORDER BY month;"""
-        return pd.read_sql_query(query, self.conn)
+    #Forecasting signals (moving averages, exponential smoothing, seasonal naive)
+    #the total, then every category or product at once (see forecasting.py)
+
+    @cached
+    def Monthly_sales_forecasting(self, start_date=None, end_date=None,
+                                  horizon:int=FORECAST_HORIZON)-> pd.DataFrame:
+        return self._forecasts('total', horizon, start_date, end_date)
+
+    @cached
+    def Sales_forecasts(self, level='product', horizon:int=FORECAST_HORIZON,
+                        start_date=None, end_date=None)-> pd.DataFrame:
+        return self._forecasts(level, horizon, start_date, end_date)
+
+    #Backtest: forecast the last months of every level from the months before
+
+    @cached
+    def Forecast_accuracy(self, horizon:int=FORECAST_HORIZON, start_date=None, end_date=None)-> pd.DataFrame:
+        frames=[]
+        for level, series in FORECAST_LEVELS.items():
+            _, _, matrix = series_matrix(self._monthly_series(level, start_date, end_date), series)
+            frames.append(backtest(matrix, horizon).assign(level=level))
+        return pd.concat(frames, ignore_index=True)[ACCURACY_COLUMNS]
     
     #High risk orders(low profit or high aging)
+    @cached
     def High_risk_orders(self)-> pd.DataFrame:
+        return {kind: self._read(*self._high_risk_query(kind).to_sql()) for kind in HIGH_RISK_ORDERS}
 
-        Profit_q="""SELECT *
-                    FROM cleaned_sales_data
-                    WHERE profit < 0
-                    ORDER BY profit ASC;"""
-        
-        Aging_q="""SELECT *
-                FROM cleaned_sales_data
-                WHERE aging > 10
-                ORDER BY aging DESC;"""
+    #The same orders page by page (keyset pagination on the sort key, see pagination.py),
+    #for results too large to load at once; sorting and search run in SQL
 
-        Profit=pd.read_sql_query(Profit_q, self.conn)
-        Aging=pd.read_sql_query(Aging_q, self.conn)
+    def High_risk_orders_pages(self, kind='L_Profit', page_size:int=PAGE_SIZE, columns=None, after=None,
+                               sort=None, ascending=True, search=None):
+        query = self._high_risk_query(kind, columns, sort, ascending, search)
+        pages = paginate(self._read, query, page_size, after)
+        return map(compact_frame, pages) if self.compact_dtypes else pages
 
-        return {
-            'L_Profit': Profit,
-            'H_Aging':Aging,
-        }
+    def High_risk_orders_count(self, kind='L_Profit', search=None):
+        query = self._high_risk_query(kind, search=search)
+        if search:
+            # counted in SQL, no row read back
+            return int(self._read(*query.count_sql())['row_count'].sum()), True
+        return estimate_count(self._read, query, self.Count_Total_Orders()['total_orders'].sum())
     
 #3. Prescriptive queries
 
     #Products to discount (low sales + low profit)
 
+    @cached
+    @aggregate_query
     def Products_to_Discount(self)-> pd.DataFrame:
-        query="""SELECT product,
-                SUM(sales) AS sales,
-                SUM(profit) AS profit
-                FROM cleaned_sales_data
-                GROUP BY product
-                HAVING sales < 500 AND profit < 0
-                ORDER BY sales ASC, profit ASC;"""
-        return pd.read_sql_query(query, self.conn)
+        return Aggregate(keys=[('product', 'product')],
+                         measures=[('sales', 'sum', 'sales'), ('profit', 'sum', 'profit')],
+                         columns=['product'],
+                         having=[('sales', '<', 500), ('profit', '<', 0)],
+                         order_by=[('sales', True), ('profit', True), ('product', True)])
     
     #Products to Promote (High sales + High profit)
 
+    @cached
+    @aggregate_query
     def Products_to_promote(self)-> pd.DataFrame:
-        query="""SELECT product,
-                SUM(sales) AS sales,
-                SUM(profit) AS profit
-                FROM cleaned_sales_data
-                GROUP BY product
-                HAVING sales > 5000 AND profit > 1000
-                ORDER BY profit DESC;"""
-        return pd.read_sql_query(query, self.conn)
+        return Aggregate(keys=[('product', 'product')],
+                         measures=[('sales', 'sum', 'sales'), ('profit', 'sum', 'profit')],
+                         columns=['product'],
+                         having=[('sales', '>', 5000), ('profit', '>', 1000)],
+                         order_by=[('profit', False), ('product', True)])
     
     #Customers to target for loyalty program
 
+    @cached
     def Loyal_customers(self)-> pd.DataFrame:
-        query="""SELECT customer_id, customer_name,
-                SUM(sales) AS total_sales,
-                COUNT(order_id) AS total_orders
-                FROM cleaned_sales_data
-                GROUP BY customer_id
-                HAVING total_sales > 5000 OR total_orders > 15
-                ORDER BY total_sales DESC;"""
-        return pd.read_sql_query(query, self.conn)
+        rfm=self.RFM_scores()
+        loyal=rfm[(rfm['monetary'] > 5000) | (rfm['frequency'] > 15)]
+        loyal=loyal.sort_values(['monetary', 'customer_id'], ascending=[False, True],
+                                kind='stable', na_position='first')
+        return (loyal[['customer_id', 'customer_name', 'monetary', 'frequency']]
+                .rename(columns={'monetary': 'total_sales', 'frequency': 'total_orders'})
+                .reset_index(drop=True))
     
     #Customers at risk of churn(leaving the services)
 
+    @cached
     def Churning_customers(self)-> pd.DataFrame:
-        query="""SELECT customer_id, customer_name,
-                MAX(order_date) AS last_order
-                FROM cleaned_sales_data
-                GROUP BY customer_id
-                ORDER BY last_order ASC;"""
-        return pd.read_sql_query(query, self.conn)
+        rfm=self.RFM_scores()
+        churn=rfm.sort_values(['last_order_date', 'customer_id'], kind='stable', na_position='first')
+        return (churn[['customer_id', 'customer_name', 'last_order_date']]
+                .rename(columns={'last_order_date': 'last_order'})
+                .reset_index(drop=True))
+
+    def Churning_customers_pages(self, page_size:int=PAGE_SIZE, columns=None, after=None,
+                                 sort=None, ascending=True, search=None):
+        # one row per customer, already computed (and cached) in one scan by RFM_scores
+        view = frame_view(self.Churning_customers(), sort, ascending, search)
+        return frame_pages(view, 'customer_id', page_size, columns, after)
+
+    def Churning_customers_count(self, search=None):
+        return len(frame_view(self.Churning_customers(), search=search)), True
     
     #Cities requiring logistics improvement
 
+    @cached
+    @aggregate_query
     def Cities_improvement(self)-> pd.DataFrame:
-        query="""SELECT city,
-                AVG(aging) AS avg_delivery_delay
-                FROM cleaned_sales_data
-                GROUP BY city
-                ORDER BY avg_delivery_delay DESC;"""
-        return pd.read_sql_query(query, self.conn)
+        return Aggregate(keys=[('city', 'city')],
+                         measures=[('avg_delivery_delay', 'avg', 'aging')],
+                         columns=['city'],
+                         order_by=[('avg_delivery_delay', False), ('city', True)])
     
     #Ship modes requiring optimization
 
+    @cached
+    @aggregate_query
     def Optimized_shipping(self)-> pd.DataFrame:
-        query="""SELECT ship_mode,
-                AVG(aging) AS avg_delivery_days,
-                SUM(shipping_cost) AS total_cost
-                FROM cleaned_sales_data
-                GROUP BY ship_mode
-                ORDER BY avg_delivery_days DESC;"""
-        return pd.read_sql_query(query, self.conn)
+        rollup, _, m = self._summary()
+        return Aggregate(keys=[('ship_mode', 'ship_mode')],
+                         measures=[('avg_delivery_days', *m['avg_aging']),
+                                   ('total_cost', *m['shipping_cost'])],
+                         columns=['ship_mode'], rollup=rollup,
+                         order_by=[('avg_delivery_days', False), ('ship_mode', True)])
     
 
 if __name__ == "__main__":
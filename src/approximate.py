@@ -0,0 +1,469 @@
+"""
+Approximate Answers
+Sample table and heavy-hitter sketches for fast answers with error bounds
+
+Built at ingestion next to the rollup (csv_to_database --approximate):
+- <table>_sample: a stratified Bernoulli sample of the rows (about
+  SAMPLE_ROWS, stratified on region, at least MIN_STRATUM_ROWS per region
+  when it has them) with each row's sample_weight = 1 / sampling rate
+- <table>_heavy_hitters: a Space-Saving sketch (see sketches.py) of the
+  summed sales of every HEAVY_HITTERS column, with <table>_heavy_hitters_info
+  holding its error floor
+
+SalesAnalytics.approximate() answers aggregate queries from them:
+- SUM / COUNT: Horvitz-Thompson estimates of the sample, AVG: their ratio;
+  every measure gets <measure>_low / <measure>_high confidence bounds
+- unfiltered top-k by a sketched sum: the sketch, whose bounds always hold;
+  `guaranteed` marks the rows whose place in the top-k is certain
+  (at the confidence level for sample estimates)
+Queries neither can answer run exactly.
+
+Usage:
+    python src/approximate.py [build|check] [db_path] [table_name] [confidence]
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import time
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+try:
+    from src.sketches import SpaceSaving
+except ImportError:  # run as a script: python src/approximate.py
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    from src.sketches import SpaceSaving
+
+SAMPLE_ROWS = 100_000
+MIN_STRATUM_ROWS = 2_000
+STRATA_COLUMN = 'region'
+
+# column -> measure whose sum its heavy hitters are ranked by
+HEAVY_HITTERS = {
+    'customer_name': 'sales',
+    'product': 'sales',
+}
+HEAVY_HITTER_CAPACITY = 10_000
+
+CONFIDENCE = 0.95
+
+_CHUNK_ROWS = 100_000
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def sample_name(table_name='cleaned_sales_data'):
+    return f'{table_name}_sample'
+
+
+def heavy_hitters_name(table_name='cleaned_sales_data'):
+    return f'{table_name}_heavy_hitters'
+
+
+def _has_table(conn, name):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def has_sample(conn, table_name='cleaned_sales_data'):
+    """True if the sample table of table_name exists."""
+    return _has_table(conn, sample_name(table_name))
+
+
+def heavy_hitter_columns(conn, table_name='cleaned_sales_data'):
+    """{column: (measure, floor, total)} of the heavy-hitter sketches of table_name."""
+    info = f'{heavy_hitters_name(table_name)}_info'
+    if not _has_table(conn, info):
+        return {}
+    return {column: (measure, floor, total) for column, measure, floor, total
+            in conn.execute(f'SELECT key_column, measure, floor, total FROM "{info}"')}
+
+
+def z_score(confidence=CONFIDENCE):
+    """Two-sided normal quantile of a confidence level (1.96 for 0.95)."""
+    if not 0 < confidence < 1:
+        raise ValueError(f"confidence must be between 0 and 1, got {confidence}")
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def t_scores(confidence, dof):
+    """
+    Two-sided Student t quantiles for an array of degrees of freedom: exact
+    for 1 and 2, a Cornish-Fisher expansion (within 1%) from 3 on, NaN below 1.
+    Small groups of the sample get wider bounds than z_score would give.
+    """
+    z = z_score(confidence)
+    v = np.asarray(dof, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (z + (z ** 3 + z) / (4 * v) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * v ** 2)
+             + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * v ** 3))
+    p = 0.5 + confidence / 2
+    t = np.where(v == 2, (2 * p - 1) / np.sqrt(2 * p * (1 - p)), t)
+    t = np.where(v == 1, np.tan(np.pi * confidence / 2), t)
+    return np.where(v >= 1, t, np.nan)
+
+
+# ========================
+# Building
+# ========================
+def build_sample(conn, table_name='cleaned_sales_data', rows=SAMPLE_ROWS):
+    """
+    (Re)build the stratified sample of table_name
+
+    Every stratum is sampled at rate rows / total rows, raised so it
+    contributes at least MIN_STRATUM_ROWS rows (all of them when smaller).
+
+    Args:
+        conn (sqlite3.Connection): Connection opened with isolation_level=None
+        table_name (str): Raw sales table (or star / partition view)
+        rows (int): Target sample size
+
+    Returns:
+        int: Number of sampled rows
+    """
+    strata = conn.execute(f'SELECT {STRATA_COLUMN}, COUNT(*) FROM "{table_name}" '
+                          f'GROUP BY {STRATA_COLUMN}').fetchall()
+    total = sum(n for _, n in strata)
+    rates = {stratum: min(1.0, max(rows * n / max(total, 1), MIN_STRATUM_ROWS) / n) for stratum, n in strata}
+    whens, params = [], []
+    for stratum, rate in rates.items():
+        if stratum is not None:
+            whens.append("WHEN ? THEN ?")
+            params += [stratum, rate]
+    rate_sql = f"CASE {STRATA_COLUMN} {' '.join(whens)} ELSE ? END" if whens else "?"
+    params.append(rates.get(None, 1.0))
+
+    # explicit columns: the source may be a view (star schema, partitions)
+    columns = ', '.join(f'"{row[1]}"' for row in conn.execute(f'PRAGMA table_info("{table_name}")'))
+    name = sample_name(table_name)
+    conn.execute("BEGIN")
+    try:
+        conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+        # random() is uniform over 64-bit integers: scaled to [0, 1)
+        conn.execute(f"""CREATE TABLE "{name}" AS
+                        SELECT {columns}, 1.0 / rate AS sample_weight
+                        FROM (SELECT *, {rate_sql} AS rate FROM "{table_name}")
+                        WHERE random() / 18446744073709551616.0 + 0.5 < rate""", params)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+
+
+def build_heavy_hitters(conn, table_name='cleaned_sales_data', capacity=HEAVY_HITTER_CAPACITY):
+    """
+    (Re)build the heavy-hitter sketches of table_name in one streamed pass
+
+    Returns:
+        int: Number of items kept over all sketches
+    """
+    sketches = {column: SpaceSaving(capacity) for column in HEAVY_HITTERS}
+    selected = ', '.join(dict.fromkeys([*HEAVY_HITTERS, *HEAVY_HITTERS.values()]))
+    for chunk in pd.read_sql_query(f'SELECT {selected} FROM "{table_name}"', conn, chunksize=_CHUNK_ROWS):
+        for column, measure in HEAVY_HITTERS.items():
+            sketches[column].add(chunk[column], chunk[measure].fillna(0))
+
+    name = heavy_hitters_name(table_name)
+    conn.execute("BEGIN")
+    try:
+        conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+        conn.execute(f'DROP TABLE IF EXISTS "{name}_info"')
+        conn.execute(f'CREATE TABLE "{name}" (key_column TEXT, item TEXT, count REAL, error REAL)')
+        conn.execute(f'CREATE TABLE "{name}_info" (key_column TEXT, measure TEXT, floor REAL, '
+                     f'total REAL, capacity INTEGER)')
+        for column, sketch in sketches.items():
+            conn.executemany(f'INSERT INTO "{name}" VALUES (?, ?, ?, ?)',
+                             ((column, str(item), float(count), float(error)) for item, count, error
+                              in sketch.top().itertuples(index=False)))
+            conn.execute(f'INSERT INTO "{name}_info" VALUES (?, ?, ?, ?, ?)',
+                         (column, HEAVY_HITTERS[column], sketch.floor, sketch.total, capacity))
+        conn.execute(f'CREATE INDEX "ix_{name}" ON "{name}" (key_column, count DESC, item)')
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return sum(len(sketch.counts) for sketch in sketches.values())
+
+
+def can_approximate(conn, table_name='cleaned_sales_data'):
+    """True if table_name has the strata and heavy-hitter columns."""
+    columns = {row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+    return all(col in columns for col in [STRATA_COLUMN, *HEAVY_HITTERS, *HEAVY_HITTERS.values()])
+
+
+def sync_approximate(conn, table_name='cleaned_sales_data', requested=False):
+    """
+    Rebuild the sample and sketches after a load (when they exist or are requested)
+
+    Args:
+        conn (sqlite3.Connection): Connection opened with isolation_level=None
+        table_name (str): Table that was loaded
+        requested (bool): Create them if they don't exist yet
+
+    Returns:
+        bool: True if they were rebuilt
+    """
+    if not (requested or has_sample(conn, table_name) or heavy_hitter_columns(conn, table_name)):
+        return False
+    if not can_approximate(conn, table_name):
+        print(f" WARNING: '{table_name}' lacks the columns for approximate answers, skipped")
+        return False
+    rows = build_sample(conn, table_name)
+    items = build_heavy_hitters(conn, table_name)
+    print(f" Sample '{sample_name(table_name)}': {rows:,} rows, "
+          f"heavy hitters '{heavy_hitters_name(table_name)}': {items:,} items")
+    return True
+
+
+# ========================
+# Estimation
+# ========================
+def _plain(expr):
+    return bool(_IDENTIFIER.match(expr))
+
+
+def sample_eligible(aggregate):
+    """
+    True if the sample can answer an Aggregate (see scan_planner.Aggregate):
+    raw rows, plain column keys, SUM / COUNT / AVG of plain columns, no
+    HAVING (a threshold on an estimate), no bottom-k (groups missing from
+    the sample would be the smallest)
+    """
+    if aggregate.rollup or aggregate.having:
+        return False
+    if not all(_plain(expr) for _, expr in aggregate.keys + aggregate.labels):
+        return False
+    if not all(func in ('sum', 'count', 'avg') and (arg == '*' or _plain(arg))
+               for _, func, arg in aggregate.measures):
+        return False
+    if aggregate.limit is not None and (not aggregate.order_by or aggregate.order_by[0][1]):
+        return False
+    return True
+
+
+def _sample_partials(alias, func, arg):
+    """(column, SQL) of the weighted sums a measure is estimated from; w = sample_weight."""
+    w = "sample_weight"
+    present = "1" if arg == '*' else f"({arg} IS NOT NULL)"
+    if func == 'count':
+        return [(f'{alias}__t', f"SUM({w} * {present})"), (f'{alias}__v', f"SUM({w} * ({w} - 1) * {present})")]
+    parts = [(f'{alias}__t', f"SUM({w} * {arg})"), (f'{alias}__v', f"SUM({w} * ({w} - 1) * {arg} * {arg})")]
+    if func == 'avg':
+        parts += [(f'{alias}__n', f"SUM({w} * {present})"),
+                  (f'{alias}__v1', f"SUM({w} * ({w} - 1) * {arg})"),
+                  (f'{alias}__v0', f"SUM({w} * ({w} - 1) * {present})")]
+    return parts
+
+
+def sample_query(aggregate, source, where=''):
+    """SQL of the weighted partial sums of an Aggregate over the sample table source."""
+    groups = aggregate.group_expressions
+    select = [f"{expr} AS {expr}" for expr in groups]
+    select += [f"{sql} AS {column}" for alias, func, arg in aggregate.measures
+               for column, sql in _sample_partials(alias, func, arg)]
+    select.append("COUNT(*) AS sample__rows")
+    sql = f"SELECT {', '.join(select)}\n FROM {source}\n {where}"
+    if groups:
+        sql += f"\n GROUP BY {', '.join(groups)}"
+    return sql
+
+
+def _estimate(partials, alias, func):
+    """(estimate, standard error) of one measure from its weighted sums."""
+    total = partials[f'{alias}__t'].astype('float64')
+    variance = partials[f'{alias}__v'].astype('float64')
+    if func != 'avg':
+        return total, np.sqrt(variance.clip(lower=0))
+    n = partials[f'{alias}__n'].astype('float64')
+    ratio = total / n.where(n != 0)
+    # linearised variance of a ratio estimator: sum w(w-1)(y - ratio)^2 / n^2
+    linear = (variance - 2 * ratio * partials[f'{alias}__v1'] + ratio ** 2 * partials[f'{alias}__v0'])
+    return ratio, np.sqrt(linear.clip(lower=0)) / n.where(n != 0)
+
+
+def sample_result(aggregate, partials, confidence=CONFIDENCE):
+    """
+    Result of an Aggregate estimated from the sample partials
+
+    Returns:
+        pd.DataFrame: The aggregate's columns (estimates), <measure>_low and
+                      <measure>_high bounds, and `guaranteed` if it has a limit
+    """
+    # t with (sampled rows - 1) degrees of freedom: bounds of tiny groups are wide, of one row unknown
+    z = t_scores(confidence, partials['sample__rows'].to_numpy() - 1)
+    result = pd.DataFrame(index=partials.index)
+    for alias, expr in aggregate.keys + aggregate.labels:
+        result[alias] = partials[expr]
+    bounds = {}
+    for alias, func, _ in aggregate.measures:
+        estimate, error = _estimate(partials, alias, func)
+        low, high = estimate - z * error, estimate + z * error
+        if func == 'count':
+            estimate, low = estimate.fillna(0).round().astype('int64'), low.clip(lower=0)
+        result[alias] = estimate
+        bounds[f'{alias}_low'], bounds[f'{alias}_high'] = low, high
+    result = result.assign(**bounds)
+    return _rank(aggregate, result, [c for a in aggregate.output if f'{a}_low' in bounds
+                                     for c in (f'{a}_low', f'{a}_high')])
+
+
+def _rank(aggregate, result, bound_columns):
+    """ORDER BY / LIMIT of an estimated result; top-k rows get `guaranteed`."""
+    if aggregate.order_by:
+        aliases = [a for a, _ in aggregate.order_by]
+        ascending = [asc for _, asc in aggregate.order_by]
+        result = result.sort_values(aliases, ascending=ascending, kind='stable',
+                                    na_position='first' if ascending[0] else 'last')
+    columns = aggregate.output + bound_columns
+    if aggregate.limit is None:
+        return result[columns].reset_index(drop=True)
+    # a row's rank is certain when its lower bound beats the upper bound of every row left out
+    measure = aggregate.order_by[0][0]
+    top, rest = result.head(int(aggregate.limit)), result.iloc[int(aggregate.limit):]
+    best_left_out = rest[f'{measure}_high'].max() if len(rest) else -np.inf
+    top = top[columns].assign(guaranteed=top[f'{measure}_low'] >= best_left_out)
+    return top.reset_index(drop=True)
+
+
+def heavy_hitters_eligible(aggregate, columns):
+    """
+    True if a heavy-hitter sketch can answer an Aggregate: a top-k of one
+    sketched column by the sum of its measure, over all rows
+
+    Args:
+        columns (dict): Sketched column -> (measure, floor, total), see heavy_hitter_columns
+    """
+    if len(aggregate.keys) != 1 or aggregate.labels or len(aggregate.measures) != 1:
+        return False
+    if aggregate.rollup or aggregate.having or aggregate.start_date or aggregate.end_date:
+        return False
+    (_, column), (alias, func, arg) = aggregate.keys[0], aggregate.measures[0]
+    return (column in columns and func == 'sum' and arg == columns[column][0]
+            and aggregate.limit is not None and bool(aggregate.order_by)
+            and aggregate.order_by[0] == (alias, False))
+
+
+def heavy_hitters_query(table_name='cleaned_sales_data'):
+    """SQL of the k + 1 largest items of one sketch (parameters: column, k + 1)."""
+    return (f'SELECT item, count, error FROM "{heavy_hitters_name(table_name)}"\n'
+            f' WHERE key_column = ?\n ORDER BY count DESC, item\n LIMIT ?')
+
+
+def heavy_hitters_result(aggregate, items, floor):
+    """
+    Top-k of an Aggregate from the k + 1 largest sketch items
+
+    The estimate is the sketch count (an upper bound of the true total),
+    the lower bound count - error; both bounds always hold. A row is
+    guaranteed when its lower bound beats every item it could be confused
+    with: the (k+1)-th item and anything the sketch no longer tracks (floor).
+    """
+    (key, _), (alias, _, _) = aggregate.keys[0], aggregate.measures[0]
+    k = int(aggregate.limit)
+    result = pd.DataFrame({key: items['item'], alias: items['count'],
+                           f'{alias}_low': items['count'] - items['error'], f'{alias}_high': items['count']})
+    result = result.sort_values([alias, key], ascending=[False, True], kind='stable')
+    rival = max(result[alias].iloc[k] if len(result) > k else 0.0, floor)
+    top = result.head(k)
+    top = top[aggregate.output + [f'{alias}_low', f'{alias}_high']].assign(
+        guaranteed=top[f'{alias}_low'] >= rival)
+    return top.reset_index(drop=True)
+
+
+# ========================
+# Command line
+# ========================
+def check_approximate(db_path='database/ecommerce.db', confidence=CONFIDENCE):
+    """
+    Compare approximate and exact answers of the supported methods
+
+    Returns:
+        bool: True if every exact value lies within its bounds
+    """
+    try:
+        from src.analytics import SalesAnalytics
+    except ImportError:  # run as a script: src/ is on sys.path
+        from analytics import SalesAnalytics
+
+    exact = SalesAnalytics(os.path.abspath(db_path), use_cache=False)
+    approx = exact.approximate(confidence=confidence)
+    calls = {'Top_Customers': (10,), 'Best_Products': (10,), 'Regional_Sales': (), 'Cities_improvement': ()}
+    within_all = True
+    for name, args in calls.items():
+        start = time.perf_counter()
+        expected = getattr(exact, name)(*args)
+        exact_s = time.perf_counter() - start
+        start = time.perf_counter()
+        estimated = getattr(approx, name)(*args)
+        approx_s = time.perf_counter() - start
+
+        key, measure = expected.columns[0], expected.columns[-1]
+        method = estimated.attrs.get('approximate', {}).get('method', 'exact')
+        merged = estimated.merge(expected, on=key, how='left', suffixes=('', '_exact'))
+        truth = merged[f'{measure}_exact']
+        if f'{measure}_low' in merged:
+            # groups with a single sampled row have no bounds
+            merged, truth = merged[merged[f'{measure}_low'].notna()], truth[merged[f'{measure}_low'].notna()]
+            slack = 1e-9 * truth.abs()
+            within = (truth >= merged[f'{measure}_low'] - slack) & (truth <= merged[f'{measure}_high'] + slack)
+        else:
+            within = truth == merged[measure]
+        same_top = list(estimated[key]) == list(expected[key].head(len(estimated)))
+        print(f"   {name:20s} {method:13s} exact {exact_s:7.3f}s  approximate {approx_s:7.3f}s  "
+              f"{within.mean():6.1%} of {len(within)} within bounds, {len(estimated)}/{len(expected)} groups"
+              + (f", same ranking: {same_top}" if 'guaranteed' in estimated else ''))
+        # a confidence interval misses now and then; deterministic bounds never may
+        within_all &= bool(within.all()) if method != 'sample' else within.mean() >= confidence - 0.1
+    return within_all
+
+
+def approximate_database(db_path='database/ecommerce.db', table_name='cleaned_sales_data', command='check',
+                         confidence=CONFIDENCE):
+    """
+    Build the sample and sketches, or check the answers they give
+
+    Returns:
+        bool: True if successful (check: exact answers within the bounds)
+    """
+    print("APPROXIMATE ANSWERS")
+
+    if not os.path.exists(db_path):
+        print(f" ERROR: Database not found: {db_path}")
+        return False
+
+    if command == 'build':
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        try:
+            return sync_approximate(conn, table_name, requested=True)
+        finally:
+            conn.close()
+
+    conn = sqlite3.connect(db_path)
+    try:
+        ready = has_sample(conn, table_name) or heavy_hitter_columns(conn, table_name)
+    finally:
+        conn.close()
+    if not ready:
+        print(f" No sample for '{table_name}' (build it with: python src/approximate.py build)")
+        return False
+    print(f"\n Approximate vs exact at {confidence:.0%} confidence:")
+    return check_approximate(db_path, confidence)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'check'
+    db_path = sys.argv[2] if len(sys.argv) > 2 else 'database/ecommerce.db'
+    table_name = sys.argv[3] if len(sys.argv) > 3 else 'cleaned_sales_data'
+    confidence = float(sys.argv[4]) if len(sys.argv) > 4 else CONFIDENCE
+    if command not in ('build', 'check'):
+        print(" Usage: python src/approximate.py [build|check] [db_path] [table_name] [confidence]")
+        sys.exit(1)
+    sys.exit(0 if approximate_database(db_path, table_name, command, confidence) else 1)
@@ -0,0 +1,170 @@
+"""
+Backend Parity Check & Benchmark
+Runs every SalesAnalytics method on the SQLite and DuckDB backends,
+checks the DataFrames are identical and times both
+
+Usage:
+    python src/csv_to_database.py convert data/cleaned_sales_data.csv --parquet
+    python src/backend_parity.py [db_path] [parquet_path] [repeat]
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import os
+import sys
+import time
+from typing import Dict, List
+
+import pandas as pd
+
+try:
+    from src.analytics import SalesAnalytics
+except ImportError:  # run as a script: python src/backend_parity.py
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    from src.analytics import SalesAnalytics
+
+
+# method name -> positional arguments
+METHODS = {
+    # descriptive
+    'Count_Total_Orders': (),
+    'Sales_generated_Profit': (),
+    'Categorical_Sales': (),
+    'Regional_Sales': (),
+    'Monthly_Sales': (),
+    'Yearly_Sales': (),
+    'Best_Products': (10,),
+    'Worst_Products': (10,),
+    'Top_Customers': (10,),
+    'Products_profits': (),
+    'Customer_Segments_Profit': (),
+    # predictive
+    'RFM_signals': (),
+    'RFM_scores': (),
+    'Seasonal_demands': (),
+    'Product_performance': (),
+    'Monthly_sales_forecasting': (),
+    'High_risk_orders': (),
+    # prescriptive
+    'Products_to_Discount': (),
+    'Products_to_promote': (),
+    'Loyal_customers': (),
+    'Churning_customers': (),
+    'Cities_improvement': (),
+    'Optimized_shipping': (),
+}
+
+
+def run_methods(analytics: SalesAnalytics) -> Dict[str, pd.DataFrame]:
+    """
+    Call every method in METHODS; dict results (RFM_signals, High_risk_orders)
+    are flattened to 'method.key'
+    """
+    results = {}
+    for name, args in METHODS.items():
+        result = getattr(analytics, name)(*args)
+        if isinstance(result, dict):
+            for key, df in result.items():
+                results[f'{name}.{key}'] = df
+        else:
+            results[name] = result
+    return results
+
+
+def frame_mismatch(expected: pd.DataFrame, result: pd.DataFrame, rtol: float = 1e-9):
+    """
+    Difference between two results (columns, values and dtypes), None if identical;
+    floating point values within rtol
+    """
+    try:
+        # an empty SQL result has object columns whatever the query selects
+        pd.testing.assert_frame_equal(expected, result, check_dtype=not expected.empty,
+                                      check_exact=False, rtol=rtol)
+    except AssertionError as e:
+        return str(e)
+    return None
+
+
+def compare_backends(a: SalesAnalytics, b: SalesAnalytics, rtol: float = 1e-9) -> List[str]:
+    """
+    Compare every method on two SalesAnalytics instances: same columns,
+    values and dtypes
+
+    Args:
+        a, b (SalesAnalytics): Instances on different backends (or layouts)
+        rtol (float): Relative tolerance for floating point sums
+                      (the engines add in a different order)
+
+    Returns:
+        list: One message per mismatching result (empty if identical)
+    """
+    left, right = run_methods(a), run_methods(b)
+    mismatches = []
+    for name in left:
+        message = frame_mismatch(left[name], right[name], rtol)
+        if message is not None:
+            mismatches.append(f"{name}: {message}")
+    return mismatches
+
+
+def time_backend(analytics: SalesAnalytics, repeat: int = 3) -> Dict[str, float]:
+    """Best-of-`repeat` wall time (seconds) per method."""
+    timings = {}
+    for name, args in METHODS.items():
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            getattr(analytics, name)(*args)
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+    return timings
+
+
+def parity_report(db_path='database/ecommerce.db', parquet_path='database/cleaned_sales_data.parquet',
+                  repeat=3):
+    """
+    Print the parity check and a per-method benchmark of both backends
+
+    Returns:
+        bool: True if every method returned identical results
+    """
+    print("BACKEND PARITY CHECK")
+
+    # uncached, so the benchmark times the engines
+    sqlite_backend = SalesAnalytics(db_path, use_cache=False)
+    duckdb_backend = SalesAnalytics(db_path, backend='duckdb', parquet_relative_path=parquet_path,
+                                    use_cache=False)
+    try:
+        rows = sqlite_backend.Count_Total_Orders().iloc[0, 0]
+        print(f"\n Orders: {rows:,}")
+
+        mismatches = compare_backends(sqlite_backend, duckdb_backend)
+        if mismatches:
+            print(f"\n {len(mismatches)} mismatching result(s):")
+            for message in mismatches:
+                print(f"   - {message}")
+        else:
+            print(f"\n All {len(METHODS)} methods return identical results")
+
+        print(f"\n Benchmark (best of {repeat}):")
+        sqlite_times = time_backend(sqlite_backend, repeat)
+        duckdb_times = time_backend(duckdb_backend, repeat)
+        print(f"   {'method':30s} | {'sqlite':>9s} | {'duckdb':>9s} | {'speedup':>8s}")
+        for name in METHODS:
+            s, d = sqlite_times[name], duckdb_times[name]
+            print(f"   {name:30s} | {s:8.3f}s | {d:8.3f}s | {s / max(d, 1e-9):7.1f}x")
+        total_s, total_d = sum(sqlite_times.values()), sum(duckdb_times.values())
+        print(f"   {'TOTAL':30s} | {total_s:8.3f}s | {total_d:8.3f}s | {total_s / max(total_d, 1e-9):7.1f}x")
+    finally:
+        sqlite_backend.close()
+        duckdb_backend.close()
+
+    return not mismatches
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'database/ecommerce.db'
+    parquet_path = sys.argv[2] if len(sys.argv) > 2 else 'database/cleaned_sales_data.parquet'
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    sys.exit(0 if parity_report(db_path, parquet_path, repeat) else 1)
@@ -0,0 +1,331 @@
+"""
+Benchmark Suite
+Times the whole pipeline on synthetic data and checks for regressions
+
+Generates (once, then reused) a deterministic synthetic dataset of the
+requested size (see synthetic_data.py) and times
+- ingest: csv_to_database of the whole file (streaming in chunks above
+  STREAMING_ROWS rows) and multiple_csvs_to_database of the same rows split
+  over INGEST_FILES files
+- analytics: every SalesAnalytics method of the backend parity workload,
+  uncached, best of `repeat` runs
+- reports: every ReportGenerator report, uncached
+With --workers N the analytics and reports run their scans in N processes
+(SalesAnalytics.parallel, see parallel_aggregate.py).
+Results go to a JSON file (timings plus the machine, versions and settings).
+Given a baseline (a previous results file), every timing more than
+`tolerance` slower than the baseline and by more than NOISE_FLOOR_SECONDS is
+a regression and the run exits with status 1. Everything runs offline.
+
+Usage:
+    python src/benchmark.py [--rows 100k] [--seed 0] [--layout flat] [--repeat 3]
+                            [--suites ingest,analytics,reports] [--workdir benchmarks/work]
+                            [--output results.json] [--baseline benchmarks/baseline.json]
+                            [--save-baseline] [--tolerance 0.25] [--workers 8]
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    from src.analytics import SalesAnalytics
+    from src.backend_parity import time_backend
+    from src.csv_to_database import csv_to_database, multiple_csvs_to_database
+    from src.excel_reporter import ReportGenerator
+    from src.synthetic_data import parse_rows, write_csv, write_csv_files
+except ImportError:  # run as a script: python src/benchmark.py
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    from src.analytics import SalesAnalytics
+    from src.backend_parity import time_backend
+    from src.csv_to_database import csv_to_database, multiple_csvs_to_database
+    from src.excel_reporter import ReportGenerator
+    from src.synthetic_data import parse_rows, write_csv, write_csv_files
+
+SUITES = ['ingest', 'analytics', 'reports']
+
+# Storage layouts -> csv_to_database options
+LAYOUTS = {
+    'flat': {},
+    'rollup': {'rollup': True},
+    'indexed': {'rollup': True, 'index': True},
+    'star': {'star_schema': True, 'rollup': True},
+    'partitioned': {'partition': 'year', 'rollup': True},
+}
+
+# Above this many rows the single-file load streams in chunks (bounded memory)
+STREAMING_ROWS = 1_000_000
+CHUNK_ROWS = 100_000
+
+# Files of the multiple_csvs_to_database load
+INGEST_FILES = 4
+
+# A timing regresses when it is this fraction slower than the baseline ...
+REGRESSION_TOLERANCE = 0.25
+# ... and slower by more than this many seconds (timer and scheduling noise)
+NOISE_FLOOR_SECONDS = 0.05
+
+REPORTS = {
+    'descriptive': 'generate_descriptive_reports',
+    'predictive': 'generate_predictive_reports',
+    'prescriptive': 'generate_prescriptive_reports',
+}
+
+TABLE_NAME = 'cleaned_sales_data'
+
+
+def _quiet():
+    """Swallow the progress output of the loaders and reports."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def _remove_database(db_path):
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    shutil.rmtree(os.path.join(os.path.dirname(db_path), '.cache'), ignore_errors=True)
+
+
+def machine_info():
+    """Machine and library versions a result was measured with."""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+        'sqlite': sqlite3.sqlite_version,
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def prepare_data(rows, seed, workdir):
+    """
+    The synthetic CSV and its split into INGEST_FILES files, generated on first use
+
+    Returns:
+        tuple: (csv path, folder of the split files)
+    """
+    csv_path = os.path.join(workdir, f"sales_{rows}_{seed}.csv")
+    folder = os.path.join(workdir, f"sales_{rows}_{seed}_parts")
+    if not os.path.exists(csv_path):
+        print(f" Generating {rows:,} rows: {csv_path}")
+        write_csv(csv_path + '.tmp', rows, seed, workers=os.cpu_count())
+        os.replace(csv_path + '.tmp', csv_path)
+    if not os.path.isdir(folder):
+        write_csv_files(folder + '.tmp', rows, INGEST_FILES, seed, workers=os.cpu_count())
+        os.replace(folder + '.tmp', folder)
+    return csv_path, folder
+
+
+def bench_ingest(csv_path, folder, db_path, rows, layout):
+    """Wall time of loading the single file (into db_path) and the split files (into a scratch database)."""
+    options = LAYOUTS[layout]
+    timings = {}
+    _remove_database(db_path)
+    chunksize = CHUNK_ROWS if rows > STREAMING_ROWS else None
+    start = time.perf_counter()
+    with _quiet():
+        ok = csv_to_database(csv_path, TABLE_NAME, db_path=db_path, chunksize=chunksize, **options)
+    timings['ingest.csv_to_database'] = {'seconds': time.perf_counter() - start, 'rows': rows}
+    if not ok:
+        raise RuntimeError(f"csv_to_database failed on {csv_path}")
+
+    multi_path = os.path.join(os.path.dirname(db_path), 'benchmark_multi.db')
+    _remove_database(multi_path)
+    start = time.perf_counter()
+    with _quiet():
+        ok = multiple_csvs_to_database(folder, db_path=multi_path, table_name=TABLE_NAME, **options)
+    timings['ingest.multiple_csvs_to_database'] = {'seconds': time.perf_counter() - start, 'rows': rows}
+    _remove_database(multi_path)
+    if not ok:
+        raise RuntimeError(f"multiple_csvs_to_database failed on {folder}")
+    return timings
+
+
+def bench_analytics(db_path, repeat=3, workers=None):
+    """Best-of-`repeat` wall time of every SalesAnalytics method, uncached."""
+    analytics = SalesAnalytics(db_path, use_cache=False)
+    try:
+        timed = analytics.parallel(workers) if workers else analytics
+        return {f"analytics.{name}": {'seconds': seconds}
+                for name, seconds in time_backend(timed, repeat).items()}
+    finally:
+        analytics.close()
+
+
+def bench_reports(db_path, report_path, workers=None):
+    """Wall time of every ReportGenerator report (Excel files included), uncached."""
+    generator = ReportGenerator(db_path, report_path)
+    generator.analytics.close()
+    # same dtypes as the generator's own analytics
+    generator.analytics = SalesAnalytics(db_path, use_cache=False).compact(generator.analytics.compact_dtypes)
+    if workers:
+        generator.analytics = generator.analytics.parallel(workers)
+    timings = {}
+    try:
+        for name, method in REPORTS.items():
+            start = time.perf_counter()
+            with _quiet():
+                getattr(generator, method)()
+            timings[f"report.{name}"] = {'seconds': time.perf_counter() - start}
+    finally:
+        generator.analytics.close()
+    return timings
+
+
+def run_benchmark(rows='100k', seed=0, layout='flat', repeat=3, suites=SUITES, workdir='benchmarks/work',
+                  workers=None):
+    """
+    Run the suites on a synthetic dataset
+
+    Returns:
+        dict: {'meta': settings and machine, 'timings': name -> {'seconds', ...}}
+    """
+    rows = parse_rows(rows)
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout '{layout}', expected one of {list(LAYOUTS)}")
+    unknown = [suite for suite in suites if suite not in SUITES]
+    if unknown:
+        raise ValueError(f"Unknown suite(s) {unknown}, expected some of {SUITES}")
+    workdir = os.path.abspath(workdir)
+    os.makedirs(workdir, exist_ok=True)
+    csv_path, folder = prepare_data(rows, seed, workdir)
+    db_path = os.path.join(workdir, f"benchmark_{rows}_{seed}_{layout}.db")
+
+    timings = {}
+    if 'ingest' in suites:
+        print(" Ingest ...")
+        timings.update(bench_ingest(csv_path, folder, db_path, rows, layout))
+    elif not os.path.exists(db_path):
+        with _quiet():
+            csv_to_database(csv_path, TABLE_NAME, db_path=db_path,
+                            chunksize=CHUNK_ROWS if rows > STREAMING_ROWS else None, **LAYOUTS[layout])
+    if 'analytics' in suites:
+        print(" Analytics ...")
+        timings.update(bench_analytics(db_path, repeat, workers))
+    if 'reports' in suites:
+        print(" Reports ...")
+        timings.update(bench_reports(db_path, os.path.join(workdir, 'reports'), workers))
+
+    return {
+        'meta': {
+            'rows': rows, 'seed': seed, 'layout': layout, 'repeat': repeat, 'suites': list(suites),
+            'workers': workers,
+            'recorded': datetime.datetime.now().isoformat(timespec='seconds'),
+            'machine': machine_info(),
+        },
+        'timings': timings,
+    }
+
+
+def compare_to_baseline(results, baseline, tolerance=REGRESSION_TOLERANCE, noise_floor=NOISE_FLOOR_SECONDS):
+    """
+    Timings of `results` slower than the baseline's by more than `tolerance`
+    (a fraction) and more than `noise_floor` seconds
+
+    Returns:
+        list: (name, baseline seconds, seconds) of every regression
+    """
+    regressions = []
+    for name, timing in results['timings'].items():
+        before = baseline['timings'].get(name)
+        if before is None:
+            continue
+        seconds, base = timing['seconds'], before['seconds']
+        if seconds > base * (1 + tolerance) and seconds - base > noise_floor:
+            regressions.append((name, base, seconds))
+    return regressions
+
+
+def comparable(results, baseline):
+    """Settings that differ between the results and the baseline (empty if comparable)."""
+    return [key for key in ('rows', 'seed', 'layout', 'workers')
+            if results['meta'].get(key) != baseline['meta'].get(key)]
+
+
+def print_results(results, baseline=None):
+    """One line per timing, with the change against the baseline."""
+    meta = results['meta']
+    workers = f"{meta['workers']} workers, " if meta.get('workers') else ''
+    print(f"\n {meta['rows']:,} rows, seed {meta['seed']}, layout {meta['layout']}, {workers}"
+          f"{meta['machine']['cpus']} CPU(s), SQLite {meta['machine']['sqlite']}")
+    print(f"   {'timing':45s} | {'seconds':>9s} | {'baseline':>9s} | {'change':>8s}")
+    for name, timing in results['timings'].items():
+        before = (baseline or {}).get('timings', {}).get(name)
+        base = f"{before['seconds']:8.3f}s" if before else f"{'-':>9s}"
+        change = f"{(timing['seconds'] / before['seconds'] - 1) * 100:+7.1f}%" if before and before['seconds'] else f"{'-':>8s}"
+        print(f"   {name:45s} | {timing['seconds']:8.3f}s | {base} | {change}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {'--rows': '100k', '--seed': '0', '--layout': 'flat', '--repeat': '3',
+               '--suites': ','.join(SUITES), '--workdir': 'benchmarks/work', '--output': None,
+               '--baseline': 'benchmarks/baseline.json', '--tolerance': str(REGRESSION_TOLERANCE),
+               '--workers': None}
+    save_baseline = "--save-baseline" in args
+    if save_baseline:
+        args.remove("--save-baseline")
+    for flag in list(options):
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            del args[i:i + 2]
+    if args:
+        print(f" ERROR: Unknown argument(s) {args}")
+        print("   python src/benchmark.py [--rows 100k] [--layout flat] [--suites ingest,analytics,reports] "
+              "[--baseline benchmarks/baseline.json] [--save-baseline]")
+        sys.exit(1)
+
+    print("BENCHMARK")
+    results = run_benchmark(options['--rows'], int(options['--seed']), options['--layout'],
+                            int(options['--repeat']), options['--suites'].split(','), options['--workdir'],
+                            int(options['--workers']) if options['--workers'] else None)
+
+    output = options['--output'] or os.path.join(
+        options['--workdir'], f"results_{results['meta']['rows']}_{results['meta']['layout']}.json")
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    baseline_path = options['--baseline']
+    baseline = None
+    if baseline_path and os.path.exists(baseline_path) and not save_baseline:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        differing = comparable(results, baseline)
+        if differing:
+            print(f" WARNING: baseline {baseline_path} was recorded with other {', '.join(differing)}, not compared")
+            baseline = None
+
+    print_results(results, baseline)
+    print(f"\n Results: {output}")
+
+    if save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_path)), exist_ok=True)
+        shutil.copyfile(output, baseline_path)
+        print(f" Baseline saved: {baseline_path}")
+    elif baseline is not None:
+        regressions = compare_to_baseline(results, baseline, float(options['--tolerance']))
+        if regressions:
+            print(f"\n ERROR: {len(regressions)} regression(s) against {baseline_path} "
+                  f"(> {float(options['--tolerance']) * 100:.0f}% slower):")
+            for name, before, seconds in regressions:
+                print(f"   {name}: {before:.3f}s -> {seconds:.3f}s")
+            sys.exit(1)
+        print(f" No regressions against {baseline_path}")
+    else:
+        print(" No baseline to compare with (record one with --save-baseline)")
@@ -0,0 +1,180 @@
+"""
+Compact Dtypes
+Memory-optimized dtypes for SalesAnalytics results
+
+pd.read_sql_query returns every text column as a string per row, every
+number as int64 / float64 and dates as text. SalesAnalytics.compact()
+returns (and caches) results converted by compact_frame:
+- dimension columns (product, city, region, ...) and other text columns
+  with mostly repeated values: categoricals (one code per row)
+- other text: Arrow-backed strings (pandas 3 reads them so already)
+- integers downcast to the smallest type that holds them; floats to
+  float32 only where that is exact (sums of money stay float64)
+- order / ship / last order dates: datetime64
+The rows and values are the same; Streamlit and the Excel writer get
+smaller frames (categoricals go to Arrow as dictionary arrays).
+
+Usage:
+    python src/compact_dtypes.py [db_path]
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Columns that hold a few repeated values in every result they appear in
+CATEGORY_COLUMNS = {'product', 'product_category', 'city', 'state', 'country', 'region', 'segment',
+                    'ship_mode', 'order_priority', 'month', 'months', 'year', 'level', 'rfm_segment'}
+
+# Text columns holding ISO dates
+DATE_COLUMNS = {'order_date', 'ship_date', 'last_order_date', 'last_order'}
+
+# Other text columns become categorical when at most this share of their values is distinct
+CATEGORY_MAX_DISTINCT = 0.5
+
+
+def _arrow_strings():
+    """Arrow-backed string dtype, None without pyarrow."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+    return pd.StringDtype('pyarrow')
+
+
+def _is_text(column: pd.Series) -> bool:
+    if isinstance(column.dtype, pd.StringDtype):
+        return True
+    return column.dtype == object and pd.api.types.infer_dtype(column, skipna=True) in ('string', 'empty')
+
+
+def compact_column(name, column: pd.Series) -> pd.Series:
+    """One column in its compact dtype (unchanged when none applies)."""
+    kind = column.dtype.kind
+    if kind in 'iu':
+        return pd.to_numeric(column, downcast='integer' if kind == 'i' else 'unsigned')
+    if kind == 'f':
+        narrow = column.astype(np.float32)
+        # only where every value survives the round trip
+        if ((narrow.astype(np.float64) == column) | column.isna()).all():
+            return narrow
+        return column
+    if not _is_text(column):
+        return column
+    if name in DATE_COLUMNS:
+        dates = pd.to_datetime(column, errors='coerce', format='ISO8601')
+        if dates.notna().sum() == column.notna().sum():
+            return dates
+    if name in CATEGORY_COLUMNS or column.nunique(dropna=True) <= CATEGORY_MAX_DISTINCT * len(column):
+        return column.astype('category')
+    arrow = _arrow_strings()
+    if arrow is not None and column.dtype != arrow and not isinstance(column.dtype, pd.StringDtype):
+        return column.astype(arrow)
+    return column
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    DataFrame with every column in its compact dtype
+
+    Returns:
+        pd.DataFrame: Same rows, columns, index and attrs
+    """
+    compact = pd.DataFrame({name: compact_column(name, df[name]) for name in df.columns}, index=df.index)
+    compact.attrs = dict(df.attrs)
+    return compact
+
+
+def compact_result(result):
+    """compact_frame of a result: a DataFrame or a dict of them (anything else as is)."""
+    if isinstance(result, pd.DataFrame):
+        return compact_frame(result)
+    if isinstance(result, dict):
+        return {name: compact_result(value) for name, value in result.items()}
+    return result
+
+
+def frame_bytes(result) -> int:
+    """Deep memory usage of a DataFrame or a dict of them."""
+    if isinstance(result, dict):
+        return sum(frame_bytes(value) for value in result.values())
+    return int(result.memory_usage(index=True, deep=True).sum())
+
+
+def same_values(default: pd.DataFrame, compact: pd.DataFrame) -> bool:
+    """True if a compact frame holds the values of the default one."""
+    if list(default.columns) != list(compact.columns) or len(default) != len(compact):
+        return False
+    for col in default.columns:
+        left, right = default[col], compact[col]
+        if right.dtype.kind == 'M':
+            left = pd.to_datetime(left, format='ISO8601')
+        else:
+            right = right.astype(left.dtype)
+        try:
+            pd.testing.assert_series_equal(left, right, check_dtype=False, check_names=False, check_index=False)
+        except AssertionError:
+            return False
+    return True
+
+
+def _to_arrow_seconds(result) -> float:
+    """Time to convert a result to Arrow tables, as Streamlit does before sending it."""
+    import pyarrow as pa
+    frames = result.values() if isinstance(result, dict) else [result]
+    start = time.perf_counter()
+    for df in frames:
+        pa.Table.from_pandas(df)
+    return time.perf_counter() - start
+
+
+# ========================
+# Memory report
+# ========================
+def compact_report(db_path='database/ecommerce.db',
+                   methods=('Product_performance', 'High_risk_orders', 'Churning_customers', 'RFM_scores')):
+    """
+    Memory and Arrow conversion time of some results, default vs compact dtypes
+
+    Returns:
+        bool: True if every compact result holds the same values
+    """
+    try:
+        from src.analytics import SalesAnalytics
+    except ImportError:  # run as a script: python src/compact_dtypes.py
+        sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+        from src.analytics import SalesAnalytics
+
+    print("COMPACT DTYPES")
+    analytics = SalesAnalytics(db_path, use_cache=False)
+    compact = analytics.compact()
+    same = True
+    print(f"\n   {'method':22s} {'rows':>10s} {'default':>11s} {'compact':>11s} {'smaller':>8s} "
+          f"{'to Arrow':>9s} {'compact':>9s}")
+    for name in methods:
+        default, small = getattr(analytics, name)(), getattr(compact, name)()
+        rows = sum(len(df) for df in default.values()) if isinstance(default, dict) else len(default)
+        before, after = frame_bytes(default), frame_bytes(small)
+        print(f"   {name:22s} {rows:>10,} {before / 2**20:9.1f}MiB {after / 2**20:9.1f}MiB "
+              f"{before / max(after, 1):7.1f}x {_to_arrow_seconds(default):8.3f}s {_to_arrow_seconds(small):8.3f}s")
+        pairs = default.items() if isinstance(default, dict) else [(None, default)]
+        for key, df in pairs:
+            if not same_values(df, small[key] if key is not None else small):
+                print(f"   WARNING: {name} {key or ''} values changed")
+                same = False
+    print("\n Compact results hold the same values" if same else "\n Some values changed")
+    return same
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'database/ecommerce.db'
+    if not os.path.exists(db_path):
+        print(f" ERROR: Database not found: {db_path}")
+        sys.exit(1)
+    sys.exit(0 if compact_report(db_path) else 1)
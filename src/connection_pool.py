@@ -0,0 +1,333 @@
+"""
+Connection Pool
+Read-only SQLite connections shared by the threads of one process
+
+SalesAnalytics used to open one connection per instance and share it across
+threads (check_same_thread=False), so concurrent dashboard sessions queued
+behind each other on it. The pool hands each thread its own connection:
+- read-only (URI mode=ro) with memory-mapped I/O and a small private page cache
+- a prepared statement cache, reused by every query with bound parameters
+- the database is switched to WAL once, so readers never block a load
+  and a load never blocks readers
+- a thread that already holds a connection gets the same one back
+  (nested calls such as RFM_signals -> RFM_scores)
+- at most `size` connections; a thread waits up to `timeout` seconds for
+  one to be released, and the waits are counted (info)
+PRAGMA data_version only means something on one connection, so the pool
+keeps a separate monitor connection for the result cache's version check.
+
+Usage:
+    python src/connection_pool.py [db_path] [threads] [queries_per_thread]
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# Connections per database (concurrent readers)
+POOL_SIZE = 8
+
+# Seconds a thread waits for a free connection before TimeoutError
+POOL_TIMEOUT = 30.0
+
+# Per connection: memory-mapped bytes of the file and private page cache (KiB).
+# Mapped pages are shared by all connections through the OS page cache, so
+# the private cache stays small instead of holding a copy per connection.
+MMAP_SIZE = 256 * 1024 * 1024
+CACHE_SIZE_KB = 2 * 1024
+
+# Prepared statements kept per connection (keyed on the SQL text, so queries
+# with bound parameters are prepared once and reused for any values)
+STATEMENT_CACHE_SIZE = 256
+
+
+def enable_wal(db_path):
+    """
+    Switch a database to WAL journaling (persistent, a no-op if it already is)
+
+    Returns:
+        bool: True if the database is in WAL mode
+    """
+    try:
+        conn = sqlite3.connect(db_path, timeout=5)
+        try:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            if mode.lower() != 'wal':
+                mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        finally:
+            conn.close()
+    except sqlite3.OperationalError as e:  # read-only file or a load holding the lock
+        print(f" WARNING: could not switch {db_path} to WAL: {e}")
+        return False
+    return mode.lower() == 'wal'
+
+
+class ConnectionPool:
+    """
+    Bounded pool of read-only connections to one SQLite database
+
+    Args:
+        db_path (str): Path to database file
+        size (int): Maximum number of connections
+        timeout (float): Seconds to wait for a free connection
+        mmap_size (int): PRAGMA mmap_size of each connection
+        cache_size_kb (int): PRAGMA cache_size of each connection, in KiB
+        wal (bool): Switch the database to WAL first
+    """
+
+    def __init__(self, db_path, size=POOL_SIZE, timeout=POOL_TIMEOUT, mmap_size=MMAP_SIZE,
+                 cache_size_kb=CACHE_SIZE_KB, wal=True):
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1, got {size}")
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"Database not found at {db_path}")
+        self.db_path = os.path.abspath(db_path)
+        self.size = size
+        self.timeout = timeout
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
+        self.wal = enable_wal(self.db_path) if wal else False
+        self.closed = False
+        self.stats = {'acquisitions': 0, 'waits': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0,
+                      'timeouts': 0}
+
+        self._idle = queue.LifoQueue()  # most recently used first: its pages are warm
+        self._created = 0
+        self._in_use = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._monitor = None
+        self._monitor_lock = threading.Lock()
+
+    def _connect(self):
+        uri = f"file:{urllib.parse.quote(self.db_path)}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kb)}")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """The calling thread's connection for the duration of the block."""
+        held = getattr(self._local, 'held', None)
+        if held is not None:
+            held[1] += 1
+            try:
+                yield held[0]
+            finally:
+                held[1] -= 1
+            return
+
+        conn = self._acquire()
+        self._local.held = [conn, 1]
+        try:
+            yield conn
+        finally:
+            self._local.held = None
+            self._release(conn)
+
+    def _acquire(self):
+        if self.closed:
+            raise RuntimeError(f"Connection pool of {self.db_path} is closed")
+        start = time.perf_counter()
+        waited = False
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                waited = True
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self.stats['timeouts'] += 1
+                    raise TimeoutError(f"No free connection to {self.db_path} within {self.timeout}s "
+                                       f"({self.size} in use)")
+        wait = time.perf_counter() - start
+        with self._lock:
+            self._in_use += 1
+            self.stats['acquisitions'] += 1
+            if waited:
+                self.stats['waits'] += 1
+                self.stats['wait_seconds'] += wait
+                self.stats['max_wait_seconds'] = max(self.stats['max_wait_seconds'], wait)
+        return conn
+
+    def _release(self, conn):
+        with self._lock:
+            self._in_use -= 1
+            if self.closed:
+                self._created -= 1
+        if self.closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def monitor(self):
+        """Dedicated connection for PRAGMA data_version checks (one thread at a time)."""
+        with self._monitor_lock:
+            if self.closed:
+                raise RuntimeError(f"Connection pool of {self.db_path} is closed")
+            if self._monitor is None:
+                self._monitor = self._connect()
+            yield self._monitor
+
+    def info(self):
+        """Pool size, connections open / in use and wait counters."""
+        with self._lock:
+            acquisitions = self.stats['acquisitions']
+            return {**self.stats, 'size': self.size, 'open': self._created, 'in_use': self._in_use,
+                    'avg_wait_seconds': self.stats['wait_seconds'] / acquisitions if acquisitions else 0.0,
+                    'wal': self.wal, 'db_path': self.db_path}
+
+    def close(self):
+        """Close idle connections now and the ones in use when they are released."""
+        with self._lock:
+            self.closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+        with self._monitor_lock:
+            if self._monitor is not None:
+                self._monitor.close()
+                self._monitor = None
+
+
+# Pools shared by every SalesAnalytics instance of this process
+# (the dashboard creates a new instance on every rerun)
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def shared_pool(db_path, size=POOL_SIZE):
+    """The process-wide ConnectionPool of db_path."""
+    key = (os.path.abspath(db_path), size)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None or pool.closed:
+            pool = _POOLS[key] = ConnectionPool(db_path, size)
+        return pool
+
+
+@atexit.register
+def close_pools():
+    """Close every shared pool (runs at interpreter exit)."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
+
+
+# ========================
+# Concurrency check
+# ========================
+def _latencies(connect, query, threads, queries, background=None):
+    """
+    Per-query seconds (including the wait for a connection) of `threads`
+    threads running `query` `queries` times each, optionally while another
+    thread keeps running the `background` query
+    """
+    latencies = []
+    done = threading.Event()
+
+    def reader():
+        for _ in range(queries):
+            start = time.perf_counter()
+            with connect() as conn:
+                conn.execute(query).fetchall()
+            latencies.append(time.perf_counter() - start)
+
+    def heavy():
+        while not done.is_set():
+            with connect() as conn:
+                conn.execute(background).fetchall()
+
+    with ThreadPoolExecutor(threads + 1) as executor:
+        worker = executor.submit(heavy) if background else None
+        for future in [executor.submit(reader) for _ in range(threads)]:
+            future.result()
+        done.set()
+        if worker:
+            worker.result()
+    return sorted(latencies)
+
+
+def concurrency_report(db_path='database/ecommerce.db', threads=16, queries=5,
+                       table_name='cleaned_sales_data'):
+    """
+    Print query latency of concurrent dashboard-style readers on one shared
+    connection (the previous behaviour) and on the pool: short lookups while
+    a long aggregate runs, and many aggregates at once
+    """
+    print("CONNECTION POOL")
+    short = f"SELECT * FROM {table_name} LIMIT 50"
+    long = f"SELECT customer_name, SUM(sales) FROM {table_name} GROUP BY customer_name"
+
+    shared = sqlite3.connect(db_path, check_same_thread=False)
+    shared_lock = threading.Lock()
+
+    @contextmanager
+    def shared_connection():
+        with shared_lock:  # what a shared connection amounts to
+            yield shared
+
+    pool = ConnectionPool(db_path)
+    try:
+        print(f"\n {threads} threads x {queries} queries, {pool.size} pooled connections, "
+              f"WAL: {pool.wal}, {os.cpu_count()} CPU(s)")
+        for title, query, background in (("short queries during a long aggregate", short, long),
+                                          ("long aggregates", long, None)):
+            print(f"\n {title}:")
+            for name, connect in (("shared connection", shared_connection), ("connection pool", pool.connection)):
+                start = time.perf_counter()
+                latencies = _latencies(connect, query, threads, queries, background)
+                elapsed = time.perf_counter() - start
+                p95 = latencies[int(0.95 * (len(latencies) - 1))]
+                print(f"   {name:18s}: median {latencies[len(latencies) // 2] * 1000:8.1f} ms, "
+                      f"p95 {p95 * 1000:8.1f} ms, total {elapsed:.2f}s")
+        info = pool.info()
+        print(f"\n Pool waits: {info['waits']} of {info['acquisitions']} acquisitions, "
+              f"avg {info['avg_wait_seconds'] * 1000:.1f} ms, max {info['max_wait_seconds'] * 1000:.1f} ms")
+    finally:
+        shared.close()
+        pool.close()
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'database/ecommerce.db'
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    queries = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    if not os.path.exists(db_path):
+        print(f" ERROR: Database not found: {db_path}")
+        sys.exit(1)
+    concurrency_report(db_path, threads, queries)
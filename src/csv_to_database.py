@@ -6,12 +6,452 @@ Author: Vishank
 Created: 10 December 2025
 """
 
+import numpy as np
 import pandas as pd
 import sqlite3
 import os
 import glob
+import sys
+import time
+import hashlib
+import warnings
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 
-def csv_to_database(csv_path, table_name=None, db_path='database/ecommerce.db'):
+try:
+    from src.star_schema import is_star_view, build_star_schema, drop_star_schema, merge_into_star
+    from src.sketches import HyperLogLog, KLLQuantiles, HashSampleCounter, ReservoirSample, hash_values
+    from src.index_builder import build_indexes
+    from src.rollup import has_rollup, stage_keys, apply_rollup_delta, sync_rollup
+    from src.approximate import sync_approximate
+    from src.partitions import is_partitioned, partition_table, drop_partitions, merge_into_partitions
+    from src.result_cache import bump_data_version
+    from src.profiler import PROFILER, profiled
+except ImportError:  # run as a script: python src/csv_to_database.py
+    from star_schema import is_star_view, build_star_schema, drop_star_schema, merge_into_star
+    from sketches import HyperLogLog, KLLQuantiles, HashSampleCounter, ReservoirSample, hash_values
+    from index_builder import build_indexes
+    from rollup import has_rollup, stage_keys, apply_rollup_delta, sync_rollup
+    from approximate import sync_approximate
+    from partitions import is_partitioned, partition_table, drop_partitions, merge_into_partitions
+    from result_cache import bump_data_version
+    # the registry SalesAnalytics records into (index_builder) is src.profiler's
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    from src.profiler import PROFILER, profiled
+
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
+
+# Pragmas used while bulk loading (speed over durability until the load commits).
+# No exclusive locking mode: with WAL the dashboard's read-only connections
+# (connection_pool.py) keep reading the last committed data during a load.
+LOADER_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+]
+
+
+def clean_column_names(columns):
+    """
+    Clean column names for use as SQLite identifiers
+    (strip, spaces to underscores, drop special chars, lowercase)
+    
+    Args:
+        columns (iterable): Original column names
+    
+    Returns:
+        pd.Index: Cleaned column names
+    """
+    columns = pd.Index(columns).str.strip()  # Remove whitespace
+    columns = columns.str.replace(' ', '_')  # Replace spaces with underscore
+    columns = columns.str.replace('[^a-zA-Z0-9_]', '', regex=True)  # Remove special chars
+    return columns.str.lower()  # Lowercase
+
+
+def peak_memory_mb():
+    """
+    Peak resident memory of this process in MB (None if unavailable)
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes on Linux
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+@profiled('ingest')
+def stream_csv_to_table(csv_path, table_name, conn, chunksize=100_000, upsert_key=None):
+    """
+    Stream a CSV file into a table chunk by chunk inside one transaction
+    Memory stays bounded by the chunk size, not the file size
+    
+    Args:
+        csv_path (str): Path to CSV file
+        table_name (str): Name of the table to (re)create
+        conn (sqlite3.Connection): Open database connection
+        chunksize (int): Rows per chunk
+        upsert_key (str): If given, keep the existing table and upsert rows
+                          keyed on this column instead of replacing the table
+                          (an existing rollup of the table is updated per chunk)
+    
+    Returns:
+        dict: rows inserted plus max order_date seen (high-water mark)
+    """
+    for pragma in LOADER_PRAGMAS:
+        conn.execute(pragma)
+    
+    stats = {'rows': 0, 'max_order_date': None}
+    columns = None
+    insert_sql = None
+    maintain_rollup = False
+    cursor = conn.cursor()
+    
+    cursor.execute("BEGIN")
+    try:
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            if columns is None:
+                # Clean column names once and create the table from the first chunk
+                columns = clean_column_names(chunk.columns)
+                chunk.columns = columns
+                if upsert_key is None:
+                    _drop_layout(conn, table_name)
+                    cursor.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+                    cursor.execute(pd.io.sql.get_schema(chunk, table_name))
+                else:
+                    _prepare_upsert_table(cursor, chunk, table_name, upsert_key)
+                    maintain_rollup = has_rollup(conn, table_name)
+                insert_sql = _insert_statement(table_name, columns, upsert_key)
+            else:
+                chunk.columns = columns
+            
+            if maintain_rollup:
+                # replaced rows leave the rollup before the write, new versions join after it
+                stage_keys(conn, chunk[upsert_key].tolist(), key_column=upsert_key)
+                apply_rollup_delta(conn, table_name, upsert_key, sign=-1)
+            cursor.executemany(insert_sql, _frame_rows(chunk))
+            if maintain_rollup:
+                apply_rollup_delta(conn, table_name, upsert_key, sign=1)
+            stats['rows'] += len(chunk)
+            _update_watermark(stats, chunk)
+            print(f"   ... {stats['rows']:,} rows streamed")
+        
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+    finally:
+        conn.execute("PRAGMA synchronous=NORMAL")
+    
+    return stats
+
+
+def _drop_layout(conn, table_name):
+    """Remove a star schema or partitioned layout stored under table_name (if any)."""
+    if is_star_view(conn, table_name):
+        drop_star_schema(conn, table_name)
+    elif is_partitioned(conn, table_name):
+        drop_partitions(conn, table_name)
+
+
+def _merge_function(conn, table_name):
+    """merge_into_star / merge_into_partitions for a star or partitioned table, else None."""
+    if is_star_view(conn, table_name):
+        return merge_into_star
+    if is_partitioned(conn, table_name):
+        return merge_into_partitions
+    return None
+
+
+@profiled('ingest')
+def _partition_layout(conn, table_name, granularity):
+    """Switch a freshly loaded table to the partitioned layout (see partitions.py)."""
+    if is_partitioned(conn, table_name):
+        return
+    if is_star_view(conn, table_name):
+        print(" WARNING: partitioning needs the flat layout (not --star), skipped")
+        return
+    print(f" Partitioning '{table_name}' by {granularity}")
+    count = partition_table(conn, table_name, granularity)
+    print(f"   {count} partition(s)")
+
+
+def _frame_rows(df):
+    """Rows of a DataFrame as tuples for executemany."""
+    # Column-wise tolist() is much faster than itertuples() for wide frames
+    return zip(*(df[col].tolist() for col in df.columns))
+
+
+def _prepare_upsert_table(cursor, chunk, table_name, upsert_key):
+    """Create the table if missing and make sure the upsert key is unique."""
+    if upsert_key not in chunk.columns:
+        raise ValueError(f"Upsert key '{upsert_key}' not found in CSV columns")
+    cursor.execute(pd.io.sql.get_schema(chunk, table_name).replace(
+        'CREATE TABLE', 'CREATE TABLE IF NOT EXISTS', 1))
+    # ON CONFLICT needs a unique index on the key
+    index_name = f"ux_{table_name}_{upsert_key}"
+    if cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+                      (index_name,)).fetchone() is None:
+        duplicate = cursor.execute(
+            f'SELECT "{upsert_key}", COUNT(*) FROM "{table_name}" '
+            f'GROUP BY "{upsert_key}" HAVING COUNT(*) > 1 LIMIT 1'
+        ).fetchone()
+        if duplicate is not None:
+            raise ValueError(f"Table '{table_name}' cannot be upserted on '{upsert_key}': "
+                             f"{upsert_key} {duplicate[0]!r} appears {duplicate[1]} times "
+                             f"(reload it without incremental mode first)")
+        cursor.execute(f'CREATE UNIQUE INDEX "{index_name}" ON "{table_name}" ("{upsert_key}")')
+
+
+def _insert_statement(table_name, columns, upsert_key=None):
+    """Build the INSERT (or INSERT ... ON CONFLICT DO UPDATE) statement."""
+    column_list = ', '.join(f'"{col}"' for col in columns)
+    placeholders = ', '.join('?' * len(columns))
+    sql = f'INSERT INTO "{table_name}" ({column_list}) VALUES ({placeholders})'
+    if upsert_key is not None:
+        updates = ', '.join(f'"{col}" = excluded."{col}"' for col in columns if col != upsert_key)
+        sql += f' ON CONFLICT("{upsert_key}") DO UPDATE SET {updates}'
+    return sql
+
+
+def _update_watermark(stats, chunk):
+    """
+    Track the max order_date seen so far (ISO dates: their text order is their time order)
+    Order ids are not tracked: they start with a market prefix (AU-2015-...), so their
+    maximum is not the latest order
+    """
+    if 'order_date' in chunk.columns and chunk['order_date'].notna().any():
+        chunk_max = chunk['order_date'].dropna().astype(str).max()
+        if stats['max_order_date'] is None or chunk_max > stats['max_order_date']:
+            stats['max_order_date'] = chunk_max
+
+
+# ========================
+# Incremental loading
+# ========================
+LOAD_METADATA_TABLE = '_load_metadata'
+
+
+def file_fingerprint(path, block_size=1024 * 1024):
+    """
+    Fingerprint a source file: size, mtime and sha256 of its content
+    
+    Args:
+        path (str): Path to file
+        block_size (int): Bytes read per hashing step
+    
+    Returns:
+        dict: size, mtime, content_hash
+    """
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            sha.update(block)
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime, 'content_hash': sha.hexdigest()}
+
+
+def _ensure_metadata_table(conn):
+    conn.execute(f"""CREATE TABLE IF NOT EXISTS {LOAD_METADATA_TABLE} (
+                        table_name TEXT NOT NULL,
+                        source_path TEXT NOT NULL,
+                        file_size INTEGER,
+                        file_mtime REAL,
+                        content_hash TEXT,
+                        rows_loaded INTEGER,
+                        max_order_date TEXT,
+                        loaded_at TEXT,
+                        PRIMARY KEY (table_name, source_path)
+                    )""")
+
+
+def _already_loaded(conn, table_name, csv_path):
+    """
+    Check the metadata table for this file
+    Size + mtime is the fast path; the content hash decides when they changed
+    (a touched or renamed file with identical content is still skipped)
+    
+    Returns:
+        tuple: (bool already_loaded, dict fingerprint or None)
+    """
+    source_path = os.path.abspath(csv_path)
+    stat = os.stat(csv_path)
+    row = conn.execute(
+        f"""SELECT file_size, file_mtime FROM {LOAD_METADATA_TABLE}
+            WHERE table_name = ? AND source_path = ?""",
+        (table_name, source_path),
+    ).fetchone()
+    if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime:
+        return True, None
+    
+    fingerprint = file_fingerprint(csv_path)
+    seen = conn.execute(
+        f"""SELECT 1 FROM {LOAD_METADATA_TABLE}
+            WHERE table_name = ? AND content_hash = ?""",
+        (table_name, fingerprint['content_hash']),
+    ).fetchone()
+    return seen is not None, fingerprint
+
+
+@profiled('ingest')
+def incremental_load(csv_path, table_name, conn, key_column='order_id', chunksize=100_000):
+    """
+    Incrementally load one CSV file into a table
+    Skips files already loaded (by fingerprint), upserts new rows keyed on key_column
+    and records the file fingerprint + high-water mark in the metadata table
+    
+    Args:
+        csv_path (str): Path to CSV file
+        table_name (str): Target table
+        conn (sqlite3.Connection): Connection opened with isolation_level=None
+        key_column (str): Upsert key
+        chunksize (int): Rows per chunk
+    
+    Returns:
+        dict: status ('skipped' or 'loaded') plus load stats
+    """
+    _ensure_metadata_table(conn)
+    
+    loaded, fingerprint = _already_loaded(conn, table_name, csv_path)
+    if loaded:
+        return {'status': 'skipped', 'rows': 0}
+    
+    merge = _merge_function(conn, table_name)
+    if merge is not None:
+        # Star / partitioned layout: upsert into a wide staging table, then merge it in
+        staging = f'{table_name}_staging'
+        conn.execute(f'DROP TABLE IF EXISTS "{staging}"')
+        stats = stream_csv_to_table(csv_path, staging, conn, chunksize, upsert_key=key_column)
+        merge(conn, staging, table_name, key_column, *_rollup_hooks(conn, table_name, staging, key_column))
+    else:
+        stats = stream_csv_to_table(csv_path, table_name, conn, chunksize, upsert_key=key_column)
+    _record_load(conn, table_name, csv_path, fingerprint, stats)
+    stats['status'] = 'loaded'
+    return stats
+
+
+def _rollup_hooks(conn, table_name, staging, key_column):
+    """
+    (before_merge, after_merge) callables for merge_into_star / merge_into_partitions that keep the
+    rollup of table_name in step with the merge ((None, None) if it has none)
+    """
+    if not has_rollup(conn, table_name):
+        return None, None
+    
+    def before_merge(conn):
+        stage_keys(conn, source_table=staging, key_column=key_column)
+        apply_rollup_delta(conn, table_name, key_column, sign=-1)
+    
+    def after_merge(conn):
+        apply_rollup_delta(conn, table_name, key_column, sign=1)
+    
+    return before_merge, after_merge
+
+
+def _record_load(conn, table_name, csv_path, fingerprint, stats):
+    """Store the file fingerprint and high-water mark in the metadata table."""
+    # named columns: metadata tables of older loads also hold a (no longer written) max_order_id
+    conn.execute(
+        f"""INSERT OR REPLACE INTO {LOAD_METADATA_TABLE}
+            (table_name, source_path, file_size, file_mtime, content_hash, rows_loaded,
+             max_order_date, loaded_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'))""",
+        (table_name, os.path.abspath(csv_path), fingerprint['size'], fingerprint['mtime'],
+         fingerprint['content_hash'], stats['rows'], stats['max_order_date']),
+    )
+
+
+def get_load_watermark(conn, table_name):
+    """
+    High-water mark of everything loaded incrementally into a table
+    
+    Returns:
+        dict: files, rows, max_order_date, last_loaded_at
+    """
+    _ensure_metadata_table(conn)
+    row = conn.execute(
+        f"""SELECT COUNT(*), SUM(rows_loaded), MAX(max_order_date), MAX(loaded_at)
+            FROM {LOAD_METADATA_TABLE}
+            WHERE table_name = ?""",
+        (table_name,),
+    ).fetchone()
+    return dict(zip(['files', 'rows', 'max_order_date', 'last_loaded_at'], row))
+
+
+def _arrow_type(declared_type):
+    """Arrow type for a declared SQLite column type (SQLite type affinity rules)."""
+    import pyarrow as pa
+
+    declared_type = (declared_type or '').upper()
+    if 'INT' in declared_type:
+        return pa.int64()
+    if any(t in declared_type for t in ('REAL', 'FLOA', 'DOUB')):
+        return pa.float64()
+    return pa.string()
+
+
+def export_parquet_snapshot(db_path, table_name='cleaned_sales_data', parquet_path=None, chunksize=500_000):
+    """
+    Write a table (or star view) to a Parquet snapshot for the columnar
+    backend of SalesAnalytics (backend='duckdb')
+    The file is written in row groups of chunksize rows and swapped in atomically
+
+    Args:
+        db_path (str): Path to database file
+        table_name (str): Table or view to export
+        parquet_path (str): Output file (default: <db folder>/<table_name>.parquet)
+        chunksize (int): Rows per row group
+
+    Returns:
+        str: Path of the snapshot
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if parquet_path is None:
+        parquet_path = os.path.join(os.path.dirname(db_path), f'{table_name}.parquet')
+    tmp_path = parquet_path + '.tmp'
+
+    conn = sqlite3.connect(db_path)
+    try:
+        columns = conn.execute(f'PRAGMA table_info("{table_name}")').fetchall()
+        if not columns:
+            raise ValueError(f"Table '{table_name}' not found in {db_path}")
+        # Schema from the declared types, so every row group agrees even if a chunk is all NULL
+        schema = pa.schema([(col[1], _arrow_type(col[2])) for col in columns])
+
+        with pq.ParquetWriter(tmp_path, schema, compression='snappy') as writer:
+            for chunk in pd.read_sql_query(f'SELECT * FROM "{table_name}"', conn, chunksize=chunksize):
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, parquet_path)
+    return parquet_path
+
+
+@profiled('ingest')
+def _export_snapshot(db_path, table_name):
+    """Export the Parquet snapshot and report it (used by the loaders)."""
+    start = time.perf_counter()
+    path = export_parquet_snapshot(db_path, table_name)
+    print(f" Parquet snapshot: {path} ({os.path.getsize(path) / 1024 / 1024:.2f} MB, "
+          f"{time.perf_counter() - start:.2f} s)")
+
+
+@profiled('ingest')
+def csv_to_database(csv_path, table_name=None, db_path='database/ecommerce.db', chunksize=None,
+                    incremental=False, star_schema=False, parquet=False, index=False, rollup=False,
+                    partition=None, approximate=False):
     """
     Loading CSV file into SQLite database
     
@@ -19,6 +459,23 @@ def csv_to_database(csv_path, table_name=None, db_path='database/ecommerce.db'):
         csv_path (str): Path to CSV file
         table_name (str): Name for database table (filename)
         db_path (str): Path to database file
+        chunksize (int): If given, stream the file in chunks of this many rows
+                         (bounded memory, for multi-GB files)
+        incremental (bool): Upsert into the existing table keyed on order_id
+                            and skip the file if it was already loaded
+        star_schema (bool): Store the table as a fact table plus dictionary-encoded
+                            dimension tables behind a view (see star_schema.py)
+        parquet (bool): Also write a Parquet snapshot of the table for
+                        SalesAnalytics(backend='duckdb')
+        index (bool): Create workload-derived covering indexes, run ANALYZE
+                      and print the query plans (see index_builder.py)
+        rollup (bool): Maintain the pre-aggregated rollup table (see rollup.py);
+                       an existing rollup is always kept up to date
+        partition (str): 'year' or 'month': store the table as one partition per
+                         period of order_date behind a view (see partitions.py)
+        approximate (bool): Keep a sample table and heavy-hitter sketches for
+                            approximate answers (see approximate.py); existing
+                            ones are always rebuilt
     
     Returns:
         bool: True if successful
@@ -40,19 +497,23 @@ def csv_to_database(csv_path, table_name=None, db_path='database/ecommerce.db'):
             table_name = os.path.splitext(os.path.basename(csv_path))[0]
             table_name = table_name.lower().replace(' ', '_').replace('-', '_')
         
+        if chunksize or incremental:
+            return _stream_csv_to_database(csv_path, table_name, db_path,
+                                           chunksize or 100_000, incremental, star_schema, parquet, index,
+                                           rollup, partition, approximate)
+        
         print(f"\n Reading CSV: {csv_path}")
         
         # Read CSV file
-        df = pd.read_csv(csv_path)
+        with PROFILER.span('ingest', 'read_csv') as sample:
+            df = pd.read_csv(csv_path)
+            sample['rows'] = len(df)
         
         print(f" Loaded {len(df)} rows, {len(df.columns)} columns")
         print(f"\nOriginal columns: {', '.join(df.columns)}")
         
         # Clean column names
-        df.columns = df.columns.str.strip()  # Remove whitespace
-        df.columns = df.columns.str.replace(' ', '_')  # Replace spaces with underscore
-        df.columns = df.columns.str.replace('[^a-zA-Z0-9_]', '', regex=True)  # Remove special chars
-        df.columns = df.columns.str.lower()  # Lowercase
+        df.columns = clean_column_names(df.columns)
         
         print(f"Cleaned columns: {', '.join(df.columns)}")
         
@@ -72,7 +533,25 @@ def csv_to_database(csv_path, table_name=None, db_path='database/ecommerce.db'):
         
         # Load data into database
         print(f"\n Loading data into table: '{table_name}'")
-        df.to_sql(table_name, conn, if_exists='replace', index=False)
+        _drop_layout(conn, table_name)
+        with PROFILER.span('ingest', 'write', rows=len(df)):
+            df.to_sql(table_name, conn, if_exists='replace', index=False)
+        
+        if star_schema:
+            print(f" Building star schema for '{table_name}'")
+            conn.isolation_level = None
+            with PROFILER.span('ingest', 'star_schema'):
+                build_star_schema(conn, table_name)
+        
+        conn.isolation_level = None
+        if partition:
+            _partition_layout(conn, table_name, partition)
+        with PROFILER.span('ingest', 'rollup'):
+            sync_rollup(conn, table_name, requested=rollup)
+        with PROFILER.span('ingest', 'approximate'):
+            sync_approximate(conn, table_name, requested=approximate)
+        # cached SalesAnalytics results of the old data are stale now
+        bump_data_version(conn)
         
         # Verify
         cursor = conn.cursor()
@@ -87,6 +566,12 @@ def csv_to_database(csv_path, table_name=None, db_path='database/ecommerce.db'):
         
         conn.close()
         
+        if index:
+            print(f"\n Building indexes for '{table_name}'")
+            with PROFILER.span('ingest', 'indexes'):
+                build_indexes(db_path, table_name)
+        if parquet:
+            _export_snapshot(db_path, table_name)
        
         print(" CONVERSION COMPLETE!")
         
@@ -104,14 +589,303 @@ def csv_to_database(csv_path, table_name=None, db_path='database/ecommerce.db'):
         return False
 
 
-def multiple_csvs_to_database(csv_folder, db_path='database/ecommerce.db'):
+def _stream_csv_to_database(csv_path, table_name, db_path, chunksize, incremental=False,
+                            star_schema=False, parquet=False, index=False, rollup=False, partition=None,
+                            approximate=False):
+    """
+    Streaming / incremental mode of csv_to_database
+    (see stream_csv_to_table and incremental_load)
+    Reports rows/sec and peak memory at the end
+    
+    Returns:
+        bool: True if successful
+    """
+    print(f"\n Streaming CSV: {csv_path} ({chunksize:,} rows per chunk)")
+    
+    # Create database directory if needed
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    
+    print(f"\n Creating/connecting to database: {db_path}")
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    changed = True
+    
+    try:
+        print(f"\n Loading data into table: '{table_name}'")
+        start = time.perf_counter()
+        if incremental:
+            stats = incremental_load(csv_path, table_name, conn, chunksize=chunksize)
+        else:
+            stats = stream_csv_to_table(csv_path, table_name, conn, chunksize)
+        elapsed = time.perf_counter() - start
+        count = stats['rows']
+        
+        if stats.get('status') == 'skipped':
+            print(f" File already loaded into '{table_name}' (fingerprint unchanged), skipping")
+            # nothing written: cached results stay valid
+            changed = False
+            return True
+        
+        if star_schema and not is_star_view(conn, table_name):
+            print(f" Building star schema for '{table_name}'")
+            with PROFILER.span('ingest', 'star_schema'):
+                build_star_schema(conn, table_name)
+        if partition:
+            _partition_layout(conn, table_name, partition)
+        
+        # upserts keep an existing rollup current themselves
+        with PROFILER.span('ingest', 'rollup'):
+            sync_rollup(conn, table_name, requested=rollup, maintained=incremental)
+        # samples and sketches can't take deltas: rebuilt after every load
+        with PROFILER.span('ingest', 'approximate'):
+            sync_approximate(conn, table_name, requested=approximate)
+        
+        # Show sample data
+        print(f"\n Sample data from '{table_name}':")
+        sample = pd.read_sql(f'SELECT * FROM "{table_name}" LIMIT 3', conn)
+        print(sample.to_string())
+    finally:
+        # also after a failed load: chunks committed before the error are visible
+        if changed:
+            bump_data_version(conn)
+        conn.close()
+    
+    if index:
+        print(f"\n Building indexes for '{table_name}'")
+        with PROFILER.span('ingest', 'indexes'):
+            build_indexes(db_path, table_name)
+    if parquet:
+        _export_snapshot(db_path, table_name)
+    
+    peak = peak_memory_mb()
+    
+    print(" CONVERSION COMPLETE!")
+    
+    print(f"\n Database: {db_path}")
+    print(f" Table: {table_name}")
+    print(f" Rows: {count:,}")
+    print(f" Time: {elapsed:.2f} s ({count / max(elapsed, 1e-9):,.0f} rows/sec)")
+    print(f" Peak memory (RSS): {f'{peak:.1f} MB' if peak is not None else 'n/a'}")
+    if incremental:
+        print(f" High-water mark: order_date={stats['max_order_date']}")
+    
+    return True
+
+
+def _table_name_from_file(csv_file):
+    """Table name derived from the CSV filename."""
+    table_name = os.path.splitext(os.path.basename(csv_file))[0]
+    return table_name.lower().replace(' ', '_').replace('-', '_')
+
+
+def _parse_csv_file(csv_file):
+    """
+    Read and clean one CSV file (runs inside a worker process)
+    
+    Returns:
+        tuple: (DataFrame, parse seconds)
+    """
+    start = time.perf_counter()
+    df = pd.read_csv(csv_file)
+    df.columns = clean_column_names(df.columns)
+    return df, time.perf_counter() - start
+
+
+def _write_frame(conn, df, table_name, if_exists='replace', upsert_key='order_id'):
+    """
+    Write a DataFrame in one transaction on a connection opened with isolation_level=None
+    
+    Args:
+        if_exists (str): 'replace', 'append' or 'upsert' (keyed on upsert_key)
+    """
+    merge = _merge_function(conn, table_name) if if_exists != 'replace' else None
+    if merge is not None:
+        # Star / partitioned layout: write a wide staging table, then merge it in
+        staging = f'{table_name}_staging'
+        _write_frame(conn, df, staging, 'replace')
+        merge(conn, staging, table_name, upsert_key, *_rollup_hooks(conn, table_name, staging, upsert_key))
+        return
+    
+    cursor = conn.cursor()
+    cursor.execute("BEGIN")
+    try:
+        if if_exists == 'replace':
+            _drop_layout(conn, table_name)
+            cursor.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+            cursor.execute(pd.io.sql.get_schema(df, table_name))
+        elif if_exists == 'append':
+            cursor.execute(pd.io.sql.get_schema(df, table_name).replace(
+                'CREATE TABLE', 'CREATE TABLE IF NOT EXISTS', 1))
+        else:
+            _prepare_upsert_table(cursor, df, table_name, upsert_key)
+        
+        key = upsert_key if if_exists == 'upsert' else None
+        maintain_rollup = key is not None and has_rollup(conn, table_name)
+        if maintain_rollup:
+            stage_keys(conn, df[key].tolist(), key_column=key)
+            apply_rollup_delta(conn, table_name, key, sign=-1)
+        cursor.executemany(_insert_statement(table_name, df.columns, key), _frame_rows(df))
+        if maintain_rollup:
+            apply_rollup_delta(conn, table_name, key, sign=1)
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+
+
+@profiled('ingest')
+def _parallel_load(csv_files, conn, target_table, incremental, workers, max_pending=None):
+    """
+    Parse CSV files in a process pool while this (single writer) thread owns
+    the SQLite connection and commits one file per transaction
+    At most max_pending parsed/in-flight files exist at a time (back-pressure)
+    
+    Returns:
+        list: per-file result dicts
+    """
+    max_pending = max_pending or workers * 2
+    results = []
+    written_tables = set()
+    queue = list(csv_files)
+    pending = {}
+    
+    for pragma in LOADER_PRAGMAS:
+        conn.execute(pragma)
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while queue or pending:
+            # Only submit more work while the writer keeps up
+            while queue and len(pending) < max_pending:
+                csv_file = queue.pop(0)
+                table_name = target_table or _table_name_from_file(csv_file)
+                fingerprint = None
+                if incremental:
+                    _ensure_metadata_table(conn)
+                    loaded, fingerprint = _already_loaded(conn, table_name, csv_file)
+                    if loaded:
+                        results.append(_file_result(csv_file, table_name, status='skipped'))
+                        continue
+                future = pool.submit(_parse_csv_file, csv_file)
+                pending[future] = (csv_file, table_name, fingerprint)
+            
+            if not pending:
+                continue
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                csv_file, table_name, fingerprint = pending.pop(future)
+                result = _file_result(csv_file, table_name)
+                try:
+                    df, result['parse_s'] = future.result()
+                    start = time.perf_counter()
+                    if incremental:
+                        if_exists = 'upsert'
+                    elif target_table and table_name in written_tables:
+                        if_exists = 'append'
+                    else:
+                        if_exists = 'replace'
+                    _write_frame(conn, df, table_name, if_exists)
+                    written_tables.add(table_name)
+                    result['write_s'] = time.perf_counter() - start
+                    result['rows'] = len(df)
+                    if incremental:
+                        stats = {'rows': len(df), 'max_order_date': None}
+                        _update_watermark(stats, df)
+                        _record_load(conn, table_name, csv_file, fingerprint, stats)
+                    print(f"    {os.path.basename(csv_file)} -> '{table_name}' ({len(df):,} rows)")
+                except Exception as e:
+                    result['status'] = 'failed'
+                    result['error'] = str(e)
+                    print(f"    ERROR loading {csv_file}: {e}")
+                results.append(result)
+    
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return results
+
+
+def _file_result(csv_file, table_name, status='loaded'):
+    return {'file': os.path.basename(csv_file), 'table': table_name, 'rows': 0,
+            'parse_s': None, 'write_s': None, 'status': status, 'error': None}
+
+
+@profiled('ingest')
+def _serial_load(csv_files, conn, target_table, incremental):
+    """
+    Load CSV files one after another on this thread
+    
+    Returns:
+        list: per-file result dicts
+    """
+    results = []
+    
+    for csv_file in csv_files:
+        # Get table name from filename
+        table_name = target_table or _table_name_from_file(csv_file)
+        result = _file_result(csv_file, table_name)
+        results.append(result)
+        try:
+            print(f"Processing: {os.path.basename(csv_file)}")
+            
+            if incremental:
+                load_start = time.perf_counter()
+                stats = incremental_load(csv_file, table_name, conn)
+                result['write_s'] = time.perf_counter() - load_start
+                result['rows'] = stats['rows']
+                result['status'] = stats['status']
+                if stats['status'] == 'skipped':
+                    print(f"    Already loaded (fingerprint unchanged), skipped")
+                else:
+                    print(f"    Upserted {stats['rows']:,} rows into table: '{table_name}'")
+                continue
+            
+            # Read CSV
+            df, result['parse_s'] = _parse_csv_file(csv_file)
+            print(f"   Rows: {len(df)}")
+            print(f"   Columns: {len(df.columns)}")
+            
+            # Load into database (files sharing one target table are appended)
+            write_start = time.perf_counter()
+            loaded_before = any(r['status'] == 'loaded' for r in results[:-1])
+            if_exists = 'append' if target_table and loaded_before else 'replace'
+            if conn.isolation_level is None:
+                # autocommit connection (star / rollup / partition): one transaction per file, not per row
+                _write_frame(conn, df, table_name, if_exists)
+            else:
+                if if_exists == 'replace':
+                    _drop_layout(conn, table_name)
+                df.to_sql(table_name, conn, if_exists=if_exists, index=False)
+            result['write_s'] = time.perf_counter() - write_start
+            result['rows'] = len(df)
+            print(f"    Loaded into table: '{table_name}'")
+            
+        except Exception as e:
+            result['status'] = 'failed'
+            result['error'] = str(e)
+            print(f"    ERROR loading {csv_file}: {e}")
+    
+    return results
+
+
+@profiled('ingest')
+def multiple_csvs_to_database(csv_folder, db_path='database/ecommerce.db', table_name=None,
+                              incremental=False, workers=None, star_schema=False, parquet=False,
+                              index=False, rollup=False, partition=None, approximate=False):
     """
     Load multiple CSV files from a folder into database
-    Each CSV becomes a separate table
+    Each CSV becomes a separate table (unless table_name is given)
     
     Args:
         csv_folder (str): Folder containing CSV files
         db_path (str): Path to database file
+        table_name (str): Load every file into this one table
+        incremental (bool): Upsert keyed on order_id and skip files already loaded
+        workers (int): If given, parse files in a pool of this many processes
+                       with a single writer owning the database connection
+        star_schema (bool): Store table_name as a star schema (needs table_name)
+        parquet (bool): Also write a Parquet snapshot of table_name (needs table_name)
+        index (bool): Build workload-derived indexes on table_name (needs table_name)
+        rollup (bool): Maintain the rollup table of every loaded table (see rollup.py)
+        partition (str): 'year' or 'month': partition table_name by order_date (needs table_name)
+        approximate (bool): Keep a sample and sketches of every loaded table (see approximate.py)
     
     Returns:
         bool: True if successful
@@ -131,45 +905,67 @@ def multiple_csvs_to_database(csv_folder, db_path='database/ecommerce.db'):
         print(f"   - {os.path.basename(csv_file)}")
     
     # Create database connection
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    conn = sqlite3.connect(db_path)
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    if incremental or workers or star_schema or rollup or partition:
+        # incremental_load / _write_frame / build_star_schema / build_rollup manage their own transactions
+        conn = sqlite3.connect(db_path, isolation_level=None)
+    else:
+        conn = sqlite3.connect(db_path)
     
-    success_count = 0
+    target_table = table_name
+    start = time.perf_counter()
     
-    for csv_file in csv_files:
-        try:
-            # Get table name from filename
-            table_name = os.path.splitext(os.path.basename(csv_file))[0]
-            table_name = table_name.lower().replace(' ', '_').replace('-', '_')
-            
-            
-            print(f"Processing: {os.path.basename(csv_file)}")
-            
-            # Read CSV
-            df = pd.read_csv(csv_file)
-            print(f"   Rows: {len(df)}")
-            print(f"   Columns: {len(df.columns)}")
-            
-            # Clean column names
-            df.columns = df.columns.str.strip().str.replace(' ', '_').str.lower()
-            df.columns = df.columns.str.replace('[^a-zA-Z0-9_]', '', regex=True)
-            
-            # Load into database
-            df.to_sql(table_name, conn, if_exists='replace', index=False)
-            print(f"    Loaded into table: '{table_name}'")
-            
-            success_count += 1
-            
-        except Exception as e:
-            print(f"    ERROR loading {csv_file}: {e}")
+    if workers:
+        print(f"\n Parsing with {workers} worker process(es), single writer")
+        results = _parallel_load(csv_files, conn, target_table, incremental, workers)
+    else:
+        results = _serial_load(csv_files, conn, target_table, incremental)
+    
+    if star_schema:
+        if target_table is None:
+            print(" WARNING: star schema needs a single target table, skipped")
+        elif not is_star_view(conn, target_table):
+            print(f" Building star schema for '{target_table}'")
+            with PROFILER.span('ingest', 'star_schema'):
+                build_star_schema(conn, target_table)
+    
+    if conn.isolation_level is not None:
+        conn.commit()
+        conn.isolation_level = None
+    if partition:
+        if target_table is None:
+            print(" WARNING: partitioning needs a single target table, skipped")
+        else:
+            _partition_layout(conn, target_table, partition)
+    for loaded_table in sorted({r['table'] for r in results if r['status'] == 'loaded'}):
+        with PROFILER.span('ingest', 'rollup'):
+            sync_rollup(conn, loaded_table, requested=rollup, maintained=incremental)
+        with PROFILER.span('ingest', 'approximate'):
+            sync_approximate(conn, loaded_table, requested=approximate)
+    if any(r['status'] != 'skipped' for r in results):
+        # every file skipped: nothing written, cached results stay valid
+        bump_data_version(conn)
+    
+    elapsed = time.perf_counter() - start
+    success_count = sum(r['status'] != 'failed' for r in results)
+    skipped_count = sum(r['status'] == 'skipped' for r in results)
     
     # Summary
     
     print("LOADING SUMMARY")
     
     
+    print(f"\n Files:")
+    for r in results:
+        parse_s = f"{r['parse_s']:.2f}s" if r['parse_s'] is not None else '-'
+        write_s = f"{r['write_s']:.2f}s" if r['write_s'] is not None else '-'
+        line = f"   {r['file']:30s} | {r['status']:7s} | Rows: {r['rows']:>10,} | Parse: {parse_s:>8s} | Write: {write_s:>8s}"
+        if r['error']:
+            line += f" | Error: {r['error']}"
+        print(line)
+    
     cursor = conn.cursor()
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name;")
+    cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view') ORDER BY name;")
     tables = cursor.fetchall()
     
     print(f"\n Tables in database:")
@@ -181,8 +977,23 @@ def multiple_csvs_to_database(csv_folder, db_path='database/ecommerce.db'):
     
     conn.close()
     
+    if index:
+        if target_table is None:
+            print(" WARNING: indexes need a single target table, skipped")
+        else:
+            print(f"\n Building indexes for '{target_table}'")
+            with PROFILER.span('ingest', 'indexes'):
+                build_indexes(db_path, target_table)
+    if parquet:
+        if target_table is None:
+            print(" WARNING: Parquet snapshot needs a single target table, skipped")
+        else:
+            _export_snapshot(db_path, target_table)
     
     print(f" Loaded {success_count}/{len(csv_files)} files successfully!")
+    if incremental:
+        print(f" Skipped {skipped_count} file(s) already loaded")
+    print(f" Total time: {elapsed:.2f} s")
     
     print(f"\n Database: {db_path}")
     
@@ -190,13 +1001,19 @@ def multiple_csvs_to_database(csv_folder, db_path='database/ecommerce.db'):
     return success_count == len(csv_files)
 
 
-def inspect_csv(csv_path):
+# Files larger than this are inspected in streaming mode by default
+STREAMING_INSPECT_BYTES = 100 * 1024 * 1024
+
+
+def inspect_csv(csv_path, chunksize=None):
     """
     Inspect CSV file before loading
     Shows structure, data types, sample data
     
     Args:
         csv_path (str): Path to CSV file
+        chunksize (int): Inspect in one streaming pass with sketches
+                         (default for files over 100 MB)
     """
     
     
@@ -207,6 +1024,12 @@ def inspect_csv(csv_path):
         print(f" ERROR: File not found: {csv_path}")
         return
     
+    if chunksize is None and os.path.getsize(csv_path) > STREAMING_INSPECT_BYTES:
+        chunksize = 100_000
+    
+    if chunksize:
+        return _inspect_csv_streaming(csv_path, chunksize)
+    
     try:
         print(f"\n File: {csv_path}")
         print(f" Size: {os.path.getsize(csv_path) / 1024:.2f} KB")
@@ -256,11 +1079,130 @@ def inspect_csv(csv_path):
         traceback.print_exc()
 
 
+def _combined_dtype(dtypes):
+    """Common dtype of a column across chunks (e.g. int64 + float64 -> float64)."""
+    dtypes = list(dict.fromkeys(dtypes))
+    if len(dtypes) == 1:
+        return dtypes[0]
+    if all(pd.api.types.is_numeric_dtype(d) for d in dtypes):
+        return np.result_type(*dtypes)
+    return np.dtype('object')
+
+
+def _inspect_csv_streaming(csv_path, chunksize=100_000, sample_size=10_000):
+    """
+    Single-pass inspect_csv for multi-GB files
+    Memory is bounded by the chunk size plus fixed-size sketches:
+    HyperLogLog for unique counts, KLL quantiles for statistics,
+    hash sampling for duplicates and a reservoir sample for date sniffing
+    
+    Args:
+        csv_path (str): Path to CSV file
+        chunksize (int): Rows per chunk
+        sample_size (int): Reservoir sample rows used to sniff date columns
+    """
+    try:
+        print(f"\n File: {csv_path}")
+        print(f" Size: {os.path.getsize(csv_path) / 1024:.2f} KB")
+        print(f" Mode: streaming ({chunksize:,} rows per chunk, approximate statistics)")
+        
+        start = time.perf_counter()
+        rows = 0
+        head = None
+        dtypes, nulls, uniques, quantiles = {}, {}, {}, {}
+        duplicates = HashSampleCounter()
+        reservoir = ReservoirSample(sample_size)
+        
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            if head is None:
+                head = chunk.head()
+                for col in chunk.columns:
+                    dtypes[col], nulls[col], uniques[col] = [], 0, HyperLogLog()
+            
+            rows += len(chunk)
+            for col in chunk.columns:
+                series = chunk[col]
+                dtypes[col].append(series.dtype)
+                nulls[col] += int(series.isnull().sum())
+                uniques[col].add(series)
+                if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+                    quantiles.setdefault(col, KLLQuantiles()).add(series)
+            
+            duplicates.add_hashes(hash_values(chunk))
+            reservoir.add(chunk)
+        
+        if head is None:
+            print(" ERROR: File has no rows")
+            return
+        
+        columns = list(head.columns)
+        dtypes = {col: _combined_dtype(dtypes[col]) for col in columns}
+        hll_error = next(iter(uniques.values())).relative_error
+        
+        print(f"\n STRUCTURE:")
+        print(f"   Rows: {rows:,}")
+        print(f"   Columns: {len(columns)}")
+        
+        print(f"\n COLUMNS:")
+        for i, col in enumerate(columns, 1):
+            unique_count = min(uniques[col].estimate(), rows - nulls[col])
+            print(f"   {i:2d}. {col:30s} | Type: {str(dtypes[col]):10s} | Nulls: {nulls[col]:5d} | Unique: ~{unique_count:6d}")
+        print(f"   (Unique counts are HyperLogLog estimates, std error ±{hll_error:.1%})")
+        
+        print(f"\n SAMPLE DATA (First 5 rows):")
+        print(head.to_string())
+        
+        print(f"\n STATISTICS:")
+        if quantiles:
+            stats = pd.DataFrame({col: sketch.describe() for col, sketch in quantiles.items()})
+            print(stats.to_string())
+            rank_error = next(iter(quantiles.values())).rank_error
+            print(f"   (count/mean/std/min/max exact; quartiles from KLL sketch, rank error ±{rank_error:.1%})")
+        
+        dup_estimate, dup_margin = duplicates.duplicates()
+        print(f"\n  DATA QUALITY CHECKS:")
+        print(f"   Total missing values: {sum(nulls.values())}")
+        if duplicates.sampling_rate >= 1:
+            print(f"   Duplicate rows: {dup_estimate}")
+        else:
+            print(f"   Duplicate rows: ~{dup_estimate} (±{dup_margin}, 95% CI, "
+                  f"{duplicates.sampling_rate:.1%} hash sample)")
+        
+        # Check for potential date columns on the reservoir sample
+        sample = reservoir.to_frame()
+        date_cols = []
+        for col in columns:
+            if dtypes[col] == 'object' or pd.api.types.is_string_dtype(dtypes[col]):
+                values = sample[col].dropna().astype(str)
+                if values.empty:
+                    continue
+                try:
+                    with warnings.catch_warnings():
+                        warnings.simplefilter('ignore', UserWarning)
+                        pd.to_datetime(values, errors='raise')
+                    date_cols.append(col)
+                except (ValueError, TypeError, OverflowError):
+                    pass
+        
+        if date_cols:
+            print(f"   Potential date columns: {', '.join(date_cols)} "
+                  f"(sniffed on {len(sample):,} sampled rows)")
+        
+        elapsed = time.perf_counter() - start
+        peak = peak_memory_mb()
+        print(f"\n Time: {elapsed:.2f} s ({rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+        print(f" Peak memory (RSS): {f'{peak:.1f} MB' if peak is not None else 'n/a'}")
+        
+    except Exception as e:
+        print(f"\n ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+
+
 # MAIN EXECUTION
 
 
 if __name__ == "__main__":
-    import sys
     
     if len(sys.argv) < 2:
         
@@ -270,20 +1212,73 @@ if __name__ == "__main__":
         print("   python src/csv_to_database.py inspect <csv_file>")
         print("\n   Example:")
         print("   python src/csv_to_database.py inspect data/sales.csv")
+        print("   python src/csv_to_database.py inspect data/big_sales.csv --chunksize 200000")
         
         print("\n OPTION 2: Convert single CSV to database")
         print("   python src/csv_to_database.py convert <csv_file> [table_name]")
         print("\n   Examples:")
         print("   python src/csv_to_database.py convert data/sales.csv")
         print("   python src/csv_to_database.py convert data/sales.csv orders")
+        print("   python src/csv_to_database.py convert data/sales.csv --chunksize 100000")
+        print("   python src/csv_to_database.py convert data/new_orders.csv cleaned_sales_data --incremental")
+        print("   python src/csv_to_database.py convert data/cleaned_sales_data.csv --star")
+        print("   python src/csv_to_database.py convert data/cleaned_sales_data.csv --parquet")
+        print("   python src/csv_to_database.py convert data/cleaned_sales_data.csv --index")
+        print("   python src/csv_to_database.py convert data/cleaned_sales_data.csv --rollup")
+        print("   python src/csv_to_database.py convert data/cleaned_sales_data.csv --partition year")
+        print("   python src/csv_to_database.py convert data/cleaned_sales_data.csv --approximate")
+        print("   python src/csv_to_database.py convert data/cleaned_sales_data.csv --index --profile")
         
         print("\n OPTION 3: Convert multiple CSVs from folder")
-        print("   python src/csv_to_database.py convert-folder <folder_path>")
-        print("\n   Example:")
+        print("   python src/csv_to_database.py convert-folder <folder_path> [table_name]")
+        print("\n   Examples:")
         print("   python src/csv_to_database.py convert-folder data/csv_files/")
+        print("   python src/csv_to_database.py convert-folder data/daily/ cleaned_sales_data --incremental")
+        print("   python src/csv_to_database.py convert-folder data/regions/ --workers 8")
         
         sys.exit(1)
     
+    # Optional flags
+    args = sys.argv[1:]
+    chunksize = None
+    if "--chunksize" in args:
+        i = args.index("--chunksize")
+        chunksize = int(args[i + 1])
+        del args[i:i + 2]
+    workers = None
+    if "--workers" in args:
+        i = args.index("--workers")
+        workers = int(args[i + 1])
+        del args[i:i + 2]
+    star_schema = "--star" in args
+    if star_schema:
+        args.remove("--star")
+    incremental = "--incremental" in args
+    if incremental:
+        args.remove("--incremental")
+    parquet = "--parquet" in args
+    if parquet:
+        args.remove("--parquet")
+    index = "--index" in args
+    if index:
+        args.remove("--index")
+    rollup = "--rollup" in args
+    if rollup:
+        args.remove("--rollup")
+    approximate = "--approximate" in args
+    if approximate:
+        args.remove("--approximate")
+    partition = None
+    if "--partition" in args:
+        i = args.index("--partition")
+        partition = args[i + 1].lower()
+        del args[i:i + 2]
+    profile = "--profile" in args
+    if profile:
+        args.remove("--profile")
+        PROFILER.enable()
+    sys.argv = [sys.argv[0]] + args
+    
     command = sys.argv[1].lower()
     
     if command == "inspect":
@@ -293,7 +1288,7 @@ if __name__ == "__main__":
             sys.exit(1)
         
         csv_path = sys.argv[2]
-        inspect_csv(csv_path)
+        inspect_csv(csv_path, chunksize=chunksize)
     
     elif command == "convert":
         if len(sys.argv) < 3:
@@ -303,7 +1298,9 @@ if __name__ == "__main__":
         
         csv_path = sys.argv[2]
         table_name = sys.argv[3] if len(sys.argv) > 3 else None
-        csv_to_database(csv_path, table_name)
+        csv_to_database(csv_path, table_name, chunksize=chunksize, incremental=incremental,
+                        star_schema=star_schema, parquet=parquet, index=index, rollup=rollup,
+                        partition=partition, approximate=approximate)
     
     elif command == "convert-folder":
         if len(sys.argv) < 3:
@@ -312,9 +1309,16 @@ if __name__ == "__main__":
             sys.exit(1)
         
         folder_path = sys.argv[2]
-        multiple_csvs_to_database(folder_path)
+        table_name = sys.argv[3] if len(sys.argv) > 3 else None
+        multiple_csvs_to_database(folder_path, table_name=table_name, incremental=incremental,
+                                  workers=workers, star_schema=star_schema, parquet=parquet,
+                                  index=index, rollup=rollup, partition=partition,
+                                  approximate=approximate)
     
     else:
         print(f" ERROR: Unknown command '{command}'")
         print("   Use: inspect, convert, or convert-folder")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+    
+    if profile:
+        PROFILER.print_report()
\ No newline at end of file
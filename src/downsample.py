@@ -0,0 +1,238 @@
+"""
+Plot Downsampling
+Bounded figures for the dashboard's auto_plot, whatever the result size
+
+A Plotly figure carries every point to the browser as JSON, so a bar per
+product or customer, or a point per day, makes huge figures that render
+slowly. plot_data() reduces a result to at most a fixed number of marks:
+- long time series (datetime or 'YYYY-MM' x axis): a line of at most
+  MAX_POINTS points picked by LTTB (Largest-Triangle-Three-Buckets), which
+  keeps the peaks and troughs a plain stride would drop
+- categorical bars: the first MAX_BARS bars of the result's own ranking
+  (or the largest when it is not sorted on the measure), the rest folded
+  into one "Other" bar (sum of additive measures, mean of averages and
+  ratios)
+Lines and scatters of more than WEBGL_POINTS points are drawn with WebGL.
+full=True keeps every row (the dashboard's full fidelity toggle).
+
+Usage:
+    python src/downsample.py [db_path]
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Points of a downsampled line
+MAX_POINTS = 2000
+
+# Bars kept before the rest is folded into "Other"
+MAX_BARS = 50
+
+# Lines / scatters with more points are drawn with WebGL (scattergl)
+WEBGL_POINTS = 1000
+
+OTHER = "Other"
+
+# Measures that add up across rows ("Other" is their sum, any other measure is averaged)
+ADDITIVE = {'sales', 'profit', 'orders', 'quantity', 'monetary', 'frequency', 'count', 'rows'}
+NOT_ADDITIVE = {'avg', 'average', 'mean', 'pct', 'share', 'rate', 'ratio', 'margin'}
+
+# 'YYYY-MM' or 'YYYY-MM-DD' labels
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}(-\d{2})?$")
+
+
+def lttb(x, y, threshold=MAX_POINTS) -> np.ndarray:
+    """
+    Positions of the points kept by Largest-Triangle-Three-Buckets
+
+    The first and last points stay; every bucket of the points between
+    keeps the one forming the largest triangle with the point kept in the
+    previous bucket and the average of the next bucket.
+
+    Args:
+        x, y (array-like): Points sorted on x (numbers)
+        threshold (int): Points to keep
+
+    Returns:
+        np.ndarray: Increasing positions, all of them if there are at most threshold points
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    every = (n - 2) / (threshold - 2)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        following = slice(end, min(int((i + 2) * every) + 1, n))
+        avg_x, avg_y = np.nanmean(x[following]), np.nanmean(y[following])
+        area = np.abs((x[previous] - avg_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (avg_y - y[previous]))
+        # NaN values never win the bucket unless they are all there is
+        previous = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        kept[i + 1] = previous
+    return kept
+
+
+def time_axis(column: pd.Series):
+    """The column as datetimes if it holds dates ('YYYY-MM' labels included), else None."""
+    if column.dtype.kind == 'M':
+        return column
+    if column.dtype.kind in 'iufb' or column.empty:
+        return None
+    values = column.dropna().astype(str)
+    if values.empty or not values.str.match(_ISO_DATE).all():
+        return None
+    return pd.to_datetime(column.astype(str), format='ISO8601', errors='coerce')
+
+
+def is_additive(measure) -> bool:
+    """True if a measure adds up across rows (sales, profit, counts), False for averages and ratios."""
+    words = set(str(measure).lower().split('_'))
+    return bool(words & ADDITIVE) and not words & NOT_ADDITIVE
+
+
+def downsample_series(df: pd.DataFrame, x, y, threshold=MAX_POINTS) -> pd.DataFrame:
+    """Rows of a series (sorted on x: dates or numbers) kept by LTTB on (x, y)."""
+    dates = time_axis(df[x])
+    if dates is not None:
+        numbers = dates.to_numpy().astype('datetime64[ns]').astype(np.int64)
+    else:
+        numbers = df[x].to_numpy(dtype=np.float64)
+    order = np.argsort(numbers, kind='stable')
+    df = df.iloc[order]
+    return df.iloc[lttb(numbers[order], df[y].to_numpy(dtype=np.float64, na_value=np.nan), threshold)]
+
+
+def top_bars(df: pd.DataFrame, x, y, n=MAX_BARS, other=OTHER) -> pd.DataFrame:
+    """
+    At most n + 1 bars: one row per x value (y summed or averaged over
+    repeated values), the first n in the result's order if it is ranked on
+    y, else the n largest, and one "Other (k)" bar for the k values left
+
+    Returns:
+        pd.DataFrame: x (text) and y; other columns only when every x
+                      value was a single row (e.g. confidence bounds),
+                      empty on the "Other" bar. df itself if nothing changed
+    """
+    how = 'sum' if is_additive(y) else 'mean'
+    if df[x].duplicated().any():
+        df = df.groupby(x, sort=False, observed=True, dropna=False)[y].agg(how).reset_index()
+    if len(df) <= n:
+        return df
+    values = df[y]
+    ranked = values.is_monotonic_increasing or values.is_monotonic_decreasing
+    kept = df.head(n) if ranked else df.loc[values.abs().nlargest(n).index.sort_values()]
+    rest = df.drop(kept.index)
+    folded = pd.DataFrame({x: [f"{other} ({len(rest):,})"], y: [rest[y].agg(how)]})
+    kept = kept.astype({x: str})
+    return pd.concat([kept, folded], ignore_index=True)
+
+
+def plot_data(df: pd.DataFrame, x, y, full=False):
+    """
+    The rows of a result to plot and how
+
+    Args:
+        df (pd.DataFrame): Result
+        x (str): Column of the x axis (None: the index)
+        y (str): Measure
+        full (bool): Keep every row
+
+    Returns:
+        tuple: (frame, chart, x column, note) with chart 'bar' or 'line' and
+               note a description of the reduction ('' if none)
+    """
+    if x is None:
+        df, x = df.rename_axis('index').reset_index(), 'index'
+    if x == 'index' or time_axis(df[x]) is not None:
+        if len(df) <= MAX_BARS and x != 'index':
+            return df, 'bar', x, ''
+        if full or len(df) <= MAX_POINTS:
+            return df, 'line', x, ''
+        return downsample_series(df, x, y), 'line', x, f"{MAX_POINTS:,} of {len(df):,} points (LTTB)"
+    if full:
+        return df, 'bar', x, ''
+    bars = top_bars(df, x, y)
+    if bars is df:
+        return df, 'bar', x, ''
+    how = 'sum' if is_additive(y) else 'mean'
+    if len(bars) <= MAX_BARS:
+        return bars, 'bar', x, f"{how} of {y} per {x}"
+    return bars, 'bar', x, f"{MAX_BARS} {x} values shown, the rest as {OTHER} ({how} of {y})"
+
+
+def render_mode(points) -> str:
+    """Plotly Express render_mode of a line / scatter of that many points."""
+    return 'webgl' if points > WEBGL_POINTS else 'auto'
+
+
+def figure_bytes(fig) -> int:
+    """Size of a figure's JSON, what is sent to the browser."""
+    return len(fig.to_json().encode('utf-8'))
+
+
+# ========================
+# Figure size report
+# ========================
+def _figure(frame, chart, x, y):
+    import plotly.express as px
+    if chart == 'line':
+        return px.line(frame, x=x, y=y, render_mode=render_mode(len(frame)))
+    return px.bar(frame, x=x, y=y)
+
+
+def downsample_report(db_path='database/ecommerce.db',
+                      calls=(('Cities_improvement', ()), ('Products_profits', ()), ('Worst_Products', (1000,)),
+                             ('Product_performance', ()), ('Monthly_sales_forecasting', ()),
+                             ('RFM_scores', ()))):
+    """
+    Rows, marks plotted and figure JSON size of some results, full vs downsampled
+
+    Returns:
+        bool: True if every downsampled figure stays within the budget
+    """
+    try:
+        from src.analytics import SalesAnalytics
+    except ImportError:  # run as a script: python src/downsample.py
+        sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+        from src.analytics import SalesAnalytics
+
+    print("PLOT DOWNSAMPLING")
+    analytics = SalesAnalytics(db_path).compact()
+    within = True
+    print(f"\n   {'method':26s} {'rows':>9s} {'marks':>7s} {'full JSON':>11s} {'JSON':>10s}  chart")
+    for name, args in calls:
+        df = getattr(analytics, name)(*args)
+        numeric = df.select_dtypes(include=['number']).columns.tolist()
+        other = df.select_dtypes(exclude=['number']).columns.tolist()
+        if not numeric:
+            continue
+        x, y = (other[0] if other else None), numeric[0]
+        full = _figure(*plot_data(df, x, y, full=True)[:3], y)
+        frame, chart, x_col, note = plot_data(df, x, y)
+        small = _figure(frame, chart, x_col, y)
+        within &= len(frame) <= max(MAX_POINTS, MAX_BARS + 1)
+        print(f"   {name:26s} {len(df):>9,} {len(frame):>7,} {figure_bytes(full) / 1024:9.0f}KB "
+              f"{figure_bytes(small) / 1024:8.0f}KB  {chart}{', ' + note if note else ''}")
+    print(f"\n Every figure within {MAX_POINTS:,} points / {MAX_BARS + 1} bars" if within
+          else "\n Some figures exceed the budget")
+    return within
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'database/ecommerce.db'
+    if not os.path.exists(db_path):
+        print(f" ERROR: Database not found: {db_path}")
+        sys.exit(1)
+    sys.exit(0 if downsample_report(db_path) else 1)
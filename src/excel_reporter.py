@@ -7,7 +7,14 @@ It produces three Excel reports corresponding to:
 3. Prescriptive Analysis
 
 Each report contains outputs from query functions
-defined in the analytics module.
+defined in the analytics module. A report declares the methods it needs
+(label -> (method name, kwargs)); by default they run as one batch that
+shares scans over the data (see scan_planner.py).
+With --profile every report and the analytics calls it makes are timed
+(see profiler.py). With --workers N the scans over the raw rows are split
+over N worker processes (see parallel_aggregate.py).
+Results come in compact dtypes (see compact_dtypes.py): dates are written
+as Excel dates.
 
 Author: Vishank Tyagi
 Created: 11 December 2025
@@ -17,51 +24,130 @@ Created: 11 December 2025
 # Imports
 # ========================
 import os
+import sys
 import pandas as pd
 
 from src.analytics import SalesAnalytics
+from src.scan_planner import print_batch_stats
+from src.profiler import PROFILER, profile_methods
+
+
+# ========================
+# Report Declarations
+# ========================
+# sheet / section name -> (SalesAnalytics method, kwargs)
+DESCRIPTIVE_REPORT = {
+    "Total Orders": ("Count_Total_Orders", {}),
+    "Profit Generated": ("Sales_generated_Profit", {}),
+    "Categorical Sales": ("Categorical_Sales", {}),
+    "Regional Sales": ("Regional_Sales", {}),
+    "Monthly Sales": ("Monthly_Sales", {}),
+    "Yearly Sales": ("Yearly_Sales", {}),
+    "Profit Per Product": ("Products_profits", {}),
+    "Profit Per Segment": ("Customer_Segments_Profit", {}),
+    "Top Products": ("Best_Products", {"limit": 10}),
+    "Worst Products": ("Worst_Products", {"limit": 10}),
+    "Best Customers": ("Top_Customers", {"limit": 10}),
+}
+
+PREDICTIVE_REPORT = {
+    "RFM Signals": ("RFM_signals", {}),
+    "RFM Scores": ("RFM_scores", {}),
+    "Seasonal Demands": ("Seasonal_demands", {}),
+    "Product Performance Trends": ("Product_performance", {}),
+    "Product Trends": ("Product_trends", {}),
+    "Rising Products": ("Rising_products", {"limit": 10}),
+    "Falling Products": ("Falling_products", {"limit": 10}),
+    "Monthly Sales Forecasting": ("Monthly_sales_forecasting", {}),
+    "Category Forecasts": ("Sales_forecasts", {"level": "category"}),
+    "Forecast Accuracy": ("Forecast_accuracy", {}),
+}
+
+# row-level sections written to their sheet page by page, so they are never
+# loaded whole: sheet name -> (SalesAnalytics pages method, kwargs)
+PAGED_PREDICTIVE_REPORT = {
+    "High Risk Order_L_Profit": ("High_risk_orders_pages", {"kind": "L_Profit"}),
+    "High Risk Order_H_Aging": ("High_risk_orders_pages", {"kind": "H_Aging"}),
+}
+
+# Rows per sheet Excel can hold (including the header)
+EXCEL_MAX_ROWS = 1_048_576
+
+# Number format of datetime64 columns (compact results hold dates, not text)
+EXCEL_DATES = {"date_format": "YYYY-MM-DD", "datetime_format": "YYYY-MM-DD"}
+
+PRESCRIPTIVE_REPORT = {
+    "Products to Discount": ("Products_to_Discount", {}),
+    "Products to Promote": ("Products_to_promote", {}),
+    "Customer Loyalty": ("Loyal_customers", {}),
+    "Customer Churning": ("Churning_customers", {}),
+    "Cities Needing Improvement": ("Cities_improvement", {}),
+    "Optimized Shipping": ("Optimized_shipping", {}),
+}
 
 
 # ========================
 # Report Generator Class
 # ========================
+@profile_methods(kind='report')
 class ReportGenerator:
     def __init__(
         self,
         db_path: str = "database/ecommerce.db",
-        report_path: str = "reports"
+        report_path: str = "reports",
+        batched: bool = True,
+        workers: int = None,
+        compact: bool = True
     ):
         """
         Initialize ReportGenerator with database and report paths.
         Paths are relative to project root for cloud compatibility.
+        batched=False calls the analytics methods one at a time.
+        workers runs their scans in that many processes (SalesAnalytics.parallel).
+        compact=False keeps the default dtypes (dates as text).
         """
-        self.analytics = SalesAnalytics()
+        self.analytics = SalesAnalytics(db_path).compact(compact)
+        if workers:
+            self.analytics = self.analytics.parallel(workers)
         self.reports = report_path
+        self.batched = batched
 
         os.makedirs(self.reports, exist_ok=True)
 
+    def _collect(self, name, report):
+        """Results of a report declaration; prints scan count and wall time when batched."""
+        if not self.batched:
+            return {label: getattr(self.analytics, method)(**kwargs)
+                    for label, (method, kwargs) in report.items()}
+        results, stats = self.analytics.run_batch(report)
+        print(f" {name} report:")
+        print_batch_stats(stats)
+        return results
+
+    def _write_pages(self, writer, sheet_name, pages):
+        """Write result pages one after another to one sheet (header once)."""
+        row = 0
+        for page in pages:
+            if row + len(page) + 1 > EXCEL_MAX_ROWS:
+                page = page.iloc[:EXCEL_MAX_ROWS - row - 1]
+                print(f" WARNING: {sheet_name} truncated to the {EXCEL_MAX_ROWS - 1:,} rows a sheet can hold")
+            page.to_excel(writer, index=False, sheet_name=sheet_name, startrow=row, header=row == 0)
+            row += len(page) + (row == 0)
+            if row >= EXCEL_MAX_ROWS:
+                break
+        if row == 0:  # no rows at all: an empty sheet
+            pd.DataFrame().to_excel(writer, index=False, sheet_name=sheet_name)
+
     # ========================
     # Descriptive Reports
     # ========================
     def generate_descriptive_reports(self):
         try:
-            descriptive_data = {
-                "Total Orders": self.analytics.Count_Total_Orders(),
-                "Profit Generated": self.analytics.Sales_generated_Profit(),
-                "Categorical Sales": self.analytics.Categorical_Sales(),
-                "Regional Sales": self.analytics.Regional_Sales(),
-                "Monthly Sales": self.analytics.Monthly_Sales(),
-                "Yearly Sales": self.analytics.Yearly_Sales(),
-                "Profit Per Product": self.analytics.Products_profits(),
-                "Profit Per Segment": self.analytics.Customer_Segments_Profit(),
-                "Top Products": self.analytics.Best_Products(limit=10),
-                "Worst Products": self.analytics.Worst_Products(limit=10),
-                "Best Customers": self.analytics.Top_Customers(limit=10),
-            }
+            descriptive_data = self._collect("Descriptive", DESCRIPTIVE_REPORT)
 
             file_path = os.path.join(self.reports, "Descriptive_Analysis_Report.xlsx")
 
-            with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
+            with pd.ExcelWriter(file_path, engine="openpyxl", **EXCEL_DATES) as writer:
                 for sheet_name, df in descriptive_data.items():
                     df.to_excel(writer, index=False, sheet_name=sheet_name[:31])
 
@@ -75,17 +161,11 @@ class ReportGenerator:
     # ========================
     def generate_predictive_reports(self):
         try:
-            predictive_data = {
-                "RFM Signals": self.analytics.RFM_signals(),
-                "Seasonal Demands": self.analytics.Seasonal_demands(),
-                "Product Performance Trends": self.analytics.Product_performance(),
-                "Monthly Sales Forecasting": self.analytics.Monthly_sales_forecasting(),
-                "High Risk Orders": self.analytics.High_risk_orders(),
-            }
+            predictive_data = self._collect("Predictive", PREDICTIVE_REPORT)
 
             file_path = os.path.join(self.reports, "Predictive_Analysis_Report.xlsx")
 
-            with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
+            with pd.ExcelWriter(file_path, engine="openpyxl", **EXCEL_DATES) as writer:
                 for section_name, result in predictive_data.items():
 
                     if isinstance(result, pd.DataFrame):
@@ -100,6 +180,9 @@ class ReportGenerator:
                             sheet_name = f"{section_name[:15]}_{str(key)[:10]}"
                             df.to_excel(writer, index=False, sheet_name=sheet_name)
 
+                for sheet_name, (method, kwargs) in PAGED_PREDICTIVE_REPORT.items():
+                    self._write_pages(writer, sheet_name[:31], getattr(self.analytics, method)(**kwargs))
+
             return file_path
 
         except Exception as e:
@@ -110,18 +193,11 @@ class ReportGenerator:
     # ========================
     def generate_prescriptive_reports(self):
         try:
-            prescriptive_data = {
-                "Products to Discount": self.analytics.Products_to_Discount(),
-                "Products to Promote": self.analytics.Products_to_promote(),
-                "Customer Loyalty": self.analytics.Loyal_customers(),
-                "Customer Churning": self.analytics.Churning_customers(),
-                "Cities Needing Improvement": self.analytics.Cities_improvement(),
-                "Optimized Shipping": self.analytics.Optimized_shipping(),
-            }
+            prescriptive_data = self._collect("Prescriptive", PRESCRIPTIVE_REPORT)
 
             file_path = os.path.join(self.reports, "Prescriptive_Analysis_Report.xlsx")
 
-            with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
+            with pd.ExcelWriter(file_path, engine="openpyxl", **EXCEL_DATES) as writer:
                 for sheet_name, df in prescriptive_data.items():
                     df.to_excel(writer, index=False, sheet_name=sheet_name[:31])
 
@@ -134,6 +210,14 @@ class ReportGenerator:
     # Generate All Reports
     # ========================
     def generate_all_reports(self):
+        # one batch for all three reports (shares the scans between them),
+        # the reports below are then served from the result cache
+        if self.batched and self.analytics.cache is not None:
+            self._collect("All", {f"{report}: {label}": call
+                                  for report, declaration in (("Descriptive", DESCRIPTIVE_REPORT),
+                                                              ("Predictive", PREDICTIVE_REPORT),
+                                                              ("Prescriptive", PRESCRIPTIVE_REPORT))
+                                  for label, call in declaration.items()})
         self.generate_descriptive_reports()
         self.generate_predictive_reports()
         self.generate_prescriptive_reports()
@@ -143,5 +227,11 @@ class ReportGenerator:
 # Script Entry Point
 # ========================
 if __name__ == "__main__":
-    generator = ReportGenerator()
+    profile = "--profile" in sys.argv
+    if profile:
+        PROFILER.enable()
+    workers = int(sys.argv[sys.argv.index("--workers") + 1]) if "--workers" in sys.argv else None
+    generator = ReportGenerator(workers=workers)
     generator.generate_all_reports()
+    if profile:
+        PROFILER.print_report()
@@ -0,0 +1,268 @@
+"""
+Forecasting Engine
+Moving average, exponential smoothing and seasonal-naive forecasts of monthly sales
+
+Input is one row per (series, month) with the month's sales, which
+SalesAnalytics gets from a single GROUP BY scan per level (total, category,
+product). The rows are scattered into a dense series x month NumPy matrix
+(a month without sales is 0) and every method works on the whole matrix at
+once, so 50k product series cost about as much as a handful:
+- moving average: trailing mean of the last MA_WINDOW months (cumulative sums)
+- exponential smoothing: simple smoothed level, one vector step per month
+- seasonal naive: the same month one season (12 months) earlier
+The fitted values cover the history; the forecast for the next `horizon`
+months is the last moving average, the last smoothed level and the last
+season's months.
+backtest() holds out the last `horizon` months, forecasts them from the rest
+and summarises the errors per method (MAE, RMSE, WAPE, bias and the share
+of series each method forecasts best).
+
+Usage:
+    python src/forecasting.py [series] [months] [horizon]
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Months forecast ahead (and held out by the backtest)
+FORECAST_HORIZON = 3
+
+# Months in the moving average, smoothing factor of the level, months per season
+MA_WINDOW = 3
+SMOOTHING_ALPHA = 0.3
+SEASON_LENGTH = 12
+
+FORECAST_METHODS = ['moving_average', 'exp_smoothing', 'seasonal_naive']
+
+ACCURACY_COLUMNS = ['level', 'method', 'wape', 'mae', 'rmse', 'bias', 'best_share', 'series', 'months']
+
+
+def month_ordinals(months) -> np.ndarray:
+    """'YYYY-MM' labels -> consecutive integers (year * 12 + month - 1)."""
+    months = pd.Series(months, dtype='str')
+    return (months.str[:4].astype(np.int64) * 12 + months.str[5:7].astype(np.int64) - 1).to_numpy()
+
+
+def ordinal_months(ordinals: np.ndarray) -> np.ndarray:
+    """Inverse of month_ordinals."""
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    years, months = np.divmod(ordinals, 12)
+    return np.char.add(np.char.add(years.astype(str), '-'), np.char.zfill((months + 1).astype(str), 2))
+
+
+def series_matrix(frame: pd.DataFrame, series=None, month='month', value='monthly_sales'):
+    """
+    Dense series x month matrix of a long frame
+
+    Args:
+        frame (pd.DataFrame): One row per (series, month)
+        series (str): Series column (None: the frame is one series)
+        month (str): 'YYYY-MM' column
+        value (str): Value column
+
+    Returns:
+        tuple: (series labels (pd.Index), months ('YYYY-MM' array, every month
+               from the first to the last), matrix (float64, missing months 0))
+    """
+    if frame.empty:
+        return pd.Index([] if series else ['Total']), np.empty(0, dtype=str), np.zeros((0, 0))
+    # few distinct months: parse those, not every row
+    month_codes, distinct = pd.factorize(frame[month])
+    ordinals = month_ordinals(distinct)[month_codes]
+    first = ordinals.min()
+    n_months = int(ordinals.max() - first + 1)
+    if series is None:
+        codes, labels = np.zeros(len(frame), dtype=np.int64), pd.Index(['Total'])
+    else:
+        codes, labels = pd.factorize(frame[series], sort=True, use_na_sentinel=False)
+        labels = pd.Index(labels)
+    # one bincount over flat (series, month) positions; duplicates add up
+    flat = codes * n_months + (ordinals - first)
+    weights = frame[value].fillna(0).to_numpy(dtype=np.float64)
+    matrix = np.bincount(flat, weights=weights, minlength=len(labels) * n_months)
+    return labels, ordinal_months(np.arange(first, first + n_months)), matrix.reshape(len(labels), n_months)
+
+
+def moving_average(matrix: np.ndarray, window: int = MA_WINDOW) -> np.ndarray:
+    """Trailing mean of the last `window` months (fewer in the first months)."""
+    cumulative = np.cumsum(matrix, axis=1)
+    totals = cumulative.copy()
+    totals[:, window:] -= cumulative[:, :-window]
+    counts = np.minimum(np.arange(1, matrix.shape[1] + 1), window)
+    return totals / counts
+
+
+def exponential_smoothing(matrix: np.ndarray, alpha: float = SMOOTHING_ALPHA) -> np.ndarray:
+    """Smoothed level per month, starting from the first month's value."""
+    levels = np.empty_like(matrix, dtype=np.float64)
+    if matrix.shape[1] == 0:
+        return levels
+    levels[:, 0] = matrix[:, 0]
+    for t in range(1, matrix.shape[1]):  # months, not series: every step is one vector operation
+        levels[:, t] = alpha * matrix[:, t] + (1 - alpha) * levels[:, t - 1]
+    return levels
+
+
+def seasonal_naive(matrix: np.ndarray, season: int = SEASON_LENGTH) -> np.ndarray:
+    """The value one season earlier (NaN during the first season)."""
+    fitted = np.full(matrix.shape, np.nan)
+    if season < matrix.shape[1]:
+        fitted[:, season:] = matrix[:, :-season]
+    return fitted
+
+
+def forecast(matrix: np.ndarray, horizon: int = FORECAST_HORIZON, window: int = MA_WINDOW,
+             alpha: float = SMOOTHING_ALPHA, season: int = SEASON_LENGTH):
+    """
+    Fitted values and forecasts of every series by every method
+
+    Args:
+        matrix (np.ndarray): Series x month values
+        horizon (int): Months to forecast
+
+    Returns:
+        dict: method -> (fitted (series x months), forecast (series x horizon))
+    """
+    n_series, n_months = matrix.shape
+    if n_months == 0:
+        empty = np.full((n_series, horizon), np.nan)
+        return {method: (np.empty((n_series, 0)), empty) for method in FORECAST_METHODS}
+    averages = moving_average(matrix, window)
+    levels = exponential_smoothing(matrix, alpha)
+    if n_months >= season:
+        # month h ahead repeats the month one season before it
+        steps = n_months - season + np.arange(horizon) % season
+        seasonal = matrix[:, steps]
+    else:  # less than a season of history: naive (last value)
+        seasonal = np.repeat(matrix[:, -1:], horizon, axis=1)
+    return {
+        'moving_average': (averages, np.repeat(averages[:, -1:], horizon, axis=1)),
+        'exp_smoothing': (levels, np.repeat(levels[:, -1:], horizon, axis=1)),
+        'seasonal_naive': (seasonal_naive(matrix, season), seasonal),
+    }
+
+
+def forecast_frame(labels: pd.Index, months: np.ndarray, matrix: np.ndarray, series=None,
+                   horizon: int = FORECAST_HORIZON, value='monthly_sales', **params) -> pd.DataFrame:
+    """
+    Long frame of the history and the forecast of every series
+
+    Args:
+        labels, months, matrix: series_matrix() output
+        series (str): Name of the series column (None: no series column)
+        horizon (int): Months to forecast
+        value (str): Name of the actual values column
+        **params: window / alpha / season for forecast()
+
+    Returns:
+        pd.DataFrame: [series,] month, value, one column per method; the last
+                      `horizon` months of each series are the forecast
+                      (value is NaN there)
+    """
+    results = forecast(matrix, horizon, **params)
+    n_series, n_months = matrix.shape
+    if n_months:
+        future = ordinal_months(month_ordinals(months[-1:])[0] + 1 + np.arange(horizon))
+    else:
+        future = np.empty(0, dtype=str)
+    steps = len(months) + len(future)
+    frame = {}
+    if series is not None:
+        codes = np.repeat(np.arange(n_series), steps)
+        frame[series] = labels.take(codes) if n_series else pd.Index([], dtype='str')
+    frame['month'] = np.tile(np.concatenate([months, future]), n_series)
+    frame[value] = np.hstack([matrix, np.full((n_series, len(future)), np.nan)]).ravel()
+    for method, (fitted, ahead) in results.items():
+        frame[method] = np.hstack([fitted, ahead[:, :len(future)]]).ravel()
+    return pd.DataFrame(frame)
+
+
+def backtest(matrix: np.ndarray, horizon: int = FORECAST_HORIZON, **params) -> pd.DataFrame:
+    """
+    Forecast the last `horizon` months from the months before them
+
+    Args:
+        matrix (np.ndarray): Series x month values
+        horizon (int): Months held out
+        **params: window / alpha / season for forecast()
+
+    Returns:
+        pd.DataFrame: One row per method: wape (% of actual sales), mae,
+                      rmse, bias (% of actual sales, > 0 over-forecasts),
+                      best_share (share of series with the lowest absolute
+                      error), series and months
+    """
+    n_series, n_months = matrix.shape
+    if n_series == 0 or n_months <= horizon:
+        return pd.DataFrame({'method': FORECAST_METHODS, 'series': n_series, 'months': 0}).reindex(
+            columns=ACCURACY_COLUMNS[1:])
+    train, actual = matrix[:, :-horizon], matrix[:, -horizon:]
+    errors = np.stack([ahead - actual for _, ahead in forecast(train, horizon, **params).values()])
+    absolute = np.abs(errors)
+    total = np.abs(actual).sum()
+    # ties (e.g. series without sales) go to the first method
+    per_series = absolute.sum(axis=2)
+    best = np.bincount(per_series.argmin(axis=0), minlength=len(FORECAST_METHODS)) / n_series
+    return pd.DataFrame({
+        'method': FORECAST_METHODS,
+        'wape': absolute.sum(axis=(1, 2)) / total * 100 if total else np.nan,
+        'mae': absolute.mean(axis=(1, 2)),
+        'rmse': np.sqrt((errors ** 2).mean(axis=(1, 2))),
+        'bias': errors.sum(axis=(1, 2)) / total * 100 if total else np.nan,
+        'best_share': best,
+        'series': n_series,
+        'months': horizon,
+    })
+
+
+# ========================
+# Benchmark
+# ========================
+def synthetic_sales(n_series=50_000, n_months=36, seed=0) -> pd.DataFrame:
+    """Long (product, month, monthly_sales) frame of seasonal, noisy, partly sparse series."""
+    rng = np.random.default_rng(seed)
+    base = rng.lognormal(4, 1, n_series)[:, None]
+    t = np.arange(n_months)
+    season = 1 + 0.3 * np.sin(2 * np.pi * (t + rng.integers(0, 12, n_series)[:, None]) / 12)
+    trend = 1 + rng.normal(0, 0.01, n_series)[:, None] * t
+    values = base * season * trend * rng.gamma(4, 0.25, (n_series, n_months))
+    values[rng.random(values.shape) < 0.3] = 0  # products without sales in a month have no row
+    rows, cols = np.nonzero(values)
+    months = ordinal_months(2023 * 12 + cols)
+    return pd.DataFrame({'product': pd.Index([f'P{i:06d}' for i in range(n_series)]).take(rows),
+                         'month': months, 'monthly_sales': values[rows, cols]})
+
+
+def benchmark(n_series=50_000, n_months=36, horizon=FORECAST_HORIZON):
+    """Time the matrix build, the forecasts, the long frame and the backtest."""
+    print("FORECASTING BENCHMARK")
+    sales = synthetic_sales(n_series, n_months)
+    print(f"\n {n_series:,} series x {n_months} months ({len(sales):,} rows), horizon {horizon}")
+    timings = {}
+    start = time.perf_counter()
+    labels, months, matrix = series_matrix(sales, 'product')
+    timings['series matrix'] = time.perf_counter() - start
+    start = time.perf_counter()
+    forecasts = forecast_frame(labels, months, matrix, 'product', horizon)
+    timings['forecast frame'] = time.perf_counter() - start
+    start = time.perf_counter()
+    accuracy = backtest(matrix, horizon)
+    timings['backtest'] = time.perf_counter() - start
+    for step, seconds in timings.items():
+        print(f"   {step:15s}: {seconds:.3f}s")
+    print(f"   {'TOTAL':15s}: {sum(timings.values()):.3f}s ({len(forecasts):,} forecast rows)")
+    print("\n Backtest:")
+    print(accuracy.round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    n_series = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    n_months = int(sys.argv[2]) if len(sys.argv) > 2 else 36
+    horizon = int(sys.argv[3]) if len(sys.argv) > 3 else FORECAST_HORIZON
+    benchmark(n_series, n_months, horizon)
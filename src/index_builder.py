@@ -0,0 +1,330 @@
+"""
+Index Builder
+Derives indexes from the query workload and creates them after a load
+
+Workload = every public SalesAnalytics method plus the statements in
+database/queries/*.sql. For each query the access key is the first
+candidate column it groups or filters on; the index leads with that key and
+also holds every other column the queries on that key read, so SQLite can
+answer them from the index alone (covering index) instead of the table.
+SELECT * queries only get the key, followed by their ORDER BY columns when
+those start with the key (keyset pagination, see pagination.py).
+
+In the star layout (see star_schema.py) the indexes go on fact_sales, with
+dimension columns mapped to their surrogate keys. In the partitioned layout
+(see partitions.py) every partition gets the same indexes.
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import glob
+import inspect
+import os
+import re
+import sqlite3
+import sys
+
+import pandas as pd
+
+try:
+    from src.analytics import SalesAnalytics
+    from src.star_schema import DIMENSIONS, FACT_TABLE, is_star_view
+    from src.partitions import is_partitioned, list_partitions
+except ImportError:  # run as a script: python src/index_builder.py
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    from src.analytics import SalesAnalytics
+    from src.star_schema import DIMENSIONS, FACT_TABLE, is_star_view
+    from src.partitions import is_partitioned, list_partitions
+
+QUERIES_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "database", "queries"))
+
+# Columns worth leading an index with (grouping / range filter keys of the workload)
+INDEX_CANDIDATES = ['customer_id', 'product', 'order_date', 'aging', 'profit']
+
+# Wider covering indexes cost more on insert than they save on reads
+MAX_INDEX_COLUMNS = 6
+
+# A key-only index (SELECT * range filter) loses to a plain table scan once
+# the filter matches more than this share of the rows
+MAX_RANGE_SELECTIVITY = 0.2
+
+INDEX_PREFIX = 'ix_auto_'
+
+_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+_STRING_LITERAL = re.compile(r"'[^']*'")
+
+
+# ========================
+# Workload
+# ========================
+def analytics_workload(db_path, method_args=None):
+    """
+    SQL issued by every public SalesAnalytics method
+
+    Queries are captured (and run with LIMIT 0, so nothing is computed)
+    instead of executed, which keeps this cheap on large tables.
+
+    Args:
+        db_path (str): Path to database file
+        method_args (dict): Arguments for methods with required parameters
+                            (default: limit=10)
+
+    Returns:
+        list: (label, sql) tuples
+    """
+    method_args = method_args or {'limit': 10}
+    analytics = SalesAnalytics(os.path.abspath(db_path), use_cache=False)
+    workload = []
+    current = {'method': None, 'count': 0}
+
+    def record(query, params=()):
+        current['count'] += 1
+        label = current['method'] if current['count'] == 1 else f"{current['method']} #{current['count']}"
+        workload.append((label, query))
+        with analytics._connection() as conn:
+            return pd.read_sql_query(f"SELECT * FROM ({query.strip().rstrip(';')}) LIMIT 0",
+                                     conn, params=params)
+
+    analytics._read = record
+    try:
+        for name, method in inspect.getmembers(SalesAnalytics, inspect.isfunction):
+            if name.startswith('_') or name == 'close':
+                continue
+            params = list(inspect.signature(method).parameters.values())[1:]
+            required = [p.name for p in params if p.default is inspect.Parameter.empty]
+            if any(p not in method_args for p in required):
+                continue
+            current['method'], current['count'] = name, 0
+            method(analytics, **{p: method_args[p] for p in required})
+    finally:
+        analytics.close()
+    return workload
+
+
+def sql_file_workload(folder=QUERIES_FOLDER):
+    """
+    SELECT statements from the .sql files, labelled with the file name
+    and the comment line above each statement
+
+    Returns:
+        list: (label, sql) tuples
+    """
+    workload = []
+    for path in sorted(glob.glob(os.path.join(folder, '*.sql'))):
+        with open(path) as f:
+            text = re.sub(r'/\*.*?\*/', '', f.read(), flags=re.DOTALL)
+        name = os.path.splitext(os.path.basename(path))[0]
+        for statement in text.split(';'):
+            label, lines = None, []
+            for line in statement.strip().splitlines():
+                if line.strip().startswith('--'):
+                    label = line.strip().lstrip('-').strip()
+                else:
+                    lines.append(line)
+            sql = '\n'.join(lines).strip()
+            if sql.upper().startswith('SELECT'):
+                workload.append((f"{name}: {label or sql[:40]}", sql))
+    return workload
+
+
+# ========================
+# Index derivation
+# ========================
+def _clause(sql, keyword, terminators):
+    match = re.search(rf'\b{keyword}\b(.*?)(?:\b(?:{terminators})\b|$)', sql,
+                      flags=re.IGNORECASE | re.DOTALL)
+    return match.group(1) if match else ''
+
+
+def _columns_in(text, column_map):
+    """Table columns referenced in text, in order of first appearance."""
+    text = _STRING_LITERAL.sub('', text)
+    found = []
+    for token in _IDENTIFIER.findall(text):
+        column = column_map.get(token.lower())
+        if column and column not in found:
+            found.append(column)
+    return found
+
+
+def _order_terms(sql, column_map):
+    """(table column, descending) of each ORDER BY term on a table column."""
+    terms = []
+    for term in _clause(sql, 'ORDER BY', 'LIMIT').split(','):
+        columns = _columns_in(term, column_map)
+        if columns:
+            terms.append((columns[0], bool(re.search(r'\bDESC\b', term, flags=re.IGNORECASE))))
+    return terms
+
+
+def _column_map(conn, table_name):
+    """
+    Identifier -> indexed table column
+    Star layout: dimension columns map to their surrogate key in fact_sales
+    """
+    if is_star_view(conn, table_name):
+        target = FACT_TABLE
+        column_map = {row[1].lower(): row[1] for row in conn.execute(f'PRAGMA table_info("{FACT_TABLE}")')}
+        for key, dim_columns in DIMENSIONS.values():
+            if key in column_map:
+                column_map.update({col: key for col in dim_columns})
+    else:
+        target = table_name
+        column_map = {row[1].lower(): row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+    return target, column_map
+
+
+def plan_indexes(workload, column_map, candidates=INDEX_CANDIDATES):
+    """
+    Covering index column lists derived from the workload
+
+    Args:
+        workload (list): (label, sql) tuples
+        column_map (dict): Identifier -> table column (see _column_map)
+        candidates (list): Columns that may lead an index
+
+    Returns:
+        dict: key column -> index columns (key first)
+    """
+    keys = [column_map[c] for c in candidates if c in column_map]
+    indexes = {}
+    for _, sql in workload:
+        access = (_columns_in(_clause(sql, 'GROUP BY', 'HAVING|ORDER BY|LIMIT'), column_map)
+                  + _columns_in(_clause(sql, 'WHERE', 'GROUP BY|ORDER BY|LIMIT'), column_map))
+        key = next((col for col in access if col in keys), None)
+        if key is None:
+            continue
+        columns = indexes.setdefault(key, [key])
+        if columns is None:
+            continue  # already too wide, key-only
+        if re.search(r'SELECT\s+\*', sql, flags=re.IGNORECASE):
+            # can't be covered, the key still narrows the scan; row-level results
+            # sorted on the key are read page by page (see pagination.py), and an
+            # index in ORDER BY order lets every page seek to its cursor
+            ordered = _order_terms(sql, column_map)
+            if ordered and ordered[0][0] == key:
+                # directions relative to the key's: SQLite reads an index backwards too
+                columns.extend(f"{col} DESC" if descending != ordered[0][1] else col
+                               for col, descending in ordered[1:] if col not in columns)
+            continue
+        for col in _columns_in(sql, column_map):
+            if col not in columns and f"{col} DESC" not in columns:
+                columns.append(col)
+        if len(columns) > MAX_INDEX_COLUMNS:
+            indexes[key] = None
+    return {key: columns or [key] for key, columns in indexes.items()}
+
+
+def _range_selectivity(conn, workload, column_map, key):
+    """
+    Largest share of rows matched by the SELECT * filters on key
+    (None if no such query)
+    """
+    shares = []
+    for _, sql in workload:
+        if not re.search(r'SELECT\s+\*', sql, flags=re.IGNORECASE):
+            continue
+        where = _clause(sql, 'WHERE', 'GROUP BY|ORDER BY|LIMIT').strip().rstrip(';')
+        if key not in _columns_in(where, column_map):
+            continue
+        source = _clause(sql, 'FROM', 'WHERE').strip()
+        matched, total = conn.execute(
+            f"SELECT SUM(CASE WHEN {where} THEN 1 ELSE 0 END), COUNT(*) FROM {source}").fetchone()
+        shares.append((matched or 0) / total if total else 0.0)
+    return max(shares) if shares else None
+
+
+def explain(conn, sql):
+    """
+    EXPLAIN QUERY PLAN details of one statement
+    (bound parameters such as LIMIT ? get NULL, the plan doesn't depend on them)
+    """
+    placeholders = _STRING_LITERAL.sub('', sql).count('?')
+    return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql.strip().rstrip(';')}",
+                                            [None] * placeholders)]
+
+
+def drop_auto_indexes(conn):
+    """Drop indexes created by build_indexes."""
+    names = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE ?", (INDEX_PREFIX + '%',))]
+    for name in names:
+        conn.execute(f'DROP INDEX "{name}"')
+    return names
+
+
+def build_indexes(db_path='database/ecommerce.db', table_name='cleaned_sales_data', verbose=True):
+    """
+    Create covering indexes for the workload, run ANALYZE and print
+    EXPLAIN QUERY PLAN before/after for every query
+
+    Args:
+        db_path (str): Path to database file
+        table_name (str): Table (or star view) the workload reads
+        verbose (bool): Print the plans
+
+    Returns:
+        list: Names of the indexes created
+    """
+    workload = analytics_workload(db_path) + sql_file_workload()
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        target, column_map = _column_map(conn, table_name)
+        if is_partitioned(conn, table_name):
+            targets = list_partitions(conn, table_name)['partition_table'].tolist()
+        else:
+            targets = [target]
+        drop_auto_indexes(conn)
+        before = {label: explain(conn, sql) for label, sql in workload}
+
+        created, skipped = [], []
+        conn.execute("BEGIN")
+        try:
+            for key, columns in plan_indexes(workload, column_map).items():
+                if len(columns) == 1:
+                    share = _range_selectivity(conn, workload, column_map, key)
+                    if share is not None and share > MAX_RANGE_SELECTIVITY:
+                        skipped.append((key, share))
+                        continue
+                col_list = ', '.join(f'"{col[:-5]}" DESC' if col.endswith(' DESC') else f'"{col}"'
+                                     for col in columns)
+                for table in targets:
+                    name = f"{INDEX_PREFIX}{table}_{key}"
+                    conn.execute(f'CREATE INDEX "{name}" ON "{table}" ({col_list})')
+                    created.append((name, columns))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("ANALYZE")
+        after = {label: explain(conn, sql) for label, sql in workload}
+    finally:
+        conn.close()
+
+    if verbose:
+        where = f"{len(targets)} partitions of '{target}'" if len(targets) > 1 else f"'{target}'"
+        print(f"\n Indexes on {where}:")
+        for name, columns in created:
+            print(f"   {name} ({', '.join(columns)})")
+        for key, share in skipped:
+            print(f"   skipped '{key}': filter matches {share:.0%} of rows, a table scan is cheaper")
+        print("\n Query plans (before -> after):")
+        for label, _ in workload:
+            print(f"   {label}")
+            print(f"      before: {' | '.join(before[label])}")
+            print(f"      after:  {' | '.join(after[label])}")
+    return [name for name, _ in created]
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'database/ecommerce.db'
+    table_name = sys.argv[2] if len(sys.argv) > 2 else 'cleaned_sales_data'
+
+    print("INDEX BUILDER")
+
+    if not os.path.exists(db_path):
+        print(f" ERROR: Database not found: {db_path}")
+        sys.exit(1)
+    build_indexes(db_path, table_name)
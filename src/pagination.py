@@ -0,0 +1,305 @@
+"""
+Keyset Pagination
+Row-level query results page by page, with bounded memory
+
+A RowQuery is SELECT columns FROM source WHERE ... ORDER BY keys. Instead of
+loading every matching row, paginate() reads `page_size` rows at a time and
+starts each page after the last row of the previous one:
+    WHERE ... AND k1 >= ? AND (k1 > ? OR (k1 = ? AND k2 > ?)) ORDER BY k1, k2 LIMIT ?
+(<= / < for descending keys; ties compared with IS NOT DISTINCT FROM so a
+NULL key value matches itself). Every page is an independent query, so a reader
+holds no cursor or connection between pages, rows added meanwhile cannot
+shift the pages, and a later page costs the same as the first when the sort
+key is indexed (no OFFSET that skips rows). The last key must be unique
+(order_id) so ties on the sort key never repeat or skip rows. A sort key
+that can be NULL goes behind its null_key(): > / < never hold against
+NULL, so the flag orders the NULL rows as one block ahead of (ascending)
+or behind (descending) the others, and the key's own comparison only
+decides between non-NULL values.
+Each page carries the cursor to resume after it in page.attrs['after'].
+
+estimate_count() scales a matched fraction of the first SAMPLE_ROWS rows to
+the total row count instead of counting every matching row.
+
+A table viewer sorts on any column (the unique key breaking ties) and
+searches with search_condition() in SQL; results computed in memory are
+sorted and searched by frame_view(). csv_file() writes every page to a
+spooled temporary file for download, one page in memory at a time.
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import tempfile
+from typing import Iterator
+
+import pandas as pd
+
+# Rows per page
+PAGE_SIZE = 10_000
+
+# Rows inspected by estimate_count
+SAMPLE_ROWS = 10_000
+
+# CSV downloads stay in memory up to this size, then go to a temporary file
+CSV_SPOOL_BYTES = 16 * 1024 * 1024
+
+
+def _check_columns(columns):
+    for col in columns:
+        if not isinstance(col, str) or not col.isidentifier():
+            raise ValueError(f"Invalid column name {col!r}")
+
+
+def keyset_condition(keys, after):
+    """
+    SQL condition for the rows after the cursor `after` in ORDER BY keys
+
+    Args:
+        keys (list): (expression, ascending) pairs
+        after (tuple): Key values of the last row already read
+
+    Returns:
+        tuple: (sql, params)
+    """
+    if len(after) != len(keys):
+        raise ValueError(f"Cursor has {len(after)} value(s), the query is paged on {len(keys)} key(s)")
+    # the bound on the first key alone lets an index on the keys seek to the
+    # cursor; the OR terms then only sort out the ties at the boundary
+    first, ascending = keys[0]
+    terms, params = [], [after[0]]
+    for i, (expr, ascending_i) in enumerate(keys):
+        parts = ([f"{prev} IS NOT DISTINCT FROM ?" for prev, _ in keys[:i]]
+                 + [f"{expr} {'>' if ascending_i else '<'} ?"])
+        terms.append("(" + " AND ".join(parts) + ")")
+        params.extend(after[:i + 1])
+    return f"{first} {'>=' if ascending else '<='} ? AND (" + " OR ".join(terms) + ")", params
+
+
+def null_key(expr, ascending=True):
+    """
+    (expression, ascending) key to put ahead of a nullable sort key: 1 on
+    NULL rows, which come first ascending and last descending (as SQLite
+    orders them) on every backend
+    """
+    return f"({expr} IS NULL)", not ascending
+
+
+def search_condition(columns, text):
+    """
+    SQL condition for the rows with `text` in any of `columns` (case-insensitive substring)
+
+    Returns:
+        tuple: (sql, params)
+    """
+    _check_columns(columns)
+    escaped = text.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    terms = [f"LOWER(CAST({col} AS TEXT)) LIKE ? ESCAPE '\\'" for col in columns]
+    return "(" + " OR ".join(terms) + ")", [f"%{escaped}%"] * len(columns)
+
+
+class RowQuery:
+    """
+    Declarative row-level query, paged on its sort keys
+
+    Args:
+        source (str): FROM clause
+        keys (list): (expression, ascending) pairs; the last one unique
+        columns (list): Columns to return (None: all)
+        where (str): 'WHERE ...' clause of the filters, or ''
+        params (list): Parameters of `where`
+        conditions (list): Further SQL conditions without parameters
+        search (tuple): (sql, params) of a search_condition, tested after
+                        the other conditions
+    """
+
+    def __init__(self, source, keys, columns=None, where="", params=(), conditions=(), search=None):
+        if not keys:
+            raise ValueError("A paged query needs at least one sort key")
+        if columns is not None:
+            _check_columns(columns)
+        self.source = source
+        self.keys = list(keys)
+        self.columns = list(columns) if columns is not None else None
+        self.where = where
+        self.params = list(params)
+        self.conditions = list(conditions)
+        self.search = search
+
+    def _where(self, extra=None):
+        clauses = [self.where[len("WHERE "):]] if self.where else []
+        clauses += self.conditions
+        if self.search:
+            clauses.append(self.search[0])
+        if extra:
+            clauses.append(extra)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else ""
+
+    def _params(self):
+        return [*self.params, *(self.search[1] if self.search else [])]
+
+    def _select(self):
+        # the keys ride along (and are dropped again) so projected pages can still be resumed
+        columns = ", ".join(self.columns) if self.columns is not None else "*"
+        keys = ", ".join(f"{expr} AS _key{i}" for i, (expr, _) in enumerate(self.keys))
+        return f"{columns}, {keys}"
+
+    def _order_by(self):
+        return ", ".join(f"{expr} {'ASC' if ascending else 'DESC'}" for expr, ascending in self.keys)
+
+    def to_sql(self):
+        """(sql, params) of the whole result."""
+        columns = ", ".join(self.columns) if self.columns is not None else "*"
+        return (f"SELECT {columns} FROM {self.source} {self._where()} ORDER BY {self._order_by()}",
+                self._params())
+
+    def page_sql(self, page_size, after=None):
+        """(sql, params) of the `page_size` rows after the cursor (from the start if None)."""
+        extra, extra_params = keyset_condition(self.keys, after) if after is not None else (None, [])
+        sql = (f"SELECT {self._select()} FROM {self.source} {self._where(extra)} "
+               f"ORDER BY {self._order_by()} LIMIT ?")
+        return sql, [*self._params(), *extra_params, int(page_size)]
+
+    def count_sql(self):
+        """(sql, params) counting the rows of the result (no row is returned)."""
+        return f"SELECT COUNT(*) AS row_count FROM {self.source} {self._where()}", self._params()
+
+    def sample_sql(self, sample=SAMPLE_ROWS):
+        """(sql, params) of (rows sampled, rows matching the conditions) among the first `sample` filtered rows."""
+        matched = " AND ".join(self.conditions) if self.conditions else "1 = 1"
+        sql = (f"SELECT COUNT(*) AS sampled, COALESCE(SUM(CASE WHEN {matched} THEN 1 ELSE 0 END), 0) AS matched "
+               f"FROM (SELECT * FROM {self.source} {self.where} LIMIT ?) AS sampled_rows")
+        return sql, [*self.params, int(sample)]
+
+
+def paginate(read, query: RowQuery, page_size=PAGE_SIZE, after=None) -> Iterator[pd.DataFrame]:
+    """
+    Yield the result of `query` `page_size` rows at a time
+
+    Args:
+        read (callable): (sql, params) -> DataFrame, e.g. SalesAnalytics._read
+        query (RowQuery): Query to page through
+        page_size (int): Rows per page
+        after (tuple): Resume after this cursor (a previous page.attrs['after'])
+
+    Yields:
+        pd.DataFrame: Pages of at most page_size rows; attrs['after'] is the
+                      cursor of the page's last row
+    """
+    if page_size < 1:
+        raise ValueError(f"Page size must be at least 1, got {page_size}")
+    key_columns = [f"_key{i}" for i in range(len(query.keys))]
+    dtypes = {}
+    while True:
+        page = read(*query.page_sql(page_size, after))
+        if page.empty:
+            return
+        # per column: Python scalars (sqlite3 binds no numpy integer), None for NULL (not NaN)
+        after = tuple(None if pd.isna(value) else value
+                      for value in (page[col].iloc[-1:].tolist()[0] for col in key_columns))
+        page = page.drop(columns=key_columns)
+        # an all NULL column reads back as object: keep the dtype of the pages before
+        empty = page.columns[page.isna().all()]
+        dtypes.update(page.dtypes.drop(empty).items())
+        page = page.astype({col: dtypes[col] for col in empty if col in dtypes and dtypes[col].kind not in 'iub'})
+        page.attrs['after'] = after
+        yield page
+        if len(page) < page_size:
+            return
+
+
+def frame_pages(frame: pd.DataFrame, key, page_size=PAGE_SIZE, columns=None, after=None) -> Iterator[pd.DataFrame]:
+    """
+    paginate() over an already sorted DataFrame (results computed in memory)
+
+    Args:
+        frame (pd.DataFrame): Sorted result
+        key (str): Unique column; the cursor is its value on the last row read
+                   (None: the cursor is the last row's position)
+        page_size (int): Rows per page
+        columns (list): Columns to return (None: all)
+        after (tuple): Resume after this cursor
+    """
+    if page_size < 1:
+        raise ValueError(f"Page size must be at least 1, got {page_size}")
+    if columns is not None:
+        missing = [col for col in columns if col not in frame.columns]
+        if missing:
+            raise ValueError(f"Unknown column(s) {missing}")
+    start = 0
+    if after is not None and key is None:
+        start = int(after[-1]) + 1
+    elif after is not None:
+        position = (frame[key] == after[-1]).to_numpy().nonzero()[0]
+        start = int(position[0]) + 1 if len(position) else len(frame)
+    for begin in range(start, len(frame), page_size):
+        page = frame.iloc[begin:begin + page_size].reset_index(drop=True)
+        after = (page[key].iloc[-1],) if key is not None else (begin + len(page) - 1,)
+        if columns is not None:
+            page = page[list(columns)]
+        page.attrs['after'] = after
+        yield page
+
+
+def frame_view(frame: pd.DataFrame, sort=None, ascending=True, search=None) -> pd.DataFrame:
+    """
+    A result computed in memory sorted on `sort` (stable: ties keep their
+    order) and reduced to the rows with `search` in any column, as
+    search_condition() does in SQL
+
+    Returns:
+        pd.DataFrame: The matching rows, index reset
+    """
+    if sort is not None and sort not in frame.columns:
+        raise ValueError(f"Unknown sort column {sort!r}")
+    if search:
+        text = search.lower()
+        matches = pd.Series(False, index=frame.index)
+        for col in frame.columns:
+            matches |= frame[col].astype(str).str.lower().str.contains(text, regex=False)
+        frame = frame[matches]
+    if sort is not None:
+        frame = frame.sort_values(sort, ascending=ascending, kind='stable', na_position='first')
+    return frame.reset_index(drop=True)
+
+
+def csv_file(pages, max_memory=CSV_SPOOL_BYTES):
+    """
+    CSV of a paged result, written one page at a time
+
+    Args:
+        pages (iterable): DataFrames with the same columns (e.g. from paginate())
+        max_memory (int): Bytes kept in memory before spilling to disk
+
+    Returns:
+        file: Binary file object positioned at the start
+    """
+    file = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    header = True
+    for page in pages:
+        file.write(page.to_csv(index=False, header=header).encode('utf-8'))
+        header = False
+    file.seek(0)
+    return file
+
+
+def estimate_count(read, query: RowQuery, total, sample=SAMPLE_ROWS):
+    """
+    Estimated number of rows of `query`
+
+    The share of the first `sample` filtered rows that match the conditions,
+    times `total` (the filtered row count, e.g. from the rollup). Exact when
+    there are no conditions or the filtered rows fit in the sample. Rows are
+    sampled in storage order, so conditions correlated with load order
+    (dates) are estimated less precisely.
+
+    Returns:
+        tuple: (estimate, exact)
+    """
+    if not query.conditions:
+        return int(total), True
+    counts = read(*query.sample_sql(sample))
+    sampled, matched = int(counts['sampled'].sum()), int(counts['matched'].sum())
+    if sampled < sample:
+        return matched, True
+    return int(round(total * matched / sampled)), False
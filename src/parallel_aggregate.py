@@ -0,0 +1,218 @@
+"""
+Parallel Aggregation
+Partial aggregates over row-range shards, run in a pool of processes
+
+A whole-table GROUP BY runs on one core inside one SQLite connection.
+SalesAnalytics.parallel(workers) splits the raw rows into shards - rowid
+ranges of the table (of the fact table in the star layout, of every
+partition in the partitioned layout) - and runs the scan planner's partial
+aggregate query (SUM / COUNT, AVG as SUM + COUNT) on every shard in a
+process pool, each worker with its own read-only connection. The partials
+are added up per group (scan_planner.combine_partials), averages are
+sum / count of the merged partials, and HAVING / ORDER BY / LIMIT run once
+on the merged result. Rollup queries are small and stay serial.
+
+Results match the serial path: keys, counts and integer sums exactly,
+float sums up to the order they are added in (rtol 1e-9).
+
+Usage:
+    python src/parallel_aggregate.py [db_path] [workers]
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import atexit
+import os
+import sqlite3
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+try:
+    from src.connection_pool import MMAP_SIZE, CACHE_SIZE_KB
+except ImportError:  # run as a script: python src/parallel_aggregate.py
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    from src.connection_pool import MMAP_SIZE, CACHE_SIZE_KB
+
+# Shards per worker: a worker that finishes early picks up another shard
+SHARDS_PER_WORKER = 2
+
+# Rows per shard at least; smaller tables are scanned in one query
+# (starting the shards would cost more than it saves)
+MIN_SHARD_ROWS = 100_000
+
+
+def shard_ranges(conn, units, shards, min_rows=MIN_SHARD_ROWS):
+    """
+    Split tables into rowid ranges
+
+    Args:
+        conn (sqlite3.Connection): Open database connection
+        units (list): (table, FROM clause, rowid qualifier) of every table to scan
+        shards (int): Number of shards wanted over all tables
+        min_rows (int): Smallest shard (rowids are dense after a bulk load,
+                        so a rowid range is about that many rows)
+
+    Returns:
+        list: (FROM clause, rowid qualifier, first rowid, end rowid (excluded)),
+              empty if the tables are too small to split
+    """
+    spans = []
+    for table, source, qualifier in units:
+        # separate subqueries: SQLite only reads MIN / MAX off the b-tree ends one at a time
+        low, high = conn.execute(f'SELECT (SELECT MIN(rowid) FROM "{table}"), '
+                                 f'(SELECT MAX(rowid) FROM "{table}")').fetchone()
+        if low is not None:
+            spans.append((source, qualifier, low, high + 1))
+    total = sum(end - low for _, _, low, end in spans)
+    if total < 2 * min_rows:
+        return []
+    ranges = []
+    for source, qualifier, low, end in spans:
+        span = end - low
+        pieces = max(1, min(round(shards * span / total), span // min_rows))
+        bounds = [low + span * i // pieces for i in range(pieces)] + [end]
+        ranges += [(source, qualifier, start, stop) for start, stop in zip(bounds, bounds[1:])]
+    return ranges
+
+
+# ========================
+# Worker processes
+# ========================
+# db path -> read-only connection of this worker process
+_CONNECTIONS = {}
+
+
+def _worker_connection(db_path):
+    conn = _CONNECTIONS.get(db_path)
+    if conn is None:
+        uri = f"file:{urllib.parse.quote(db_path)}?mode=ro"
+        conn = _CONNECTIONS[db_path] = sqlite3.connect(uri, uri=True)
+        conn.execute(f"PRAGMA mmap_size = {int(MMAP_SIZE)}")
+        conn.execute(f"PRAGMA cache_size = -{int(CACHE_SIZE_KB)}")
+    return conn
+
+
+def _read_shard(db_path, sql, params):
+    """One shard's partial aggregates (runs in a worker process)."""
+    return pd.read_sql_query(sql, _worker_connection(db_path), params=params)
+
+
+# Process pools shared by every SalesAnalytics instance of the process,
+# one per worker count (workers start once, not per query)
+_EXECUTORS = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+
+def shared_executor(workers):
+    """The process-wide pool of `workers` processes."""
+    with _EXECUTORS_LOCK:
+        executor = _EXECUTORS.get(workers)
+        if executor is None:
+            executor = _EXECUTORS[workers] = ProcessPoolExecutor(max_workers=workers)
+        return executor
+
+
+def read_shards(db_path, queries, workers):
+    """
+    Run shard queries in the shared pool
+
+    Args:
+        db_path (str): Path to database file
+        queries (list): (sql, params) of every shard
+        workers (int): Pool size
+
+    Returns:
+        list: DataFrame of every query, in order
+    """
+    executor = shared_executor(workers)
+    try:
+        futures = [executor.submit(_read_shard, db_path, sql, list(params)) for sql, params in queries]
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        # a worker died (e.g. killed): the next call starts a new pool
+        with _EXECUTORS_LOCK:
+            if _EXECUTORS.get(workers) is executor:
+                del _EXECUTORS[workers]
+        raise
+
+
+@atexit.register
+def close_executors():
+    """Shut down every shared pool (runs at interpreter exit)."""
+    with _EXECUTORS_LOCK:
+        executors = list(_EXECUTORS.values())
+        _EXECUTORS.clear()
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ========================
+# Serial vs parallel check
+# ========================
+def compare_parallel(db_path='database/ecommerce.db', workers=None, rtol=1e-9):
+    """
+    Run every aggregate method of the backend parity workload serially and
+    in parallel (both uncached), print the time of each and check the results match
+
+    Returns:
+        bool: True if every result matches
+    """
+    from src.analytics import SalesAnalytics
+    from src.backend_parity import METHODS
+
+    workers = workers or os.cpu_count()
+    serial = SalesAnalytics(db_path, use_cache=False, use_rollup=False)
+    parallel = serial.parallel(workers)
+    print("PARALLEL AGGREGATION")
+    print(f"\n {workers} worker process(es), {os.cpu_count()} CPU(s)")
+    # start the workers before timing anything
+    parallel.Count_Total_Orders()
+
+    mismatches, exact = [], 0
+    serial_total = parallel_total = 0.0
+    print(f"\n   {'method':28s} {'serial':>9s} {'parallel':>9s} {'speedup':>8s}")
+    for name, args in METHODS.items():
+        if not hasattr(getattr(SalesAnalytics, name), 'aggregate'):
+            continue
+        start = time.perf_counter()
+        expected = getattr(serial, name)(*args)
+        serial_s = time.perf_counter() - start
+        start = time.perf_counter()
+        result = getattr(parallel, name)(*args)
+        parallel_s = time.perf_counter() - start
+        serial_total += serial_s
+        parallel_total += parallel_s
+        print(f"   {name:28s} {serial_s:8.3f}s {parallel_s:8.3f}s {serial_s / max(parallel_s, 1e-9):7.1f}x")
+        try:
+            # an empty SQL result has object columns whatever the query selects
+            pd.testing.assert_frame_equal(expected, result, check_exact=False, rtol=rtol,
+                                          check_dtype=not expected.empty)
+            exact += expected.equals(result)
+        except AssertionError as e:
+            mismatches.append(f"{name}: {e}")
+    print(f"   {'TOTAL':28s} {serial_total:8.3f}s {parallel_total:8.3f}s "
+          f"{serial_total / max(parallel_total, 1e-9):7.1f}x")
+
+    if mismatches:
+        print(f"\n {len(mismatches)} mismatching result(s):")
+        for message in mismatches:
+            print(f"   - {message}")
+    else:
+        print(f"\n All results match the serial path ({exact} bit for bit, the rest within rtol {rtol})")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'database/ecommerce.db'
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    if not os.path.exists(db_path):
+        print(f" ERROR: Database not found: {db_path}")
+        sys.exit(1)
+    sys.exit(0 if compare_parallel(db_path, workers) else 1)
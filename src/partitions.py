@@ -0,0 +1,442 @@
+"""
+Time-Partitioned Storage
+Splits the sales table into one table per year (or month) of order_date,
+behind a UNION ALL view with the original name so every query keeps working
+
+Layout (for table 'cleaned_sales_data', granularity 'year'):
+- cleaned_sales_data_p2014, cleaned_sales_data_p2015, ... (rows clustered
+  by order_date, indexed on order_date and order_id)
+- cleaned_sales_data_pundated for rows without a parseable order_date
+- _sales_partitions: one row per partition with its [start_date, end_date)
+  range, row count and frozen flag
+- cleaned_sales_data becomes a VIEW over all partitions
+
+Date-bounded queries (SalesAnalytics start_date / end_date) read only the
+partitions overlapping the range (partitions_for_range).
+Old partitions can be frozen (read-only, enforced by triggers) and compacted
+one at a time; the database uses auto_vacuum=INCREMENTAL so the pages a
+compaction frees go back to the OS without a full VACUUM.
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+
+import pandas as pd
+
+PARTITION_TABLE = '_sales_partitions'
+
+# granularity -> strftime format of the partition key
+GRANULARITIES = {'year': '%Y', 'month': '%Y-%m'}
+
+UNDATED = 'undated'
+
+
+def _ensure_partition_table(conn):
+    conn.execute(f"""CREATE TABLE IF NOT EXISTS {PARTITION_TABLE} (
+                        table_name TEXT NOT NULL,
+                        partition_table TEXT NOT NULL,
+                        partition_key TEXT NOT NULL,
+                        granularity TEXT NOT NULL,
+                        start_date TEXT,
+                        end_date TEXT,
+                        rows INTEGER,
+                        frozen INTEGER NOT NULL DEFAULT 0,
+                        updated_at TEXT,
+                        PRIMARY KEY (table_name, partition_key)
+                    )""")
+
+
+def is_partitioned(conn, table_name='cleaned_sales_data'):
+    """True if table_name is the view built by partition_table."""
+    row = conn.execute(
+        "SELECT type FROM sqlite_master WHERE name = ?", (table_name,)
+    ).fetchone()
+    if row is None or row[0] != 'view':
+        return False
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                    (PARTITION_TABLE,)).fetchone() is None:
+        return False
+    return conn.execute(f"SELECT 1 FROM {PARTITION_TABLE} WHERE table_name = ? LIMIT 1",
+                        (table_name,)).fetchone() is not None
+
+
+def list_partitions(conn, table_name='cleaned_sales_data'):
+    """Partition metadata of table_name ordered by date (undated last)."""
+    return pd.read_sql_query(
+        f"""SELECT partition_table, partition_key, granularity, start_date, end_date, rows, frozen, updated_at
+            FROM {PARTITION_TABLE}
+            WHERE table_name = ?
+            ORDER BY start_date IS NULL, start_date""", conn, params=(table_name,))
+
+
+def _granularity(conn, table_name):
+    row = conn.execute(f"SELECT granularity FROM {PARTITION_TABLE} WHERE table_name = ? LIMIT 1",
+                       (table_name,)).fetchone()
+    return row[0] if row else None
+
+
+def _bounds(key, granularity):
+    """[start_date, end_date) of a partition key ('2015' or '2015-03')."""
+    if key == UNDATED:
+        return None, None
+    if granularity == 'year':
+        return f'{key}-01-01', f'{int(key) + 1:04d}-01-01'
+    year, month = int(key[:4]), int(key[5:7])
+    end = f'{year + 1:04d}-01-01' if month == 12 else f'{year:04d}-{month + 1:02d}-01'
+    return f'{key}-01', end
+
+
+def _key_expression(granularity, column='order_date'):
+    return f"COALESCE(strftime('{GRANULARITIES[granularity]}', {column}), '{UNDATED}')"
+
+
+def _partition_table_name(table_name, key):
+    return f"{table_name}_p{key.replace('-', '_')}"
+
+
+def _create_partition(conn, table_name, key, granularity, columns):
+    """Create one empty partition table and register it."""
+    name = _partition_table_name(table_name, key)
+    col_defs = ', '.join(f'"{col}" {col_type}'.strip() for col, col_type in columns)
+    conn.execute(f'CREATE TABLE "{name}" ({col_defs})')
+    names = [col for col, _ in columns]
+    if 'order_date' in names:
+        conn.execute(f'CREATE INDEX "ix_{name}_order_date" ON "{name}" (order_date)')
+    if 'order_id' in names:
+        conn.execute(f'CREATE INDEX "ix_{name}_order_id" ON "{name}" (order_id)')
+    start_date, end_date = _bounds(key, granularity)
+    conn.execute(f"""INSERT INTO {PARTITION_TABLE}
+                    (table_name, partition_table, partition_key, granularity, start_date, end_date, rows, frozen)
+                    VALUES (?, ?, ?, ?, ?, ?, 0, 0)""",
+                 (table_name, name, key, granularity, start_date, end_date))
+    return name
+
+
+def _refresh_view(conn, table_name):
+    """(Re)create the UNION ALL view over every partition."""
+    tables = list_partitions(conn, table_name)['partition_table'].tolist()
+    conn.execute(f'DROP VIEW IF EXISTS "{table_name}"')
+    conn.execute(f'CREATE VIEW "{table_name}" AS '
+                 + ' UNION ALL '.join(f'SELECT * FROM "{name}"' for name in tables))
+
+
+def _route_rows(conn, source_table, table_name, granularity, columns):
+    """
+    Insert rows of source_table into their partitions (created on demand),
+    clustered by order_date
+
+    Returns:
+        bool: True if new partitions were created (the view needs a refresh)
+    """
+    existing = dict(conn.execute(
+        f"SELECT partition_key, partition_table FROM {PARTITION_TABLE} WHERE table_name = ?",
+        (table_name,)).fetchall())
+    key_expr = _key_expression(granularity)
+    col_list = ', '.join(f'"{col}"' for col, _ in columns)
+    created = False
+
+    keys = [row[0] for row in conn.execute(f'SELECT DISTINCT {key_expr} FROM "{source_table}"')]
+    if len(keys) > 1:
+        # one index on the key instead of a full scan of the source per partition
+        # (dropped together with the source table)
+        conn.execute(f'CREATE INDEX IF NOT EXISTS "ix_{source_table}_partition_key" '
+                     f'ON "{source_table}" ({key_expr})')
+    for key in keys:
+        name = existing.get(key)
+        if name is None:
+            name = _create_partition(conn, table_name, key, granularity, columns)
+            created = True
+        conn.execute(f"""INSERT INTO "{name}" ({col_list})
+                        SELECT {col_list} FROM "{source_table}"
+                        WHERE {key_expr} = ?
+                        ORDER BY order_date""", (key,))
+    _update_counts(conn, table_name, keys)
+    return created
+
+
+def _update_counts(conn, table_name, keys=None):
+    now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    for key, name in conn.execute(
+            f"SELECT partition_key, partition_table FROM {PARTITION_TABLE} WHERE table_name = ?",
+            (table_name,)).fetchall():
+        if keys is None or key in keys:
+            rows = conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+            conn.execute(f"UPDATE {PARTITION_TABLE} SET rows = ?, updated_at = ? "
+                         f"WHERE table_name = ? AND partition_key = ?", (rows, now, table_name, key))
+
+
+def partition_table(conn, table_name='cleaned_sales_data', granularity='year', vacuum=True):
+    """
+    Replace a table with the partitioned layout (partitions + view)
+
+    Args:
+        conn (sqlite3.Connection): Connection opened with isolation_level=None
+        table_name (str): Table to partition (becomes a view)
+        granularity (str): 'year' or 'month'
+        vacuum (bool): Switch the database to auto_vacuum=INCREMENTAL
+                       (needs one VACUUM) so partitions compact on their own
+
+    Returns:
+        int: Number of partitions
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}', expected one of {list(GRANULARITIES)}")
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (table_name,)).fetchone()
+    if row is None or row[0] != 'table':
+        raise ValueError(f"'{table_name}' is not a plain table (already partitioned or star layout?)")
+    columns = [(r[1], r[2] or '') for r in conn.execute(f'PRAGMA table_info("{table_name}")')]
+    if 'order_date' not in [col for col, _ in columns]:
+        raise ValueError(f"Table '{table_name}' has no order_date column")
+
+    source = f'{table_name}_unpartitioned'
+    conn.execute("BEGIN")
+    try:
+        _ensure_partition_table(conn)
+        conn.execute(f"DELETE FROM {PARTITION_TABLE} WHERE table_name = ?", (table_name,))
+        conn.execute(f'ALTER TABLE "{table_name}" RENAME TO "{source}"')
+        _route_rows(conn, source, table_name, granularity, columns)
+        conn.execute(f'DROP TABLE "{source}"')
+        _refresh_view(conn, table_name)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    if vacuum:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+    return len(list_partitions(conn, table_name))
+
+
+def merge_into_partitions(conn, staging_table, table_name='cleaned_sales_data', key_column='order_id',
+                          before_merge=None, after_merge=None):
+    """
+    Merge rows from a staging table into the partitioned layout
+    Rows whose key already exists in any partition are replaced (upsert);
+    touching a frozen partition aborts the merge
+
+    Args:
+        conn (sqlite3.Connection): Connection opened with isolation_level=None
+        staging_table (str): Table holding the new rows (dropped afterwards)
+        table_name (str): Partitioned view name
+        key_column (str): Upsert key
+        before_merge, after_merge (callable): Called with conn inside the merge
+                                              transaction (e.g. rollup maintenance)
+
+    Returns:
+        int: Number of rows merged
+    """
+    columns = [(r[1], r[2] or '') for r in conn.execute(f'PRAGMA table_info("{table_name}")')]
+    staging_names = [r[1] for r in conn.execute(f'PRAGMA table_info("{staging_table}")')]
+    missing = {col for col, _ in columns} - set(staging_names)
+    if missing:
+        raise ValueError(f"Staging table is missing columns: {', '.join(sorted(missing))}")
+    # declared types come from the first partition, the view has none
+    first = list_partitions(conn, table_name)['partition_table'].iloc[0]
+    columns = [(r[1], r[2] or '') for r in conn.execute(f'PRAGMA table_info("{first}")')]
+
+    conn.execute("BEGIN")
+    try:
+        if before_merge is not None:
+            before_merge(conn)
+        touched = []
+        if key_column in staging_names:
+            parts = list_partitions(conn, table_name)
+            for key, name in zip(parts['partition_key'], parts['partition_table']):
+                # frozen partitions abort here (trigger) if a key lives in them
+                deleted = conn.execute(f"""DELETE FROM "{name}"
+                                WHERE "{key_column}" IN (SELECT "{key_column}" FROM "{staging_table}")""").rowcount
+                if deleted:
+                    touched.append(key)
+        if _route_rows(conn, staging_table, table_name, _granularity(conn, table_name), columns):
+            _refresh_view(conn, table_name)
+        _update_counts(conn, table_name, touched)
+        if after_merge is not None:
+            after_merge(conn)
+        rows = conn.execute(f'SELECT COUNT(*) FROM "{staging_table}"').fetchone()[0]
+        conn.execute(f'DROP TABLE "{staging_table}"')
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return rows
+
+
+def drop_partitions(conn, table_name='cleaned_sales_data'):
+    """Remove the partitioned view, its partition tables and metadata."""
+    tables = list_partitions(conn, table_name)['partition_table'].tolist()
+    conn.execute(f'DROP VIEW IF EXISTS "{table_name}"')
+    for name in tables:
+        conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+    conn.execute(f"DELETE FROM {PARTITION_TABLE} WHERE table_name = ?", (table_name,))
+
+
+def partitions_for_range(conn, table_name='cleaned_sales_data', start_date=None, end_date=None):
+    """
+    Partition tables that can hold rows with start_date <= order_date < end_date
+    (either bound may be None; undated rows never match a bound)
+    """
+    parts = list_partitions(conn, table_name)
+    if start_date is None and end_date is None:
+        return parts['partition_table'].tolist()
+    dated = parts[parts['start_date'].notna()]
+    keep = pd.Series(True, index=dated.index)
+    if start_date is not None:
+        keep &= dated['end_date'] > start_date
+    if end_date is not None:
+        keep &= dated['start_date'] < end_date
+    return dated.loc[keep, 'partition_table'].tolist()
+
+
+# ========================
+# Frozen partitions
+# ========================
+def freeze_partitions(conn, table_name='cleaned_sales_data', before=None):
+    """
+    Make every partition that ends on or before `before` read-only
+
+    Args:
+        before (str): ISO date; default: all partitions but the latest
+
+    Returns:
+        list: Partition tables frozen by this call
+    """
+    parts = list_partitions(conn, table_name)
+    dated = parts[parts['start_date'].notna()]
+    if before is None:
+        candidates = dated.iloc[:-1]
+    else:
+        candidates = dated[dated['end_date'] <= before]
+    frozen = []
+    for name in candidates.loc[candidates['frozen'] == 0, 'partition_table']:
+        for action in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f"""CREATE TRIGGER IF NOT EXISTS "ro_{name}_{action.lower()}"
+                            BEFORE {action} ON "{name}"
+                            BEGIN SELECT RAISE(ABORT, 'partition {name} is frozen (read-only)'); END""")
+        conn.execute(f"UPDATE {PARTITION_TABLE} SET frozen = 1 WHERE partition_table = ?", (name,))
+        frozen.append(name)
+    return frozen
+
+
+def unfreeze_partition(conn, partition_table):
+    """Drop the read-only triggers of one partition."""
+    for action in ('insert', 'update', 'delete'):
+        conn.execute(f'DROP TRIGGER IF EXISTS "ro_{partition_table}_{action}"')
+    conn.execute(f"UPDATE {PARTITION_TABLE} SET frozen = 0 WHERE partition_table = ?", (partition_table,))
+
+
+def compact_partition(conn, partition_table):
+    """
+    Rewrite one partition in order_date order, refresh its statistics and
+    return the freed pages to the OS (incremental vacuum); the rest of the
+    database is not touched
+
+    Args:
+        conn (sqlite3.Connection): Connection opened with isolation_level=None
+        partition_table (str): Partition to compact
+
+    Returns:
+        int: Pages released
+    """
+    ddl = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                       (partition_table,)).fetchone()
+    owner = conn.execute(f"SELECT table_name FROM {PARTITION_TABLE} WHERE partition_table = ?",
+                         (partition_table,)).fetchone()
+    if ddl is None or owner is None:
+        raise ValueError(f"Partition '{partition_table}' not found")
+    dependents = [row[0] for row in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+        (partition_table,))]
+    rebuilt = f'{partition_table}_compact'
+
+    conn.execute("BEGIN")
+    try:
+        conn.execute(ddl[0].replace(f'"{partition_table}"', f'"{rebuilt}"', 1))
+        conn.execute(f'INSERT INTO "{rebuilt}" SELECT * FROM "{partition_table}" ORDER BY order_date')
+        # the view would block the rename while the partition is missing
+        conn.execute(f'DROP VIEW "{owner[0]}"')
+        conn.execute(f'DROP TABLE "{partition_table}"')
+        conn.execute(f'ALTER TABLE "{rebuilt}" RENAME TO "{partition_table}"')
+        for sql in dependents:
+            conn.execute(sql)
+        _refresh_view(conn, owner[0])
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    conn.execute(f'ANALYZE "{partition_table}"')
+    freed = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    conn.executescript("PRAGMA incremental_vacuum;")  # execute() would only free one page
+    return freed - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+
+def partition_database(db_path='database/ecommerce.db', table_name='cleaned_sales_data', granularity='year'):
+    """
+    Convert an existing database to the partitioned layout and list the partitions
+
+    Returns:
+        bool: True if successful
+    """
+    print("TIME PARTITIONING")
+
+    if not os.path.exists(db_path):
+        print(f" ERROR: Database not found: {db_path}")
+        return False
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        if is_partitioned(conn, table_name):
+            print(f" '{table_name}' is already partitioned")
+        else:
+            partition_table(conn, table_name, granularity)
+        print(list_partitions(conn, table_name).to_string(index=False))
+    except Exception as e:
+        print(f"\n ERROR: {e}")
+        return False
+    finally:
+        conn.close()
+    return True
+
+
+if __name__ == "__main__":
+    usage = (" Usage: python src/partitions.py partition [year|month] [db_path]\n"
+             "        python src/partitions.py freeze [YYYY-MM-DD] [db_path]\n"
+             "        python src/partitions.py compact [db_path]\n"
+             "        python src/partitions.py list [db_path]")
+    if len(sys.argv) < 2:
+        print(usage)
+        sys.exit(1)
+
+    command = sys.argv[1].lower()
+    if command == 'partition':
+        granularity = sys.argv[2] if len(sys.argv) > 2 else 'year'
+        db_path = sys.argv[3] if len(sys.argv) > 3 else 'database/ecommerce.db'
+        sys.exit(0 if partition_database(db_path, granularity=granularity) else 1)
+
+    if command == 'freeze':
+        before = sys.argv[2] if len(sys.argv) > 2 else None
+        db_path = sys.argv[3] if len(sys.argv) > 3 else 'database/ecommerce.db'
+    elif command in ('compact', 'list'):
+        db_path = sys.argv[2] if len(sys.argv) > 2 else 'database/ecommerce.db'
+    else:
+        print(usage)
+        sys.exit(1)
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        if command == 'freeze':
+            for name in freeze_partitions(conn, before=before):
+                print(f" Frozen: {name}")
+        elif command == 'compact':
+            parts = list_partitions(conn)
+            for name in parts.loc[parts['frozen'] == 1, 'partition_table']:
+                print(f" Compacted {name}: {compact_partition(conn, name):,} pages released")
+        print(list_partitions(conn).to_string(index=False))
+    finally:
+        conn.close()
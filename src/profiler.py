@@ -0,0 +1,369 @@
+"""
+Profiler
+Opt-in timing of SalesAnalytics methods and queries, reports and load stages
+
+Off by default (one attribute check per call). enable_profiling() switches on
+the process-wide registry PROFILER, which then records a sample per
+- method: every public SalesAnalytics / ReportGenerator method (wall time,
+  rows and bytes of the result, number of queries, full scans and temp
+  B-trees of the queries it ran)
+- query: every SQL statement SalesAnalytics runs, with its EXPLAIN QUERY
+  PLAN; a plain SCAN of a table is flagged as a full scan, USE TEMP B-TREE
+  (a sort or grouping without an index) as a temp B-tree (on DuckDB:
+  SEQ_SCAN / READ_PARQUET and ORDER_BY operators)
+- ingest: the stages of csv_to_database / multiple_csvs_to_database
+Samples over the slow threshold also go to the slow log (in memory, and as
+JSON lines to a file if one is given). Totals per (kind, name) are kept
+separately, so they survive the bounded sample buffer, and are exported as
+JSON or Prometheus text format.
+
+Usage:
+    python src/profiler.py [db_path] [slow_threshold_seconds] [output_prefix]
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import collections
+import datetime
+import functools
+import inspect
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Samples at or above this many seconds are logged as slow
+SLOW_QUERY_SECONDS = 1.0
+
+# Samples kept in memory (oldest dropped first); totals are kept regardless
+MAX_SAMPLES = 10_000
+
+METRIC_PREFIX = 'sales_intel'
+
+_SCAN = re.compile(r'^SCAN (\S+)(?: AS \S+)?$')
+_SUBQUERY = re.compile(r'^(?:CO-ROUTINE|MATERIALIZE) (\S+)')
+
+
+def result_size(result):
+    """(rows, bytes) of a DataFrame or a dict of DataFrames, (None, None) otherwise."""
+    frames = result.values() if isinstance(result, dict) else [result]
+    if not frames or not all(isinstance(df, pd.DataFrame) for df in frames):
+        return None, None
+    return (sum(len(df) for df in frames),
+            int(sum(df.memory_usage(index=True, deep=True).sum() for df in frames)))
+
+
+def plan_flags(plan):
+    """
+    Full scans and temp B-trees of an EXPLAIN QUERY PLAN (SQLite) or EXPLAIN (DuckDB)
+
+    Returns:
+        tuple: (scanned tables, number of temp B-trees)
+    """
+    subqueries = {m.group(1) for line in plan if (m := _SUBQUERY.match(line.strip()))}
+    scans, temp_btrees = [], 0
+    for line in plan:
+        line = line.strip()
+        match = _SCAN.match(line)
+        if match and match.group(1) not in subqueries:
+            scans.append(match.group(1))
+        elif line.startswith(('SEQ_SCAN', 'READ_PARQUET', 'PARQUET_SCAN', 'TABLE_SCAN')):
+            scans.append(line.split()[0])
+        if 'USE TEMP B-TREE' in line or line == 'ORDER_BY':  # DuckDB: a sort operator
+            temp_btrees += 1
+    return scans, temp_btrees
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Profiler:
+    """
+    Registry of profiling samples
+
+    Args:
+        slow_threshold (float): Seconds from which a sample is slow
+        slow_log (str): JSON lines file the slow samples are appended to
+        explain (bool): Record the query plan of every query
+        max_samples (int): Samples kept in memory
+    """
+
+    def __init__(self, slow_threshold=SLOW_QUERY_SECONDS, slow_log=None, explain=True,
+                 max_samples=MAX_SAMPLES):
+        self.enabled = False
+        self.slow_threshold = slow_threshold
+        self.slow_log = slow_log
+        self.explain = explain
+        self.samples = collections.deque(maxlen=max_samples)
+        self.slow = collections.deque(maxlen=max_samples)
+        self.totals = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def enable(self, slow_threshold=None, slow_log=None, explain=None):
+        if slow_threshold is not None:
+            self.slow_threshold = slow_threshold
+        if slow_log is not None:
+            self.slow_log = slow_log
+        if explain is not None:
+            self.explain = explain
+        self.enabled = True
+        return self
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Forget every sample, slow sample and total."""
+        with self._lock:
+            self.samples.clear()
+            self.slow.clear()
+            self.totals.clear()
+
+    def current(self):
+        """The innermost open span of this thread (None outside any)."""
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def span(self, kind, name, **fields):
+        """
+        Time the block as one sample; the yielded dict can be given more fields
+        (rows, ...). Queries recorded inside count towards it.
+        """
+        if not self.enabled:
+            yield {}
+            return
+        sample = {'kind': kind, 'name': name, **fields, 'queries': 0, 'full_scans': 0, 'temp_btrees': 0}
+        stack = self._local.__dict__.setdefault('stack', [])
+        parent = stack[-1] if stack else None
+        stack.append(sample)
+        start = time.perf_counter()
+        try:
+            yield sample
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+            if parent is not None:
+                for counter in ('queries', 'full_scans', 'temp_btrees'):
+                    parent[counter] += sample[counter]
+            self._add(sample, seconds, parent)
+
+    def record(self, kind, name, seconds, result=None, plan=None, **fields):
+        """Add one finished sample (e.g. a query), sized from `result` and flagged from `plan`."""
+        if not self.enabled:
+            return
+        rows, nbytes = result_size(result) if result is not None else (None, None)
+        sample = {'kind': kind, 'name': name, 'rows': rows, 'bytes': nbytes, **fields}
+        if plan is not None:
+            scans, temp_btrees = plan_flags(plan)
+            sample.update(plan=plan, scanned_tables=scans, full_scans=len(scans), temp_btrees=temp_btrees)
+        parent = self.current()
+        if parent is not None and kind == 'query':
+            parent['queries'] += 1
+            parent['full_scans'] += sample.get('full_scans', 0)
+            parent['temp_btrees'] += sample.get('temp_btrees', 0)
+        self._add(sample, seconds, parent)
+
+    def _add(self, sample, seconds, parent):
+        sample['seconds'] = seconds
+        sample['started'] = (datetime.datetime.now() - datetime.timedelta(seconds=seconds)).isoformat(
+            timespec='milliseconds')
+        sample['thread'] = threading.current_thread().name
+        sample['parent'] = parent['name'] if parent is not None else None
+        slow = seconds >= self.slow_threshold
+        with self._lock:
+            self.samples.append(sample)
+            total = self.totals.setdefault((sample['kind'], sample['name']), {
+                'count': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'rows': 0, 'bytes': 0,
+                'full_scans': 0, 'temp_btrees': 0, 'slow': 0})
+            total['count'] += 1
+            total['seconds'] += seconds
+            total['max_seconds'] = max(total['max_seconds'], seconds)
+            total['rows'] += sample.get('rows') or 0
+            total['bytes'] += sample.get('bytes') or 0
+            # a method's flags are those of the queries it ran
+            total['full_scans'] += sample.get('full_scans', 0)
+            total['temp_btrees'] += sample.get('temp_btrees', 0)
+            if slow:
+                total['slow'] += 1
+                self.slow.append(sample)
+                if self.slow_log:
+                    with open(self.slow_log, 'a') as f:
+                        f.write(json.dumps(sample, default=str) + '\n')
+
+    # ========================
+    # Export
+    # ========================
+    def summary(self):
+        """One row per (kind, name): count, seconds, max / avg seconds, rows, bytes, flags, slow."""
+        with self._lock:
+            rows = [{'kind': kind, 'name': name, **total} for (kind, name), total in self.totals.items()]
+        columns = ['kind', 'name', 'count', 'seconds', 'avg_seconds', 'max_seconds', 'rows', 'bytes',
+                   'full_scans', 'temp_btrees', 'slow']
+        summary = pd.DataFrame(rows, columns=[c for c in columns if c != 'avg_seconds'])
+        summary['avg_seconds'] = summary['seconds'] / summary['count'].where(summary['count'] > 0)
+        return summary[columns].sort_values('seconds', ascending=False, kind='stable').reset_index(drop=True)
+
+    def to_json(self, path=None):
+        """Summary, samples and slow samples as JSON (written to path if given)."""
+        with self._lock:
+            samples, slow = list(self.samples), list(self.slow)
+        text = json.dumps({'slow_threshold': self.slow_threshold,
+                           'summary': self.summary().to_dict(orient='records'),
+                           'samples': samples, 'slow': slow}, indent=2, default=str)
+        if path:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+    def to_prometheus(self, path=None):
+        """Totals in Prometheus text exposition format (written to path if given)."""
+        metrics = [
+            ('duration_seconds', 'summary', 'Wall time of profiled calls', None),
+            ('duration_seconds_max', 'gauge', 'Slowest profiled call', 'max_seconds'),
+            ('rows_total', 'counter', 'Rows returned', 'rows'),
+            ('result_bytes_total', 'counter', 'Bytes of the returned DataFrames', 'bytes'),
+            ('full_scans_total', 'counter', 'Full table scans in the query plans', 'full_scans'),
+            ('temp_btrees_total', 'counter', 'Temp B-trees (sorts / groupings without an index) in the query plans',
+             'temp_btrees'),
+            ('slow_total', 'counter', f'Calls at or above the slow threshold', 'slow'),
+        ]
+        with self._lock:
+            totals = sorted(self.totals.items())
+        lines = []
+        for metric, metric_type, help_text, field in metrics:
+            name = f"{METRIC_PREFIX}_{metric}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+            for (kind, call), total in totals:
+                labels = f'{{kind="{_escape(kind)}",name="{_escape(call)}"}}'
+                if field is None:
+                    lines.append(f"{name}_sum{labels} {total['seconds']:.6f}")
+                    lines.append(f"{name}_count{labels} {total['count']}")
+                else:
+                    lines.append(f"{name}{labels} {total[field]}")
+        text = '\n'.join(lines) + '\n'
+        if path:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+    def print_report(self, top=20):
+        """Print the slowest totals and the slow samples."""
+        summary = self.summary()
+        print(f"\n Profile ({len(summary)} call(s), slow threshold {self.slow_threshold}s):")
+        print(f"   {'kind':7s} {'name':45s} | {'count':>5s} | {'total':>8s} | {'max':>8s} | {'rows':>10s} | "
+              f"{'MB':>7s} | {'scans':>5s} | {'btree':>5s}")
+        for row in summary.head(top).itertuples():
+            print(f"   {row.kind:7s} {row.name[:45]:45s} | {row.count:5d} | {row.seconds:7.3f}s | "
+                  f"{row.max_seconds:7.3f}s | {row.rows:10,} | {row.bytes / 2**20:7.2f} | "
+                  f"{row.full_scans:5d} | {row.temp_btrees:5d}")
+        with self._lock:
+            slow = list(self.slow)
+        if slow:
+            print(f"\n Slow ({len(slow)}):")
+            for sample in slow[-top:]:
+                flags = ""
+                if sample.get('full_scans') or sample.get('temp_btrees'):
+                    flags = f", {sample['full_scans']} full scan(s), {sample['temp_btrees']} temp B-tree(s)"
+                print(f"   {sample['seconds']:7.3f}s {sample['kind']} {sample['name']}"
+                      f"{' (in ' + sample['parent'] + ')' if sample['parent'] else ''}{flags}")
+
+
+# Process-wide registry used by every hook (disabled until enable_profiling())
+PROFILER = Profiler()
+
+
+def enable_profiling(slow_threshold=SLOW_QUERY_SECONDS, slow_log=None, explain=True):
+    """Switch the process-wide profiler on and return it."""
+    return PROFILER.enable(slow_threshold, slow_log, explain)
+
+
+def disable_profiling():
+    PROFILER.disable()
+
+
+def profile_methods(kind='method'):
+    """
+    Class decorator: record a `kind` sample for every call of a public method
+    (name Class.method, rows and bytes of the result). Wrappers keep the
+    signature and attributes (cached, aggregate_query) of the method.
+    """
+    def decorate(cls):
+        for name, member in list(vars(cls).items()):
+            if name.startswith('_') or not inspect.isfunction(member):
+                continue
+            setattr(cls, name, profiled(kind, f"{cls.__name__}.{name}")(member))
+        return cls
+    return decorate
+
+
+def profiled(kind, name=None):
+    """Function decorator: record a `kind` sample (default name: the function's) for every call."""
+    def decorate(function):
+        label = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return function(*args, **kwargs)
+            with PROFILER.span(kind, label) as sample:
+                result = function(*args, **kwargs)
+                sample['rows'], sample['bytes'] = result_size(result)
+            return result
+        return wrapper
+    return decorate
+
+
+# ========================
+# Profile of every method
+# ========================
+def profile_report(db_path='database/ecommerce.db', slow_threshold=SLOW_QUERY_SECONDS, output=None):
+    """
+    Run every SalesAnalytics method of the parity check once, uncached, with
+    profiling on; print the report and optionally write output.json / output.prom
+    """
+    # run as a script this module is __main__: use the registry SalesAnalytics records into
+    try:
+        from src.analytics import SalesAnalytics
+        from src.backend_parity import run_methods
+        from src.profiler import PROFILER as profiler
+    except ImportError:  # run as a script: python src/profiler.py
+        sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+        from src.analytics import SalesAnalytics
+        from src.backend_parity import run_methods
+        from src.profiler import PROFILER as profiler
+
+    print("QUERY PROFILE")
+    profiler.enable(slow_threshold, slow_log=f"{output}.slow.jsonl" if output else None)
+    profiler.reset()
+    analytics = SalesAnalytics(db_path, use_cache=False)
+    try:
+        run_methods(analytics)
+    finally:
+        analytics.close()
+        profiler.disable()
+    profiler.print_report()
+    if output:
+        profiler.to_json(f"{output}.json")
+        profiler.to_prometheus(f"{output}.prom")
+        print(f"\n Written: {output}.json, {output}.prom, {output}.slow.jsonl")
+    return profiler
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'database/ecommerce.db'
+    slow_threshold = float(sys.argv[2]) if len(sys.argv) > 2 else SLOW_QUERY_SECONDS
+    output = sys.argv[3] if len(sys.argv) > 3 else None
+
+    if not os.path.exists(db_path):
+        print(f" ERROR: Database not found: {db_path}")
+        sys.exit(1)
+    profile_report(db_path, slow_threshold, output)
@@ -0,0 +1,310 @@
+"""
+Result Cache
+Two-tier cache for SalesAnalytics results, keyed on the data version
+
+- memory: LRU of results bounded by their in-memory size (max_bytes)
+- disk: Parquet files under <database folder>/.cache/<database file>/<version>/,
+  so a restarted dashboard or report run starts warm
+
+Keys are the method name plus its arguments with defaults filled in
+(Best_Products(10) and Best_Products(limit=10) share an entry).
+
+The version changes whenever the data behind the queries does:
+- SQLite: the ingestion watermark the loaders bump after every load
+  (bump_data_version) plus PRAGMA schema_version. PRAGMA data_version tells
+  a long-lived connection cheaply that another process committed, so the
+  watermark is only re-read then.
+- DuckDB: size and mtime of the Parquet snapshot
+When it changes, the memory tier is emptied and older versions are removed
+from disk.
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+DATA_VERSION_TABLE = '_data_version'
+
+# Memory tier budget (bytes of DataFrame memory, deep)
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+CACHE_FOLDER = '.cache'
+
+
+# ========================
+# Data version
+# ========================
+def bump_data_version(conn):
+    """Advance the ingestion watermark; loaders call this after every load."""
+    conn.execute(f"""CREATE TABLE IF NOT EXISTS {DATA_VERSION_TABLE} (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        version INTEGER NOT NULL,
+                        updated_at TEXT
+                    )""")
+    conn.execute(f"""INSERT INTO {DATA_VERSION_TABLE} VALUES (1, 1, datetime('now'))
+                    ON CONFLICT(id) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at""")
+    if conn.in_transaction:
+        conn.commit()
+
+
+def read_data_version(conn):
+    """Ingestion watermark (0 if no load has bumped it yet)."""
+    try:
+        row = conn.execute(f"SELECT version FROM {DATA_VERSION_TABLE} WHERE id = 1").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] if row else 0
+
+
+def read_data_updated_at(conn):
+    """UTC time of the last load that bumped the watermark (None if none has)."""
+    try:
+        row = conn.execute(f"SELECT updated_at FROM {DATA_VERSION_TABLE} WHERE id = 1").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def default_cache_dir(data_path):
+    """Disk tier folder of a database / Parquet file."""
+    folder, name = os.path.split(os.path.abspath(data_path))
+    return os.path.join(folder, CACHE_FOLDER, name)
+
+
+def _parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _nbytes(result):
+    frames = result.values() if isinstance(result, dict) else [result]
+    return int(sum(df.memory_usage(index=True, deep=True).sum() for df in frames))
+
+
+def _copy(result):
+    """Callers get their own copy, so mutating a result can't corrupt the cache."""
+    if isinstance(result, dict):
+        return {name: df.copy() for name, df in result.items()}
+    return result.copy()
+
+
+# ========================
+# Cache
+# ========================
+class ResultCache:
+    """
+    In-memory LRU in front of a Parquet folder
+
+    Args:
+        cache_dir (str): Disk tier folder (None: memory only)
+        max_bytes (int): Memory tier budget
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=CACHE_MAX_BYTES):
+        if cache_dir is not None and not _parquet_available():
+            print(" WARNING: pyarrow not installed, result cache is memory only")
+            cache_dir = None
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.version = None
+        self.stats = dict.fromkeys(['hits', 'disk_hits', 'misses', 'evictions', 'invalidations'], 0)
+        self._entries = OrderedDict()  # key -> (result, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(method_name, arguments, context=()):
+        """Stable key for a method call (arguments: name -> value)."""
+        payload = json.dumps([method_name, arguments, list(context)], sort_keys=True, default=str)
+        return f"{method_name}-{hashlib.sha1(payload.encode()).hexdigest()[:16]}"
+
+    def set_version(self, version):
+        """Switch to a data version; entries of any other version are dropped."""
+        with self._lock:
+            if version == self.version:
+                return
+            if self.version is not None:
+                self.stats['invalidations'] += 1
+            self.version = str(version)
+            self._entries.clear()
+            self._bytes = 0
+            if self.cache_dir and os.path.isdir(self.cache_dir):
+                for name in os.listdir(self.cache_dir):
+                    if name != self.version:
+                        shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+
+    def get(self, key):
+        """Cached result for key (memory first, then disk), or None."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return _copy(self._entries[key][0])
+        result = self._read_disk(key)
+        with self._lock:
+            if result is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['disk_hits'] += 1
+            self._remember(key, result)
+        return _copy(result)
+
+    def put(self, key, result):
+        """Store a result (DataFrame or dict of DataFrames) in both tiers."""
+        result = _copy(result)
+        with self._lock:
+            self._remember(key, result)
+        self._write_disk(key, result)
+
+    def clear(self):
+        """Empty both tiers."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self.cache_dir:
+                shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def info(self):
+        """Counters plus current size of the memory tier."""
+        with self._lock:
+            return {**self.stats, 'entries': len(self._entries), 'bytes': self._bytes,
+                    'max_bytes': self.max_bytes, 'version': self.version, 'cache_dir': self.cache_dir}
+
+    def _remember(self, key, result):
+        """Insert into the LRU and evict the least recently used entries over budget (lock held)."""
+        nbytes = _nbytes(result)
+        if nbytes > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (result, nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+            self.stats['evictions'] += 1
+
+    # ========================
+    # Disk tier
+    # ========================
+    def _folder(self):
+        return os.path.join(self.cache_dir, self.version)
+
+    def _read_disk(self, key):
+        if not self.cache_dir or self.version is None:
+            return None
+        manifest_path = os.path.join(self._folder(), f"{key}.json")
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            frames = {name: pd.read_parquet(os.path.join(self._folder(), f"{key}.{i}.parquet"))
+                      for i, name in enumerate(manifest['parts'])}
+        except (OSError, ValueError, KeyError):
+            return None
+        return frames if manifest['kind'] == 'dict' else frames[None]
+
+    def _write_disk(self, key, result):
+        """Parquet parts first, the manifest last (an entry without one is never read)."""
+        if not self.cache_dir or self.version is None:
+            return
+        folder = self._folder()
+        frames = result if isinstance(result, dict) else {None: result}
+        try:
+            os.makedirs(folder, exist_ok=True)
+            for i, df in enumerate(frames.values()):
+                path = os.path.join(folder, f"{key}.{i}.parquet")
+                df.to_parquet(path + '.tmp')
+                os.replace(path + '.tmp', path)
+            manifest = {'kind': 'dict' if isinstance(result, dict) else 'frame', 'parts': list(frames)}
+            with open(os.path.join(folder, f"{key}.json.tmp"), 'w') as f:
+                json.dump(manifest, f)
+            os.replace(os.path.join(folder, f"{key}.json.tmp"), os.path.join(folder, f"{key}.json"))
+        except (OSError, ValueError) as e:
+            print(f" WARNING: could not write cache entry {key}: {e}")
+
+
+# Caches shared by every SalesAnalytics instance of this process on the same data
+# (the dashboard creates a new instance on every rerun)
+_SHARED = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_cache(cache_dir, max_bytes=CACHE_MAX_BYTES):
+    """The process-wide ResultCache of cache_dir."""
+    with _SHARED_LOCK:
+        if cache_dir not in _SHARED:
+            _SHARED[cache_dir] = ResultCache(cache_dir, max_bytes)
+        return _SHARED[cache_dir]
+
+
+def call_key(analytics, method, args=(), kwargs=None):
+    """Cache key of analytics.method(*args, **kwargs)."""
+    bound = inspect.signature(method).bind(analytics, *args, **(kwargs or {}))
+    bound.apply_defaults()
+    arguments = dict(list(bound.arguments.items())[1:])
+    return analytics.cache.key(method.__name__, arguments, analytics._cache_context())
+
+
+def cached(method):
+    """
+    Serve a SalesAnalytics method from self.cache, keyed on the method name
+    and its bound arguments; the data version is checked on every call
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.cache is None:
+            return self._finish_result(method(self, *args, **kwargs))
+        self.cache.set_version(self._data_version())
+        key = call_key(self, method, args, kwargs)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._finish_result(method(self, *args, **kwargs))
+            self.cache.put(key, result)
+        return result
+
+    return wrapper
+
+
+def cache_folder_report(cache_dir):
+    """Print the versions and size of a disk tier."""
+    if not os.path.isdir(cache_dir):
+        print(f" No cache at {cache_dir}")
+        return
+    for version in sorted(os.listdir(cache_dir)):
+        folder = os.path.join(cache_dir, version)
+        files = os.listdir(folder)
+        size = sum(os.path.getsize(os.path.join(folder, name)) for name in files)
+        entries = sum(name.endswith('.json') for name in files)
+        print(f"   version {version}: {entries} entries, {size / 1024 ** 2:.2f} MB")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'info'
+    data_path = sys.argv[2] if len(sys.argv) > 2 else 'database/ecommerce.db'
+    if command not in ('info', 'clear'):
+        print(" Usage: python src/result_cache.py [info|clear] [db_or_parquet_path]")
+        sys.exit(1)
+
+    print("RESULT CACHE")
+    cache_dir = default_cache_dir(data_path)
+    if command == 'clear':
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        print(f" Cleared {cache_dir}")
+    else:
+        print(f" {cache_dir}")
+        cache_folder_report(cache_dir)
@@ -0,0 +1,111 @@
+"""
+RFM Engine
+Recency / Frequency / Monetary scores and segments per customer
+
+Input is one row per customer (last order date, order count, sales total),
+which SalesAnalytics.RFM_scores gets from a single GROUP BY scan. Everything
+after that is vectorized NumPy:
+- recency in days before the reference date (the latest order by default)
+- 1-5 quintile scores; ties always share a score (R: 5 = most recent)
+- a named segment from the first matching rule in RFM_SEGMENTS
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import numpy as np
+import pandas as pd
+
+# segment -> (R range, F range, M range), inclusive; first match wins
+RFM_SEGMENTS = [
+    ('Champions', (4, 5), (4, 5), (4, 5)),
+    ('Loyal Customers', (3, 5), (4, 5), (1, 5)),
+    ('Cannot Lose Them', (1, 2), (4, 5), (4, 5)),
+    ('At Risk', (1, 2), (3, 5), (1, 5)),
+    ('Potential Loyalists', (4, 5), (2, 3), (1, 5)),
+    ('New Customers', (4, 5), (1, 1), (1, 5)),
+    ('Hibernating', (1, 2), (1, 2), (1, 5)),
+]
+DEFAULT_SEGMENT = 'Need Attention'
+SEGMENT_NAMES = [name for name, *_ in RFM_SEGMENTS] + [DEFAULT_SEGMENT]
+
+RFM_COLUMNS = ['customer_id', 'customer_name', 'last_order_date', 'recency_days', 'frequency',
+               'monetary', 'r_score', 'f_score', 'm_score', 'rfm_score', 'segment']
+
+
+def quintile_scores(values: np.ndarray, reverse: bool = False) -> np.ndarray:
+    """
+    1-5 score of each value by the quintile it falls in
+    (equal values always get the same score)
+
+    Args:
+        values (np.ndarray): Numeric values
+        reverse (bool): Lowest values score 5 (recency)
+
+    Returns:
+        np.ndarray: int8 scores
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return np.empty(0, dtype=np.int8)
+    edges = np.quantile(values, [0.2, 0.4, 0.6, 0.8])
+    if reverse:
+        bins = np.searchsorted(edges, values, side='left')
+        return (5 - bins).astype(np.int8)
+    return (np.searchsorted(edges, values, side='right') + 1).astype(np.int8)
+
+
+def assign_segments(r: np.ndarray, f: np.ndarray, m: np.ndarray) -> pd.Categorical:
+    """Segment per customer from the first matching rule in RFM_SEGMENTS."""
+    conditions = [(r >= r_lo) & (r <= r_hi) & (f >= f_lo) & (f <= f_hi) & (m >= m_lo) & (m <= m_hi)
+                  for _, (r_lo, r_hi), (f_lo, f_hi), (m_lo, m_hi) in RFM_SEGMENTS]
+    codes = np.select(conditions, np.arange(len(RFM_SEGMENTS)), default=len(RFM_SEGMENTS))
+    return pd.Categorical.from_codes(codes.astype(np.int8), categories=SEGMENT_NAMES)
+
+
+def score_rfm(customers: pd.DataFrame, as_of=None) -> pd.DataFrame:
+    """
+    Score customers
+
+    Args:
+        customers (pd.DataFrame): customer_id, customer_name, last_order_date,
+                                  frequency, monetary (one row per customer)
+        as_of (str or date): Reference date for recency (default: latest order)
+
+    Returns:
+        pd.DataFrame: RFM_COLUMNS, one row per customer; scores in int8 / int16,
+                      measures in the dtypes of their SQL aggregates (int64
+                      recency and frequency, float monetary)
+    """
+    last = pd.to_datetime(customers['last_order_date'], format='ISO8601')
+    reference = pd.Timestamp(as_of) if as_of is not None else last.max()
+    if pd.isna(reference):  # no dated orders at all
+        reference = pd.Timestamp.today()
+    recency = (reference.normalize() - last.dt.normalize()).dt.days.to_numpy(dtype=np.float64, na_value=np.nan,
+                                                                           copy=True)
+    # customers without a dated order count as the least recent
+    undated = np.isnan(recency)
+    if undated.any():
+        recency[undated] = recency[~undated].max() if (~undated).any() else 0
+
+    frequency = customers['frequency'].fillna(0).to_numpy()
+    monetary = customers['monetary'].fillna(0).to_numpy()
+    r = quintile_scores(recency, reverse=True)
+    f = quintile_scores(frequency)
+    m = quintile_scores(monetary)
+
+    # text columns are passed through as they are (no round trip via Python objects)
+    scores = pd.DataFrame({
+        'customer_id': customers['customer_id'].reset_index(drop=True),
+        'customer_name': customers['customer_name'].reset_index(drop=True),
+        'last_order_date': customers['last_order_date'].reset_index(drop=True),
+        'recency_days': recency.astype(np.int64),
+        'frequency': frequency.astype(np.int64),
+        'monetary': monetary,
+        'r_score': r,
+        'f_score': f,
+        'm_score': m,
+        'rfm_score': (r.astype(np.int16) * 100 + f * 10 + m).astype(np.int16),
+        'segment': assign_segments(r, f, m),
+    })
+    return scores[RFM_COLUMNS]
@@ -0,0 +1,259 @@
+"""
+Sales Rollup
+Pre-aggregated summary of the sales table, kept up to date at ingestion
+
+<table>_rollup holds one row per (year_month, product_category, region,
+segment, ship_mode) with row/order counts and summed sales, profit,
+shipping_cost and aging. SalesAnalytics answers the category / region /
+segment / ship mode / calendar summaries from it, scanning a few thousand
+rows instead of the whole table.
+
+Maintenance:
+- full loads rebuild it (build_rollup)
+- upserts apply deltas: the rows being replaced are subtracted before the
+  write and the new rows added after it, in the same transaction
+  (apply_rollup_delta)
+- check_rollup compares it with a fresh aggregate of the raw table
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import os
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROLLUP_DIMENSIONS = ['year_month', 'product_category', 'region', 'segment', 'ship_mode']
+
+# rollup column -> aggregate over the raw table
+ROLLUP_MEASURES = {
+    'row_count': 'COUNT(*)',
+    'orders': 'COUNT(order_id)',
+    'sales': 'SUM(sales)',
+    'profit': 'SUM(profit)',
+    'shipping_cost': 'SUM(shipping_cost)',
+    'aging': 'SUM(aging)',
+    'aging_count': 'COUNT(aging)',
+}
+
+# raw columns the rollup is built from
+REQUIRED_COLUMNS = ['order_date', 'order_id', 'sales', 'profit', 'shipping_cost', 'aging',
+                    'product_category', 'region', 'segment', 'ship_mode']
+
+_KEYS_TABLE = 'temp._rollup_keys'
+_DELTA_TABLE = 'temp._rollup_delta'
+
+
+def rollup_name(table_name='cleaned_sales_data'):
+    return f'{table_name}_rollup'
+
+
+def has_rollup(conn, table_name='cleaned_sales_data'):
+    """True if the rollup table of table_name exists."""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (rollup_name(table_name),)
+    ).fetchone() is not None
+
+
+def can_rollup(conn, table_name='cleaned_sales_data'):
+    """True if table_name has every column the rollup needs."""
+    columns = {row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+    return all(col in columns for col in REQUIRED_COLUMNS)
+
+
+def _aggregate_query(table_name, where=''):
+    """Rollup rows for the raw rows of table_name matching where."""
+    measures = ', '.join(f'{expr} AS {name}' for name, expr in ROLLUP_MEASURES.items())
+    return f"""SELECT strftime('%Y-%m', order_date) AS year_month,
+                    product_category, region, segment, ship_mode, {measures}
+                FROM "{table_name}"
+                {where}
+                GROUP BY 1, 2, 3, 4, 5"""
+
+
+def _measure_types(conn, table_name):
+    """Rollup column -> declared type: counts INTEGER, sums the type of the summed raw column
+    (sales stays INTEGER, so results match the raw table's with or without the rollup)."""
+    declared = {row[1]: (row[2] or '').upper() for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+    types = {}
+    for col, expr in ROLLUP_MEASURES.items():
+        if expr.startswith('COUNT('):
+            types[col] = 'INTEGER'
+        else:
+            types[col] = 'INTEGER' if 'INT' in declared.get(expr[len('SUM('):-1], '') else 'REAL'
+    return types
+
+
+def _create_rollup_table(conn, table_name):
+    name = rollup_name(table_name)
+    columns = ', '.join([f'{col} TEXT' for col in ROLLUP_DIMENSIONS]
+                        + [f'{col} {kind}' for col, kind in _measure_types(conn, table_name).items()])
+    conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+    conn.execute(f'CREATE TABLE "{name}" ({columns})')
+    conn.execute(f'CREATE INDEX "ix_{name}_dims" ON "{name}" ({", ".join(ROLLUP_DIMENSIONS)})')
+
+
+def build_rollup(conn, table_name='cleaned_sales_data'):
+    """
+    (Re)build the rollup of table_name from scratch
+
+    Args:
+        conn (sqlite3.Connection): Connection opened with isolation_level=None
+        table_name (str): Raw sales table (or star view)
+
+    Returns:
+        int: Number of rollup rows
+    """
+    conn.execute("BEGIN")
+    try:
+        _create_rollup_table(conn, table_name)
+        conn.execute(f'INSERT INTO "{rollup_name(table_name)}" {_aggregate_query(table_name)}')
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return conn.execute(f'SELECT COUNT(*) FROM "{rollup_name(table_name)}"').fetchone()[0]
+
+
+def sync_rollup(conn, table_name='cleaned_sales_data', requested=False, maintained=False):
+    """
+    Bring the rollup up to date after a load
+
+    Args:
+        conn (sqlite3.Connection): Connection opened with isolation_level=None
+        table_name (str): Table that was loaded
+        requested (bool): Create the rollup if it doesn't exist yet
+        maintained (bool): The load applied deltas already (upsert path)
+
+    Returns:
+        bool: True if the rollup was rebuilt
+    """
+    exists = has_rollup(conn, table_name)
+    if (exists and not maintained) or (requested and not exists):
+        if not can_rollup(conn, table_name):
+            print(f" WARNING: '{table_name}' lacks the columns for a rollup, skipped")
+            return False
+        rows = build_rollup(conn, table_name)
+        print(f" Rollup '{rollup_name(table_name)}': {rows:,} rows")
+        return True
+    return False
+
+
+# ========================
+# Incremental maintenance
+# ========================
+def stage_keys(conn, keys=None, source_table=None, key_column='order_id'):
+    """
+    Fill the temp key table with the keys about to be written, either from
+    an iterable or from a column of source_table
+    """
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {_KEYS_TABLE} (key PRIMARY KEY) WITHOUT ROWID")
+    conn.execute(f"DELETE FROM {_KEYS_TABLE}")
+    if source_table is not None:
+        conn.execute(f'INSERT OR IGNORE INTO {_KEYS_TABLE} SELECT DISTINCT "{key_column}" '
+                     f'FROM "{source_table}" WHERE "{key_column}" IS NOT NULL')
+    else:
+        conn.executemany(f"INSERT OR IGNORE INTO {_KEYS_TABLE} VALUES (?)",
+                         ((key,) for key in keys if key is not None and key == key))
+
+
+def apply_rollup_delta(conn, table_name='cleaned_sales_data', key_column='order_id', sign=1):
+    """
+    Add (sign=1) or subtract (sign=-1) the rows of table_name whose key is
+    in the staged key table. Runs inside the caller's transaction.
+
+    Call with sign=-1 before an upsert and sign=1 after it, with the same
+    staged keys: replaced rows are taken out and their new versions added.
+    """
+    name = rollup_name(table_name)
+    conn.execute(f"DROP TABLE IF EXISTS {_DELTA_TABLE}")
+    conn.execute(f"""CREATE TABLE {_DELTA_TABLE} AS
+                    {_aggregate_query(table_name, f'WHERE "{key_column}" IN (SELECT key FROM {_KEYS_TABLE})')}""")
+
+    match = ' AND '.join(f'r.{col} IS d.{col}' for col in ROLLUP_DIMENSIONS)
+    updates = ', '.join(f'{col} = COALESCE(r.{col}, 0) + {sign} * COALESCE(d.{col}, 0)'
+                        for col in ROLLUP_MEASURES)
+    conn.execute(f'UPDATE "{name}" AS r SET {updates} FROM {_DELTA_TABLE} d WHERE {match}')
+
+    columns = ROLLUP_DIMENSIONS + list(ROLLUP_MEASURES)
+    values = ROLLUP_DIMENSIONS + [f'{sign} * d.{col}' for col in ROLLUP_MEASURES]
+    conn.execute(f"""INSERT INTO "{name}" ({', '.join(columns)})
+                    SELECT {', '.join(values)} FROM {_DELTA_TABLE} d
+                    WHERE NOT EXISTS (SELECT 1 FROM "{name}" r WHERE {match})""")
+    conn.execute(f'DELETE FROM "{name}" WHERE row_count <= 0')
+
+
+# ========================
+# Consistency check
+# ========================
+def check_rollup(conn, table_name='cleaned_sales_data', rtol=1e-9):
+    """
+    Compare the rollup with a fresh aggregate of the raw table
+
+    Args:
+        conn (sqlite3.Connection): Open database connection
+        table_name (str): Raw sales table (or star view)
+        rtol (float): Relative tolerance for the summed measures
+
+    Returns:
+        pd.DataFrame: Mismatching groups with rollup ('_rollup') and raw
+                      ('_raw') values; empty if the rollup is consistent
+    """
+    keys = ROLLUP_DIMENSIONS
+    stored = pd.read_sql_query(f'SELECT * FROM "{rollup_name(table_name)}"', conn)
+    fresh = pd.read_sql_query(_aggregate_query(table_name), conn)
+    merged = stored.merge(fresh, on=keys, how='outer', suffixes=('_rollup', '_raw'), indicator=True)
+
+    bad = merged['_merge'] != 'both'
+    for col in ROLLUP_MEASURES:
+        a = merged[f'{col}_rollup'].astype(float).fillna(0).to_numpy()
+        b = merged[f'{col}_raw'].astype(float).fillna(0).to_numpy()
+        bad |= ~np.isclose(a, b, rtol=rtol, atol=1e-6)
+    return merged[bad].drop(columns='_merge').reset_index(drop=True)
+
+
+def rollup_database(db_path='database/ecommerce.db', table_name='cleaned_sales_data', command='check'):
+    """
+    Build or check the rollup of a database table from the command line
+
+    Returns:
+        bool: True if successful (check: rollup consistent)
+    """
+    print("SALES ROLLUP")
+
+    if not os.path.exists(db_path):
+        print(f" ERROR: Database not found: {db_path}")
+        return False
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        if command == 'build':
+            rows = build_rollup(conn, table_name)
+            print(f" Rollup '{rollup_name(table_name)}': {rows:,} rows")
+            return True
+
+        if not has_rollup(conn, table_name):
+            print(f" No rollup for '{table_name}' (build it with: python src/rollup.py build)")
+            return False
+        mismatches = check_rollup(conn, table_name)
+        if mismatches.empty:
+            print(f" Rollup '{rollup_name(table_name)}' matches '{table_name}'")
+            return True
+        print(f" {len(mismatches)} group(s) differ from '{table_name}':")
+        print(mismatches.head(20).to_string())
+        return False
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'check'
+    db_path = sys.argv[2] if len(sys.argv) > 2 else 'database/ecommerce.db'
+    table_name = sys.argv[3] if len(sys.argv) > 3 else 'cleaned_sales_data'
+    if command not in ('build', 'check'):
+        print(" Usage: python src/rollup.py [build|check] [db_path] [table_name]")
+        sys.exit(1)
+    sys.exit(0 if rollup_database(db_path, table_name, command) else 1)
@@ -0,0 +1,541 @@
+"""
+Scan Planner
+Computes many GROUP BY aggregates in as few passes over the data as possible
+
+The aggregate methods of SalesAnalytics declare what they compute as an
+Aggregate (keys, measures, HAVING / ORDER BY / LIMIT) instead of writing
+the SQL themselves. Called alone, an Aggregate is one SQL query (to_sql).
+Given many (a report), ScanPlanner groups them into passes:
+- aggregates with the same keys share one query
+- aggregates on low-cardinality keys (the rollup dimensions and calendar
+  parts) share one query at their combined grain
+- an aggregate whose keys are a subset of a pass's keys is re-aggregated
+  from that pass's result in pandas, as long as the result is small
+Each pass selects partial aggregates (SUM / COUNT, AVG as SUM + COUNT) that
+pandas combines per aggregate, then HAVING / ORDER BY / LIMIT are applied.
+
+SQLite has no GROUPING SETS, so the combined pass is one GROUP BY at the
+finest grain of its members and the coarser groupings are rolled up from
+its (small) result.
+
+A pass over the raw rows can also be split into row-range shards that run
+at the same time (see parallel_aggregate.py); their partials are added up
+per group (combine_partials) before the aggregates are finished.
+
+Usage:
+    python src/scan_planner.py [db_path]
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import functools
+import inspect
+import operator
+import os
+import sys
+import time
+
+import pandas as pd
+
+try:
+    from src.result_cache import call_key
+except ImportError:  # run as a script: python src/scan_planner.py
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    from src.result_cache import call_key
+
+# A pass result larger than this is not re-aggregated for coarser aggregates;
+# they get their own pass instead
+MAX_DERIVE_ROWS = 100_000
+
+_OPERATORS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+              '=': operator.eq, '!=': operator.ne}
+
+
+def _check_operator(op):
+    if op not in _OPERATORS:
+        raise ValueError(f"Unknown HAVING operator '{op}', expected one of {list(_OPERATORS)}")
+    return op
+
+
+def measure_sql(func, arg):
+    """SQL for one measure: ('sum'|'count'|'avg', column) or ('ratio', (numerator, denominator))."""
+    if func == 'ratio':
+        numerator, denominator = arg
+        return f"CAST(SUM({numerator}) AS REAL) / SUM({denominator})"
+    return f"{func.upper()}({arg})"
+
+
+def _partials(func, arg):
+    """Decomposable parts of a measure: (func, arg) pairs that combine by summing."""
+    if func == 'avg':
+        return [('sum', arg), ('count', arg)]
+    if func == 'ratio':
+        return [('sum', arg[0]), ('sum', arg[1])]
+    return [(func, arg)]
+
+
+def aggregate_query(build):
+    """
+    Decorator for SalesAnalytics methods whose body returns an Aggregate:
+    calling the method runs it as one query (self._aggregate),
+    method.aggregate(self, ...) only declares it (see run_batch)
+    """
+    @functools.wraps(build)
+    def wrapper(self, *args, **kwargs):
+        return self._aggregate(build(self, *args, **kwargs))
+
+    wrapper.aggregate = build
+    return wrapper
+
+
+class Aggregate:
+    """
+    One GROUP BY query, declared
+
+    Args:
+        keys (list): (alias, expression) grouped on
+        measures (list): (alias, func, arg), see measure_sql
+        labels (list): (alias, expression) that depend on the keys only
+                       (e.g. month name for month number)
+        output (list): Result columns in order (default: labels, keys, measures)
+        columns (list): Dimension columns the keys need (for the FROM clause)
+        rollup (bool): Read the rollup table instead of the raw rows
+        start_date, end_date: Optional order_date range
+        having (list): (measure alias, operator, value), all must hold
+        order_by (list): (alias, ascending)
+        limit (int): Keep the first rows only
+    """
+
+    def __init__(self, keys=(), measures=(), labels=(), output=None, columns=(), rollup=False,
+                 start_date=None, end_date=None, having=(), order_by=(), limit=None):
+        self.keys = list(keys)
+        self.measures = list(measures)
+        self.labels = list(labels)
+        self.output = list(output) if output else [a for a, _ in self.labels + self.keys] + \
+            [a for a, _, _ in self.measures]
+        self.columns = list(columns)
+        self.rollup = rollup
+        self.start_date = start_date
+        self.end_date = end_date
+        self.having = list(having)
+        self.order_by = list(order_by)
+        self.limit = limit
+
+    @property
+    def group_expressions(self):
+        """Keys and labels, each expression once."""
+        return list(dict.fromkeys(expr for _, expr in self.keys + self.labels))
+
+    @property
+    def scope(self):
+        """Aggregates with the same scope read the same rows."""
+        return (self.rollup, str(self.start_date), str(self.end_date))
+
+    def to_sql(self, source, where=''):
+        """
+        The aggregate as a single SQL query over source
+
+        Returns:
+            tuple: (sql, parameters of HAVING and LIMIT, bound after the WHERE clause's)
+        """
+        expressions = dict(self.keys + self.labels)
+        measures = {alias: measure_sql(func, arg) for alias, func, arg in self.measures}
+        select = ', '.join(f"{expressions[a]} AS {a}" if a in expressions else f"{measures[a]} AS {a}"
+                           for a in self.output)
+        sql = f"SELECT {select}\n FROM {source}\n {where}"
+        params = []
+        if self.group_expressions:
+            sql += f"\n GROUP BY {', '.join(self.group_expressions)}"
+        if self.having:
+            sql += "\n HAVING " + ' AND '.join(f"{measures[a]} {_check_operator(op)} ?" for a, op, _ in self.having)
+            params += [value for _, _, value in self.having]
+        if self.order_by:
+            sql += "\n ORDER BY " + ', '.join(
+                f"{expressions.get(a, measures.get(a))} {'ASC' if ascending else 'DESC'}"
+                for a, ascending in self.order_by)
+        if self.limit is not None:
+            sql += "\n LIMIT ?"
+            params.append(int(self.limit))
+        return sql, params
+
+    def finish(self, groups, key_columns, partial_columns):
+        """
+        Result of the aggregate from a pass result
+
+        Args:
+            groups (pd.DataFrame): Pass result (one row per pass group)
+            key_columns (dict): Expression -> column of groups
+            partial_columns (dict): (func, arg) -> column of groups
+
+        Returns:
+            pd.DataFrame: Same columns and row order as the SQL query
+        """
+        keys = [key_columns[expr] for expr in self.group_expressions]
+        needed = list(dict.fromkeys(partial_columns[p] for _, func, arg in self.measures
+                                    for p in _partials(func, arg)))
+        if not keys:
+            # one row even when there are no rows at all, like SQL
+            combined = pd.DataFrame({col: [groups[col].sum(min_count=0 if col.startswith('count') else 1)]
+                                     for col in needed})
+        elif len(keys) == len(set(key_columns.values())):
+            combined = groups[keys + needed]
+        else:
+            combined = (groups.groupby(keys, dropna=False, sort=False)[needed]
+                        .sum(min_count=1).reset_index())
+
+        result = pd.DataFrame(index=combined.index)
+        for alias, expr in self.keys + self.labels:
+            result[alias] = combined[key_columns[expr]]
+        for alias, func, arg in self.measures:
+            parts = [combined[partial_columns[p]] for p in _partials(func, arg)]
+            if func in ('avg', 'ratio'):
+                result[alias] = parts[0].astype('float64') / parts[1].astype('float64').where(parts[1] != 0)
+            elif func == 'count':
+                result[alias] = parts[0].fillna(0).astype('int64')
+            else:
+                result[alias] = parts[0]
+
+        for alias, op, value in self.having:
+            result = result[_OPERATORS[op](result[alias], value)]
+        if self.order_by:
+            aliases = [a for a, _ in self.order_by]
+            ascending = [asc for _, asc in self.order_by]
+            # SQLite sorts NULLs first ascending and last descending
+            result = result.sort_values(aliases, ascending=ascending, kind='stable',
+                                        na_position='first' if ascending[0] else 'last')
+        if self.limit is not None:
+            result = result.head(int(self.limit))
+        return result[self.output].reset_index(drop=True)
+
+
+def combine_partials(frames, grouped, partials):
+    """
+    One pass result from the results of the same pass over several shards
+
+    Args:
+        frames (list): Shard results (same columns)
+        grouped (list): Columns the pass groups on
+        partials (list): Partial aggregate columns, added up per group; the
+                         other columns (labels, dependent keys) are the same
+                         in every shard and kept once
+
+    Returns:
+        pd.DataFrame: Same columns, one row per group
+    """
+    combined = pd.concat(frames, ignore_index=True)
+    # a shard without rows returns NULL sums: sums stay integer when the others are
+    integer = [col for col in partials
+               if all(f[col].dtype.kind in 'iu' or f[col].isna().all() for f in frames)
+               and any(f[col].dtype.kind in 'iu' for f in frames)]
+    others = [col for col in combined.columns if col not in grouped and col not in partials]
+    if grouped:
+        groups = combined.groupby(grouped, dropna=False, sort=False)
+        result = groups[partials].sum(min_count=1)
+        if others:
+            result = result.join(groups[others].first())
+        result = result.reset_index()[list(combined.columns)]
+    else:
+        result = pd.DataFrame({col: [combined[col].sum(min_count=1) if col in partials
+                                     else combined[col].iloc[0]] for col in combined.columns})
+    for col in integer:
+        if result[col].notna().all():
+            result[col] = result[col].astype('int64')
+    return result
+
+
+class _Pass:
+    """One query over the data serving several aggregates."""
+
+    def __init__(self, scope, rollup, start_date, end_date):
+        self.scope = scope
+        self.rollup = rollup
+        self.start_date = start_date
+        self.end_date = end_date
+        self.expressions = []  # key and label expressions, in order
+        self.names = {}        # expression -> alias, for the report
+        self.label_only = set()
+        self.partials = []     # (func, arg)
+        self.columns = []
+        self.members = []      # (label, Aggregate)
+
+    def add(self, label, aggregate):
+        key_expressions = {expr for _, expr in aggregate.keys}
+        for alias, expr in aggregate.keys + aggregate.labels:
+            if expr not in self.expressions:
+                self.expressions.append(expr)
+                self.names[expr] = alias
+                self.label_only.add(expr)
+            if expr in key_expressions:
+                self.label_only.discard(expr)
+        for _, func, arg in aggregate.measures:
+            for part in _partials(func, arg):
+                if part not in self.partials:
+                    self.partials.append(part)
+        for col in aggregate.columns:
+            if col not in self.columns:
+                self.columns.append(col)
+        self.members.append((label, aggregate))
+
+    def covers(self, aggregate):
+        return set(aggregate.group_expressions) <= set(self.expressions)
+
+    def grouped(self, dependent):
+        """
+        Expressions the query groups on: labels and expressions determined by
+        another grouped expression (dependent: expression -> determinant)
+        are selected without grouping, which makes the GROUP BY cheaper
+        """
+        grouped = [expr for expr in self.expressions if expr not in self.label_only]
+        return [expr for expr in grouped if dependent.get(expr) not in grouped]
+
+    def sql(self, source, where, dependent, any_value):
+        grouped = self.grouped(dependent)
+        key_columns = {expr: f"k{i}" for i, expr in enumerate(self.expressions)}
+        partial_columns = {part: f"{part[0]}{i}" for i, part in enumerate(self.partials)}
+        select = [f"{expr if expr in grouped else any_value(expr)} AS {col}" for expr, col in key_columns.items()] + \
+                 [f"{measure_sql(func, arg)} AS {partial_columns[(func, arg)]}" for func, arg in self.partials]
+        sql = f"SELECT {', '.join(select)} FROM {source} {where}"
+        if grouped:
+            sql += f" GROUP BY {', '.join(grouped)}"
+        return sql, key_columns, partial_columns
+
+
+class ScanPlanner:
+    """
+    Plans and runs a batch of Aggregates
+
+    Args:
+        read (callable): (sql, params) -> DataFrame
+        source (callable): (rollup, columns, start_date, end_date) -> (FROM clause, WHERE clause, params)
+        combinable (set): Low-cardinality key expressions that may share one pass
+        dependent (dict): Expression -> expression that determines it
+                          (e.g. month of the date -> year and month of the date)
+        any_value (callable): Wraps a selected but not grouped expression
+                              (SQLite allows it bare, DuckDB needs ANY_VALUE)
+        shards (callable): (rollup, columns, start_date, end_date) -> list of
+                           (FROM clause, WHERE clause, params), one per shard
+                           of the rows, or None to scan them in one query
+        read_shards (callable): [(sql, params)] -> [DataFrame], run concurrently
+    """
+
+    def __init__(self, read, source, combinable=(), dependent=None, any_value=lambda expr: expr,
+                 shards=None, read_shards=None):
+        self.read = read
+        self.source = source
+        self.combinable = set(combinable)
+        self.dependent = dependent or {}
+        self.any_value = any_value
+        self.shards = shards
+        self.read_shards = read_shards
+        self.passes = []  # (description, groups, rows, seconds) of the last run
+
+    def plan(self, aggregates):
+        """
+        Group aggregates into passes
+
+        Args:
+            aggregates (dict): label -> Aggregate
+
+        Returns:
+            list: _Pass objects
+        """
+        passes = []
+        # most keys first, so coarser aggregates find a finer pass to derive from
+        ordered = sorted(aggregates.items(), key=lambda item: -len(item[1].group_expressions))
+        for label, aggregate in ordered:
+            same_scope = [p for p in passes if p.scope == aggregate.scope]
+            low = all(expr in self.combinable for expr in aggregate.group_expressions)
+            target = next((p for p in same_scope if set(p.expressions) == set(aggregate.group_expressions)), None)
+            if target is None and low:
+                target = next((p for p in same_scope if p.expressions and
+                               all(expr in self.combinable for expr in p.expressions)), None)
+            if target is None:
+                target = next((p for p in same_scope if p.covers(aggregate)), None)
+            if target is None:
+                target = _Pass(aggregate.scope, aggregate.rollup, aggregate.start_date, aggregate.end_date)
+                passes.append(target)
+            target.add(label, aggregate)
+        return passes
+
+    def run(self, aggregates):
+        """
+        Compute every aggregate
+
+        Args:
+            aggregates (dict): label -> Aggregate
+
+        Returns:
+            dict: label -> DataFrame
+        """
+        self.passes = []
+        results = {}
+        queue = self.plan(aggregates)
+        while queue:
+            scan = queue.pop(0)
+            shards = self.shards(scan.rollup, scan.columns, scan.start_date, scan.end_date) if self.shards else None
+            start = time.perf_counter()
+            if shards:
+                queries = []
+                for source, where, params in shards:
+                    sql, key_columns, partial_columns = scan.sql(source, where, self.dependent, self.any_value)
+                    queries.append((sql, params))
+                groups = combine_partials(self.read_shards(queries),
+                                          [key_columns[expr] for expr in scan.grouped(self.dependent)],
+                                          list(partial_columns.values()))
+            else:
+                source, where, params = self.source(scan.rollup, scan.columns, scan.start_date, scan.end_date)
+                sql, key_columns, partial_columns = scan.sql(source, where, self.dependent, self.any_value)
+                groups = self.read(sql, params)
+            elapsed = time.perf_counter() - start
+
+            # a large pass only serves aggregates on exactly its keys
+            retry = {}
+            for label, aggregate in scan.members:
+                if len(groups) > MAX_DERIVE_ROWS and set(aggregate.group_expressions) != set(scan.expressions):
+                    retry[label] = aggregate
+                else:
+                    results[label] = aggregate.finish(groups, key_columns, partial_columns)
+            queue.extend(self.plan(retry))
+
+            keys = ', '.join(scan.names[expr] for expr in scan.grouped(self.dependent)) or '(all rows)'
+            if shards:
+                keys += f" ({len(shards)} shards)"
+            self.passes.append((f"{'rollup' if scan.rollup else 'raw'}: {keys}",
+                                len(scan.members) - len(retry), len(groups), elapsed))
+        return results
+
+
+# ========================
+# Batched execution
+# ========================
+def run_batch(analytics, calls):
+    """
+    Run many SalesAnalytics methods with as few scans as possible
+
+    Cached results are served from analytics.cache; the aggregate methods
+    that miss are planned together; other methods (RFM, High_risk_orders)
+    run as they are.
+
+    Args:
+        analytics (SalesAnalytics): Instance to run on
+        calls (dict): label -> (method name, kwargs)
+
+    Returns:
+        tuple: (label -> result, stats) where stats holds methods, cached,
+               batched, scans, individual_scans, seconds and passes
+    """
+    start = time.perf_counter()
+    reads = {'count': 0}
+    read = analytics._read
+
+    def counted(query, params=()):
+        reads['count'] += 1
+        return read(query, params)
+
+    results, aggregates, keys = {}, {}, {}
+    hits = 0
+    analytics._read = counted
+    try:
+        if analytics.cache is not None:
+            analytics.cache.set_version(analytics._data_version())
+        for label, (name, kwargs) in calls.items():
+            method = getattr(type(analytics), name)
+            if analytics.cache is not None:
+                keys[label] = call_key(analytics, method, (), kwargs)
+                hit = analytics.cache.get(keys[label])
+                if hit is not None:
+                    results[label] = hit
+                    hits += 1
+                    continue
+            # approximate answers come from the sample / sketches, one query per method
+            if hasattr(method, 'aggregate') and getattr(analytics, 'approximation', None) is None:
+                aggregates[label] = method.aggregate(analytics, **kwargs)
+            else:
+                results[label] = getattr(analytics, name)(**kwargs)
+        other_reads = reads['count']
+
+        planner = analytics._planner(counted)
+        for label, df in planner.run(aggregates).items():
+            results[label] = df = analytics._finish_result(df)
+            if analytics.cache is not None:
+                analytics.cache.put(keys[label], df)
+    finally:
+        analytics._read = read
+
+    stats = {
+        'methods': len(calls),
+        'cached': hits,
+        'batched': len(aggregates),
+        'scans': other_reads + len(planner.passes),
+        'individual_scans': other_reads + len(aggregates),
+        'seconds': time.perf_counter() - start,
+        'passes': planner.passes,
+    }
+    return {label: results[label] for label in calls}, stats
+
+
+def print_batch_stats(stats):
+    """One line per pass plus the totals."""
+    for description, served, rows, seconds in stats['passes']:
+        print(f"   pass {description[:70]}: {served} result(s), {rows:,} groups, {seconds:.3f}s")
+    print(f" {stats['methods']} results ({stats['cached']} cached, {stats['batched']} batched): "
+          f"{stats['scans']} scans instead of {stats['individual_scans']}, {stats['seconds']:.3f}s")
+
+
+def compare_batch(db_path='database/ecommerce.db', rtol=1e-9):
+    """
+    Run the backend parity workload batched and one method at a time (both
+    uncached), print scans and wall time of each and check the results match
+
+    Returns:
+        bool: True if every result matches
+    """
+    from src.analytics import SalesAnalytics
+    from src.backend_parity import METHODS
+
+    calls = {}
+    for name, args in METHODS.items():
+        method = getattr(SalesAnalytics, name)
+        params = list(inspect.signature(method).parameters)[1:]
+        calls[name] = (name, dict(zip(params, args)))
+
+    analytics = SalesAnalytics(db_path, use_cache=False)
+    try:
+        start = time.perf_counter()
+        individual = {label: getattr(analytics, name)(**kwargs) for label, (name, kwargs) in calls.items()}
+        individual_seconds = time.perf_counter() - start
+        batched, stats = run_batch(analytics, calls)
+    finally:
+        analytics.close()
+
+    print("SCAN PLANNER")
+    print(f"\n One method at a time: {individual_seconds:.3f}s")
+    print(" Batched:")
+    print_batch_stats(stats)
+
+    mismatches = []
+    for label in calls:
+        left, right = individual[label], batched[label]
+        frames = left.items() if isinstance(left, dict) else [(None, left)]
+        for key, df in frames:
+            other = right[key] if key is not None else right
+            try:
+                pd.testing.assert_frame_equal(df, other, check_dtype=False, check_exact=False, rtol=rtol)
+            except AssertionError as e:
+                mismatches.append(f"{label}: {e}")
+    if mismatches:
+        print(f"\n {len(mismatches)} mismatching result(s):")
+        for message in mismatches:
+            print(f"   - {message}")
+    else:
+        print(f"\n All {len(calls)} batched results match the individual methods")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'database/ecommerce.db'
+    if not os.path.exists(db_path):
+        print(f" ERROR: Database not found: {db_path}")
+        sys.exit(1)
+    sys.exit(0 if compare_batch(db_path) else 1)
@@ -0,0 +1,336 @@
+"""
+Streaming Sketches
+Small, mergeable summaries for one pass over data that does not fit in memory
+
+1. HyperLogLog        - distinct counts
+2. KLLQuantiles       - quantiles / describe()-style statistics
+3. HashSampleCounter  - duplicate estimates from hash-based sampling
+4. ReservoirSample    - uniform row sample of fixed size
+5. SpaceSaving        - heavy hitters (top-k items by count or summed weight)
+
+Every sketch works on whole pandas/NumPy chunks (vectorized, no per-row Python loop),
+has a merge() method and reports its own error bound.
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def hash_values(values) -> np.ndarray:
+    """64-bit hashes of a Series / DataFrame (rows), independent of the index."""
+    return pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Vectorized int.bit_length() for uint64 arrays."""
+    hi = (x >> np.uint64(32)).astype(np.float64)
+    lo = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # 32-bit halves are exact in float64, so floor(log2) is exact too
+    with np.errstate(divide='ignore'):
+        hi_len = np.where(hi > 0, np.floor(np.log2(hi)) + 33, 0)
+        lo_len = np.where(lo > 0, np.floor(np.log2(lo)) + 1, 0)
+    return np.where(hi > 0, hi_len, lo_len).astype(np.int64)
+
+
+# ========================
+# Distinct counts
+# ========================
+class HyperLogLog:
+    """HyperLogLog distinct counter with 2**p registers (std error 1.04/sqrt(2**p))."""
+
+    def __init__(self, p: int = 14):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(hashes) == 0:
+            return
+        idx = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = hashes << np.uint64(self.p)
+        # rank = position of the first 1-bit in the remaining 64-p bits
+        rank = np.where(rest == 0, 64 - self.p + 1, 65 - _bit_length(rest)).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def add(self, values):
+        """Add a Series (or array-like) of values; NaNs are ignored."""
+        values = pd.Series(values).dropna()
+        self.add_hashes(hash_values(values))
+
+    def merge(self, other: "HyperLogLog"):
+        if other.p != self.p:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / np.sqrt(self.m)
+
+    def estimate(self) -> int:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # small range correction (linear counting)
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+
+# ========================
+# Quantiles
+# ========================
+class KLLQuantiles:
+    """
+    KLL quantile sketch (Karnin, Lang, Liberty) for numeric values
+    Keeps O(k log n) items; normalized rank error is about 1.33% for k=200.
+    Count, mean, min and max are tracked exactly alongside, and the variance
+    through the sum of squared deviations (M2) of every chunk, merged with
+    Chan's formula (no cancellation on large values close together).
+    """
+
+    def __init__(self, k: int = 200, seed: int = 0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def add(self, values):
+        values = pd.to_numeric(pd.Series(values), errors='coerce').dropna().to_numpy(dtype=np.float64)
+        if len(values) == 0:
+            return
+        mean = float(values.mean())
+        self._combine(len(values), mean, float(np.square(values - mean).sum()))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def _combine(self, n, mean, m2):
+        """Fold in the count, mean and M2 of other values (Chan et al.)."""
+        total = self.n + n
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.mean += delta * n / total
+        self.n = total
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # an odd item out stays behind; the rest are halved into the next level
+                keep = items[:1] if len(items) % 2 else items[:0]
+                pairs = items[len(keep):]
+                offset = self.rng.integers(2)
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], pairs[offset::2]])
+            level += 1
+
+    def merge(self, other: "KLLQuantiles"):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        if other.n:
+            self._combine(other.n, other.mean, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    @property
+    def rank_error(self) -> float:
+        # empirical KLL bound (99% confidence), as used by Apache DataSketches
+        return 2.296 / self.k ** 0.9723
+
+    def quantile(self, q: float) -> float:
+        if self.n == 0:
+            return np.nan
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items_), 2 ** level, dtype=np.float64)
+                                  for level, items_ in enumerate(self.levels)])
+        order = np.argsort(items)
+        items, cumulative = items[order], np.cumsum(weights[order])
+        pos = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        return float(items[min(pos, len(items) - 1)])
+
+    def describe(self) -> pd.Series:
+        """Same index as pandas describe(); quartiles are approximate."""
+        return pd.Series({
+            'count': float(self.n),
+            'mean': self.mean if self.n else np.nan,
+            'std': np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else np.nan,
+            'min': self.min if self.n else np.nan,
+            '25%': self.quantile(0.25),
+            '50%': self.quantile(0.50),
+            '75%': self.quantile(0.75),
+            'max': self.max if self.n else np.nan,
+        })
+
+
+# ========================
+# Duplicates
+# ========================
+class HashSampleCounter:
+    """
+    Duplicate estimate by hash-based sampling: only rows whose hash falls below
+    a threshold are kept (identical rows share a hash, so they are sampled together).
+    The threshold halves whenever more than max_items hashes are held.
+    """
+
+    def __init__(self, max_items: int = 200_000):
+        self.max_items = max_items
+        self.threshold = np.uint64(2 ** 64 - 1)
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    @property
+    def sampling_rate(self) -> float:
+        return (float(self.threshold) + 1) / 2.0 ** 64
+
+    def add_hashes(self, hashes: np.ndarray):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        self._combine(hashes[hashes <= self.threshold], np.ones(np.count_nonzero(hashes <= self.threshold),
+                                                               dtype=np.int64))
+
+    def _combine(self, hashes, counts):
+        merged, inverse = np.unique(np.concatenate([self.hashes, hashes]), return_inverse=True)
+        self.counts = np.bincount(inverse, weights=np.concatenate([self.counts, counts]),
+                                  minlength=len(merged)).astype(np.int64)
+        self.hashes = merged
+        while len(self.hashes) > self.max_items:
+            self.threshold = np.uint64(int(self.threshold) // 2)
+            keep = self.hashes <= self.threshold
+            self.hashes, self.counts = self.hashes[keep], self.counts[keep]
+
+    def merge(self, other: "HashSampleCounter"):
+        self.threshold = min(self.threshold, other.threshold)
+        keep_self = self.hashes <= self.threshold
+        self.hashes, self.counts = self.hashes[keep_self], self.counts[keep_self]
+        keep_other = other.hashes <= self.threshold
+        self._combine(other.hashes[keep_other], other.counts[keep_other])
+
+    def duplicates(self) -> tuple:
+        """(estimated duplicate rows, ~95% error margin)."""
+        sampled = int(np.sum(self.counts - 1))
+        scale = 1 / self.sampling_rate
+        return int(round(sampled * scale)), int(round(1.96 * np.sqrt(sampled) * scale))
+
+
+# ========================
+# Row sample
+# ========================
+class ReservoirSample:
+    """
+    Uniform sample of at most `size` rows from a stream of DataFrame chunks
+    Rows are held as an object array so chunks with drifting dtypes can be mixed.
+    """
+
+    def __init__(self, size: int = 10_000, seed: int = 0):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.seen = 0
+        self.columns = None
+        self.rows = None
+
+    def add(self, chunk: pd.DataFrame):
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+            self.rows = np.empty((0, len(self.columns)), dtype=object)
+
+        # fill the reservoir first
+        free = max(self.size - len(self.rows), 0)
+        if free:
+            self.rows = np.vstack([self.rows, chunk.iloc[:free].to_numpy(dtype=object)])
+
+        rest = len(chunk) - free
+        if rest > 0:
+            # stream row i replaces a random slot with probability size / (i + 1)
+            positions = self.seen + free + np.arange(rest)
+            slots = (self.rng.random(rest) * (positions + 1)).astype(np.int64)
+            chosen = np.flatnonzero(slots < self.size)
+            if len(chosen):
+                # when several rows pick the same slot the latest one wins
+                rev_slots = slots[chosen][::-1]
+                unique_slots, first_rev = np.unique(rev_slots, return_index=True)
+                rows = chosen[::-1][first_rev]
+                self.rows[unique_slots] = chunk.iloc[free + rows].to_numpy(dtype=object)
+
+        self.seen += len(chunk)
+
+    def to_frame(self) -> pd.DataFrame:
+        if self.columns is None:
+            return pd.DataFrame()
+        return pd.DataFrame(self.rows, columns=self.columns).infer_objects()
+
+
+# ========================
+# Heavy hitters
+# ========================
+class SpaceSaving:
+    """
+    Heavy hitters of a weighted stream (Space-Saving in its mergeable form)
+
+    Keeps at most `capacity` items, each with an over-estimate `count` and
+    its `error`: the true total of a kept item lies in [count - error, count],
+    and any item not kept totals at most `floor`. Weights must not be negative.
+    """
+
+    def __init__(self, capacity: int = 10_000):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='float64')
+        self.errors = pd.Series(dtype='float64')
+        self.floor = 0.0
+        self.total = 0.0
+
+    def add(self, items, weights=None):
+        """Add a chunk of items (NaNs are ignored), each with weight 1 or its weight."""
+        chunk = pd.DataFrame({'item': np.asarray(items, dtype=object),
+                              'weight': 1.0 if weights is None else np.asarray(weights, dtype=np.float64)})
+        chunk = chunk[chunk['item'].notna()]
+        if chunk.empty:
+            return
+        # exact totals of the chunk, then merged like a summary with no error
+        counts = chunk.groupby('item', sort=False)['weight'].sum().clip(lower=0)
+        self.total += float(counts.sum())
+        self._merge(counts, pd.Series(0.0, index=counts.index), 0.0)
+
+    def _merge(self, counts, errors, floor):
+        index = self.counts.index.union(counts.index, sort=False)
+        # an item missing from one summary may still have up to its floor there
+        merged = self.counts.reindex(index).fillna(self.floor) + counts.reindex(index).fillna(floor)
+        merged_errors = self.errors.reindex(index).fillna(self.floor) + errors.reindex(index).fillna(floor)
+        self.floor += floor
+        if len(merged) > self.capacity:
+            kept = merged.nlargest(self.capacity, keep='first').index
+            self.floor = max(self.floor, float(merged.drop(kept).max()))
+            merged, merged_errors = merged[kept], merged_errors[kept]
+        self.counts, self.errors = merged, merged_errors
+
+    def merge(self, other: "SpaceSaving"):
+        if other.capacity != self.capacity:
+            raise ValueError("Cannot merge SpaceSaving sketches with different capacity")
+        self.total += other.total
+        self._merge(other.counts, other.errors, other.floor)
+
+    def top(self, k: int = None) -> pd.DataFrame:
+        """item, count, error of the k (default: all) kept items with the largest counts."""
+        top = pd.DataFrame({'item': self.counts.index.to_numpy(dtype=object),
+                            'count': self.counts.to_numpy(), 'error': self.errors.to_numpy()})
+        top = top.sort_values(['count', 'item'], ascending=[False, True], kind='stable')
+        return (top if k is None else top.head(k)).reset_index(drop=True)
@@ -0,0 +1,269 @@
+"""
+Star Schema Builder
+Normalizes the wide sales table into a fact table of integer surrogate keys
+plus dictionary-encoded dimension tables
+
+Layout (for table 'cleaned_sales_data'):
+- dim_product, dim_customer, dim_location, dim_segment, dim_ship_mode
+  (one row per distinct value, INTEGER PRIMARY KEY surrogate key)
+- fact_sales (measures + dimension keys + precomputed integer
+  year, month and year_month (e.g. 201503) columns)
+- cleaned_sales_data becomes a VIEW joining them back together with the
+  original columns, so every existing query keeps working
+  (SalesAnalytics queries fact_sales directly and groups on the calendar columns)
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import os
+import sqlite3
+
+FACT_TABLE = 'fact_sales'
+
+# dimension table -> (key column, source columns it encodes)
+DIMENSIONS = {
+    'dim_product': ('product_key', ['product', 'product_category']),
+    'dim_customer': ('customer_key', ['customer_id', 'customer_name']),
+    'dim_location': ('location_key', ['city', 'state', 'country', 'region']),
+    'dim_segment': ('segment_key', ['segment']),
+    'dim_ship_mode': ('ship_mode_key', ['ship_mode']),
+}
+
+CALENDAR_COLUMNS = ['year', 'month', 'year_month']
+
+
+def is_star_view(conn, table_name='cleaned_sales_data'):
+    """True if table_name is the view built by build_star_schema."""
+    row = conn.execute(
+        "SELECT type FROM sqlite_master WHERE name = ?", (table_name,)
+    ).fetchone()
+    if row is None or row[0] != 'view':
+        return False
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FACT_TABLE,)
+    ).fetchone() is not None
+
+
+def _table_columns(conn, table_name):
+    """(name, declared type) for every column of a table or view."""
+    return [(row[1], row[2]) for row in conn.execute(f'PRAGMA table_info("{table_name}")')]
+
+
+def _present_dimensions(columns):
+    """Dimensions restricted to the columns that exist in the source."""
+    dims = {}
+    for dim_table, (key, dim_cols) in DIMENSIONS.items():
+        present = [col for col in dim_cols if col in columns]
+        if present:
+            dims[dim_table] = (key, present)
+    return dims
+
+
+def _create_tables(conn, source_columns):
+    """Create empty dimension and fact tables for the given source columns."""
+    names = [name for name, _ in source_columns]
+    types = dict(source_columns)
+    dims = _present_dimensions(names)
+    dim_cols = {col for _, cols in dims.values() for col in cols}
+
+    for dim_table, (key, cols) in dims.items():
+        col_defs = ', '.join(f'"{col}" {types[col] or "TEXT"}' for col in cols)
+        col_list = ', '.join(f'"{col}"' for col in cols)
+        conn.execute(f'CREATE TABLE "{dim_table}" ({key} INTEGER PRIMARY KEY, {col_defs})')
+        conn.execute(f'CREATE INDEX "ix_{dim_table}_lookup" ON "{dim_table}" ({col_list})')
+
+    fact_defs = [f'"{name}" {types[name] or ""}'.strip() for name in names if name not in dim_cols]
+    fact_defs += [f'{key} INTEGER' for key, _ in dims.values()]
+    fact_defs += [f'{col} INTEGER' for col in CALENDAR_COLUMNS]
+    conn.execute(f'CREATE TABLE {FACT_TABLE} ({", ".join(fact_defs)})')
+    if 'order_id' in names:
+        conn.execute(f'CREATE INDEX ix_{FACT_TABLE}_order_id ON {FACT_TABLE} (order_id)')
+
+
+def _load_rows(conn, source_table, source_names, view_names):
+    """Dictionary-encode new dimension values and insert fact rows from source_table."""
+    dims = _present_dimensions(source_names)
+    dim_cols = {col for _, cols in dims.values() for col in cols}
+
+    # New dimension values only (IS keeps NULLs from creating duplicates)
+    for dim_table, (key, cols) in dims.items():
+        col_list = ', '.join(f'"{col}"' for col in cols)
+        match = ' AND '.join(f'd."{col}" IS s."{col}"' for col in cols)
+        conn.execute(f"""INSERT INTO "{dim_table}" ({col_list})
+                        SELECT DISTINCT {', '.join(f's."{col}"' for col in cols)}
+                        FROM "{source_table}" s
+                        WHERE NOT EXISTS (SELECT 1 FROM "{dim_table}" d WHERE {match})""")
+
+    fact_names = [name for name in view_names if name not in dim_cols and name in source_names]
+    select = [f's."{name}"' for name in fact_names]
+    joins = []
+    for i, (dim_table, (key, cols)) in enumerate(dims.items()):
+        alias = f'd{i}'
+        select.append(f'{alias}.{key}')
+        match = ' AND '.join(f'{alias}."{col}" IS s."{col}"' for col in cols)
+        joins.append(f'LEFT JOIN "{dim_table}" {alias} ON {match}')
+
+    # Calendar columns are parsed once here instead of on every query
+    select += [
+        "CAST(strftime('%Y', s.order_date) AS INTEGER)",
+        "CAST(strftime('%m', s.order_date) AS INTEGER)",
+        "CAST(strftime('%Y', s.order_date) AS INTEGER) * 100 "
+        "+ CAST(strftime('%m', s.order_date) AS INTEGER)",
+    ]
+    insert_cols = [f'"{name}"' for name in fact_names] + [key for key, _ in dims.values()] + CALENDAR_COLUMNS
+    conn.execute(f"""INSERT INTO {FACT_TABLE} ({', '.join(insert_cols)})
+                    SELECT {', '.join(select)}
+                    FROM "{source_table}" s
+                    {' '.join(joins)}""")
+
+
+def _create_view(conn, table_name, view_names):
+    """View with the original columns in their original order."""
+    dims = _present_dimensions(view_names)
+    owner = {col: f'd{i}' for i, (_, (_, cols)) in enumerate(dims.items()) for col in cols}
+    select = [f'{owner.get(name, "f")}."{name}"' for name in view_names]
+    joins = [f'LEFT JOIN "{dim_table}" d{i} ON d{i}.{key} = f.{key}'
+             for i, (dim_table, (key, _)) in enumerate(dims.items())]
+    conn.execute(f"""CREATE VIEW "{table_name}" AS
+                    SELECT {', '.join(select)}
+                    FROM {FACT_TABLE} f
+                    {' '.join(joins)}""")
+
+
+def drop_star_schema(conn, table_name='cleaned_sales_data'):
+    """Remove the star view, fact and dimension tables."""
+    conn.execute(f'DROP VIEW IF EXISTS "{table_name}"')
+    conn.execute(f'DROP TABLE IF EXISTS {FACT_TABLE}')
+    for dim_table in DIMENSIONS:
+        conn.execute(f'DROP TABLE IF EXISTS "{dim_table}"')
+
+
+def build_star_schema(conn, table_name='cleaned_sales_data', vacuum=True):
+    """
+    Replace the wide table with the star layout (fact + dimensions + view)
+
+    Args:
+        conn (sqlite3.Connection): Connection opened with isolation_level=None
+        table_name (str): Wide table to normalize (becomes a view)
+        vacuum (bool): VACUUM afterwards so the file actually shrinks
+
+    Returns:
+        int: Number of fact rows
+    """
+    source_columns = _table_columns(conn, table_name)
+    names = [name for name, _ in source_columns]
+    if 'order_date' not in names:
+        raise ValueError(f"Table '{table_name}' has no order_date column")
+
+    staging = f'{table_name}_wide'
+    conn.execute("BEGIN")
+    try:
+        conn.execute(f'DROP TABLE IF EXISTS {FACT_TABLE}')
+        for dim_table in DIMENSIONS:
+            conn.execute(f'DROP TABLE IF EXISTS "{dim_table}"')
+        conn.execute(f'ALTER TABLE "{table_name}" RENAME TO "{staging}"')
+        _create_tables(conn, source_columns)
+        _load_rows(conn, staging, names, names)
+        conn.execute(f'DROP TABLE "{staging}"')
+        _create_view(conn, table_name, names)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    if vacuum:
+        conn.execute("VACUUM")
+    return conn.execute(f'SELECT COUNT(*) FROM {FACT_TABLE}').fetchone()[0]
+
+
+def merge_into_star(conn, staging_table, table_name='cleaned_sales_data', key_column='order_id',
+                    before_merge=None, after_merge=None):
+    """
+    Merge rows from a wide staging table into an existing star layout
+    Rows whose key already exists in the fact table are replaced (upsert)
+
+    Args:
+        conn (sqlite3.Connection): Connection opened with isolation_level=None
+        staging_table (str): Wide table holding the new rows (dropped afterwards)
+        table_name (str): Star view name
+        key_column (str): Upsert key
+        before_merge, after_merge (callable): Called with conn inside the merge
+                                              transaction (e.g. rollup maintenance)
+
+    Returns:
+        int: Number of rows merged
+    """
+    staging_names = [name for name, _ in _table_columns(conn, staging_table)]
+    view_names = [name for name, _ in _table_columns(conn, table_name)]
+    missing = set(view_names) - set(staging_names)
+    if missing:
+        raise ValueError(f"Staging table is missing columns: {', '.join(sorted(missing))}")
+
+    conn.execute("BEGIN")
+    try:
+        if before_merge is not None:
+            before_merge(conn)
+        if key_column in staging_names:
+            conn.execute(f"""DELETE FROM {FACT_TABLE}
+                            WHERE "{key_column}" IN (SELECT "{key_column}" FROM "{staging_table}")""")
+        _load_rows(conn, staging_table, view_names, view_names)
+        if after_merge is not None:
+            after_merge(conn)
+        rows = conn.execute(f'SELECT COUNT(*) FROM "{staging_table}"').fetchone()[0]
+        conn.execute(f'DROP TABLE "{staging_table}"')
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return rows
+
+
+def star_schema_database(db_path='database/ecommerce.db', table_name='cleaned_sales_data'):
+    """
+    Convert an existing database to the star layout and report the size change
+
+    Args:
+        db_path (str): Path to database file
+        table_name (str): Wide table to normalize
+
+    Returns:
+        bool: True if successful
+    """
+    print("STAR SCHEMA BUILDER")
+
+    if not os.path.exists(db_path):
+        print(f" ERROR: Database not found: {db_path}")
+        return False
+
+    size_before = os.path.getsize(db_path)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        if is_star_view(conn, table_name):
+            print(f" '{table_name}' already uses the star layout")
+            return True
+        rows = build_star_schema(conn, table_name)
+        for dim_table in DIMENSIONS:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (dim_table,)
+            ).fetchone()
+            if exists:
+                count = conn.execute(f'SELECT COUNT(*) FROM "{dim_table}"').fetchone()[0]
+                print(f"   {dim_table}: {count:,} rows")
+    except Exception as e:
+        print(f"\n ERROR: {e}")
+        return False
+    finally:
+        conn.close()
+
+    size_after = os.path.getsize(db_path)
+    print(f"   {FACT_TABLE}: {rows:,} rows")
+    print(f"\n Size: {size_before / 1024 / 1024:.2f} MB -> {size_after / 1024 / 1024:.2f} MB")
+    return True
+
+
+if __name__ == "__main__":
+    import sys
+
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'database/ecommerce.db'
+    star_schema_database(db_path)
@@ -0,0 +1,369 @@
+"""
+Synthetic Sales Data
+Deterministic cleaned_sales_data rows at any size, for testing and benchmarking at scale
+
+Same columns and value formats as the cleaned dataset (ISO dates, aging in
+half days, 'Jan'.. months), with the skew of real sales:
+- products: the catalogue of the real data, popularity falling off like a
+  Zipf distribution (a few best sellers, a long tail)
+- customers: about one per CUSTOMER_ORDERS orders (at most MAX_CUSTOMERS),
+  Zipf popularity, each with a fixed segment and city
+- cities: fixed region / country / state, regions weighted like the real sales
+- dates: growing year over year with a November / December peak
+- a few percent loss-making orders and orders aged over 10 days (high risk)
+Rows are generated in blocks of BLOCK_ROWS, block b from the seed (seed, b),
+so the same seed and size always give the same rows, and a 100M row file is
+written block by block in bounded memory. Blocks are independent: with
+workers they are generated and rendered to CSV text in parallel processes
+(the bottleneck is formatting the text) and written in order.
+
+Usage:
+    python src/synthetic_data.py <rows> <output.csv> [--seed 0] [--workers 4]
+    python src/synthetic_data.py <rows> <output_folder> --files 8 [--seed 0] [--workers 4]
+    (rows: an integer or 100k / 1m / 10m / 100m)
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['order_id', 'order_date', 'ship_date', 'aging', 'ship_mode', 'product_category', 'product',
+           'sales', 'quantity', 'discount', 'profit', 'shipping_cost', 'order_priority', 'customer_id',
+           'customer_name', 'segment', 'city', 'state', 'country', 'region', 'months']
+
+SIZES = {'100k': 100_000, '1m': 1_000_000, '10m': 10_000_000, '100m': 100_000_000}
+
+# Rows per generated block (the unit of determinism and of memory use)
+BLOCK_ROWS = 100_000
+
+# Orders per customer, and the cap on customers (their attributes are kept in memory)
+CUSTOMER_ORDERS = 8
+MAX_CUSTOMERS = 2_000_000
+
+# Cities in the data
+N_CITIES = 3_600
+
+# Order dates: first and last year, yearly growth, monthly seasonality
+FIRST_YEAR, LAST_YEAR = 2014, 2016
+YEARLY_GROWTH = 0.15
+MONTH_WEIGHTS = [0.8, 0.7, 0.9, 0.9, 1.0, 1.0, 0.9, 0.9, 1.1, 1.1, 1.4, 1.6]
+
+# product -> (category, average price)
+PRODUCTS = {
+    'T - Shirts': ('Fashion', 120), 'Titak watch': ('Fashion', 210), 'Running Shoes': ('Fashion', 180),
+    'Jeans': ('Fashion', 150), 'Formal Shoes': ('Fashion', 190), 'Shirts': ('Fashion', 110),
+    'Fossil Watch': ('Fashion', 230), 'Casula Shoes': ('Fashion', 130), 'Suits': ('Fashion', 250),
+    'Sports Wear': ('Fashion', 90), 'Sneakers': ('Fashion', 140), 'Umbrellas': ('Fashion', 40),
+    'Watch': ('Fashion', 60),
+    'Towels': ('Home & Furniture', 50), 'Sofa Covers': ('Home & Furniture', 80),
+    'Bed Sheets': ('Home & Furniture', 70), 'Dinner Crockery': ('Home & Furniture', 90),
+    'Beds': ('Home & Furniture', 260), 'Shoe Rack': ('Home & Furniture', 100),
+    'Sofas': ('Home & Furniture', 280), 'Dinning Tables': ('Home & Furniture', 240),
+    'Curtains': ('Home & Furniture', 60), 'Iron': ('Home & Furniture', 45),
+    'Fans': ('Home & Furniture', 55), 'Mixer/Juicer': ('Home & Furniture', 75),
+    'Tyre': ('Auto & Accessories', 170), 'Car Pillow & Neck Rest': ('Auto & Accessories', 60),
+    'Car Speakers': ('Auto & Accessories', 120), 'Car Media Players': ('Auto & Accessories', 160),
+    'Bike Tyres': ('Auto & Accessories', 80), 'Car & Bike Care': ('Auto & Accessories', 40),
+    'Car Body Covers': ('Auto & Accessories', 70), 'Car Mat': ('Auto & Accessories', 50),
+    'Car Seat Covers': ('Auto & Accessories', 90),
+    'Apple Laptop': ('Electronic', 300), 'Samsung Mobile': ('Electronic', 220), 'Tablet': ('Electronic', 180),
+    'LED': ('Electronic', 150), 'Speakers': ('Electronic', 70), 'Keyboard': ('Electronic', 30),
+    'LCD': ('Electronic', 160), 'Mouse': ('Electronic', 25),
+}
+
+# region -> (share of the cities, countries)
+REGIONS = {
+    'Central': (0.22, ['Germany', 'France', 'Austria']), 'South': (0.13, ['Spain', 'Italy', 'Portugal']),
+    'EMEA': (0.10, ['Turkey', 'Egypt', 'Israel']), 'North': (0.09, ['United Kingdom', 'Sweden', 'Denmark']),
+    'Africa': (0.09, ['Nigeria', 'Morocco', 'South Africa']), 'Oceania': (0.07, ['Australia', 'New Zealand']),
+    'Southeast Asia': (0.06, ['Indonesia', 'Philippines', 'Vietnam']), 'West': (0.06, ['United States']),
+    'East': (0.05, ['United States']), 'North Asia': (0.05, ['China', 'Japan', 'South Korea']),
+    'Central Asia': (0.04, ['India', 'Pakistan']), 'Caribbean': (0.03, ['Mexico', 'Cuba', 'Jamaica']),
+    'Canada': (0.01, ['Canada']),
+}
+
+SEGMENTS = (['Consumer', 'Corporate', 'Home Office'], [0.52, 0.30, 0.18])
+SHIP_MODES = (['Standard Class', 'Second Class', 'First Class', 'Same Day'], [0.60, 0.20, 0.15, 0.05])
+PRIORITIES = (['Medium', 'High', 'Critical', 'Low'], [0.57, 0.30, 0.08, 0.05])
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+FIRST_NAMES = ['Weber', 'Leon', 'Booth', 'Ellis', 'Bates', 'Bell', 'Spears', 'Graves', 'Flores', 'Diaz',
+               'Mcclain', 'Hart', 'Rivera', 'Cole', 'Nash', 'Reyes', 'Ward', 'Lane', 'Kerr', 'Moss',
+               'Pace', 'Shaw', 'Rowe', 'Frost', 'Banks', 'Hale', 'Knox', 'Wolfe', 'Page', 'Stone']
+LAST_NAMES = ['Halladay', 'Sissman', 'Pistole', 'Carmichael', 'Gockenbach', 'Bickford', 'Thornton', 'Garza',
+              'Brooks', 'Buhler', 'ODonnell', 'Fischer', 'Moreau', 'Rossi', 'Novak', 'Silva', 'Kowalski',
+              'Jensen', 'Tanaka', 'Okafor', 'Haddad', 'Larsen', 'Costa', 'Ivanova', 'Nguyen', 'Patel',
+              'Santos', 'Meyer', 'Dubois', 'Hughes']
+
+# seed stream of the customer / city tables (blocks use their index)
+_TABLE_STREAM = 2 ** 31
+
+
+def parse_rows(rows) -> int:
+    """Row count from an integer or a size name (100k / 1m / 10m / 100m)."""
+    if isinstance(rows, str):
+        name = rows.strip().lower()
+        if name in SIZES:
+            return SIZES[name]
+        for suffix, factor in (('k', 1_000), ('m', 1_000_000)):
+            if name.endswith(suffix):
+                return int(float(name[:-1]) * factor)
+        return int(name)
+    return int(rows)
+
+
+def _zipf_cdf(n, exponent, offset=1.0):
+    """Cumulative popularity of n ranked items, weight 1 / (rank + offset) ** exponent."""
+    weights = 1.0 / (np.arange(n) + offset) ** exponent
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+
+def _draw(rng, cdf, n):
+    """n indices drawn from a cumulative distribution (searchsorted, no per-draw setup)."""
+    return np.minimum(np.searchsorted(cdf, rng.random(n), side='right'), len(cdf) - 1)
+
+
+class SalesGenerator:
+    """
+    Synthetic rows of the cleaned_sales_data schema
+
+    Args:
+        rows (int): Total rows (orders)
+        seed (int): Random seed; same seed and rows, same data
+        first_year, last_year (int): Range of the order dates
+    """
+
+    def __init__(self, rows, seed=0, first_year=FIRST_YEAR, last_year=LAST_YEAR):
+        self.rows = parse_rows(rows)
+        self.seed = seed
+        rng = np.random.default_rng([seed, _TABLE_STREAM])
+
+        # products: random popularity ranks over the catalogue
+        names = list(PRODUCTS)
+        self.products = pd.Index(names)
+        self.product_categories = np.array([PRODUCTS[p][0] for p in names], dtype=object)
+        self.product_prices = np.array([PRODUCTS[p][1] for p in names], dtype=np.float64)
+        self.product_margins = rng.uniform(0.15, 0.6, len(names))
+        self.product_order = rng.permutation(len(names))
+        self.product_cdf = _zipf_cdf(len(names), 1.0, offset=4.0)
+
+        # cities: region by share, then a country of the region and a state of the country
+        regions = list(REGIONS)
+        shares = np.array([REGIONS[r][0] for r in regions])
+        city_regions = _draw(rng, np.cumsum(shares / shares.sum()), N_CITIES)
+        city_countries, city_states = [], []
+        for i, region in enumerate(city_regions):
+            countries = REGIONS[regions[region]][1]
+            country = countries[rng.integers(len(countries))]
+            city_countries.append(country)
+            city_states.append(f"{country} State {rng.integers(1, 21)}")
+        self.city_names = np.array([f"City {i:04d}" for i in range(N_CITIES)], dtype=object)
+        self.city_regions = np.array(regions, dtype=object)[city_regions]
+        self.city_countries = np.array(city_countries, dtype=object)
+        self.city_states = np.array(city_states, dtype=object)
+        self.city_cdf = _zipf_cdf(N_CITIES, 0.7, offset=5.0)
+
+        # customers: codes only (names and ids are built from the index per block)
+        self.n_customers = int(min(max(self.rows // CUSTOMER_ORDERS, 100), MAX_CUSTOMERS))
+        self.customer_segments = _draw(rng, np.cumsum(SEGMENTS[1]), self.n_customers).astype(np.int8)
+        self.customer_cities = _draw(rng, self.city_cdf, self.n_customers).astype(np.int32)
+        self.customer_order = rng.permutation(self.n_customers)
+        self.customer_cdf = _zipf_cdf(self.n_customers, 0.8, offset=10.0)
+
+        # order months: yearly growth x seasonality
+        self.first_year = first_year
+        years = np.arange(first_year, last_year + 1)
+        weights = np.outer((1 + YEARLY_GROWTH) ** (years - first_year), MONTH_WEIGHTS).ravel()
+        self.month_cdf = np.cumsum(weights) / weights.sum()
+
+    @property
+    def n_blocks(self):
+        return -(-self.rows // BLOCK_ROWS)
+
+    def block(self, b) -> pd.DataFrame:
+        """Rows [b * BLOCK_ROWS, (b + 1) * BLOCK_ROWS) of the data."""
+        start = b * BLOCK_ROWS
+        n = min(BLOCK_ROWS, self.rows - start)
+        rng = np.random.default_rng([self.seed, b])
+
+        months = _draw(rng, self.month_cdf, n)
+        month_start = (np.datetime64(f'{self.first_year}-01', 'M') + months).astype('datetime64[D]')
+        days_in_month = ((month_start.astype('datetime64[M]') + 1).astype('datetime64[D]') - month_start).astype(int)
+        order_date = month_start + (rng.random(n) * days_in_month).astype(int)
+
+        ship_mode = _draw(rng, np.cumsum(SHIP_MODES[1]), n)
+        # half days; Same Day ships in one, 2% of the other orders take over 10 days
+        aging = np.where(ship_mode == 3, 1.0, rng.integers(2, 21, n) / 2)
+        aging = np.where((ship_mode != 3) & (rng.random(n) < 0.02), 10.5, aging)
+        ship_date = order_date + np.ceil(aging).astype(int)
+
+        product = self.product_order[_draw(rng, self.product_cdf, n)]
+        quantity = rng.integers(1, 6, n)
+        price = self.product_prices[product] * rng.lognormal(0, 0.25, n)
+        sales = np.maximum(np.round(price * quantity / 2), 1).astype(np.int64)
+        discount = np.round(rng.choice([0.0, 0.1, 0.2, 0.3, 0.4, 0.5], n, p=[0.3, 0.25, 0.2, 0.12, 0.08, 0.05])
+                            + rng.integers(0, 10, n) / 100, 2)
+        margin = self.product_margins[product] - discount * 0.3
+        margin = np.where(rng.random(n) < 0.03, -rng.uniform(0.05, 0.4, n), margin)  # loss-making orders
+        profit = np.round(sales * margin, 1)
+        shipping_cost = np.round(sales * rng.uniform(0.02, 0.12, n), 1)
+
+        customer = self.customer_order[_draw(rng, self.customer_cdf, n)]
+        city = self.customer_cities[customer]
+        first = np.array(FIRST_NAMES, dtype=object)[customer % len(FIRST_NAMES)]
+        last = np.array(LAST_NAMES, dtype=object)[(customer // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        rounds = customer // (len(FIRST_NAMES) * len(LAST_NAMES))
+        # every customer a distinct name: the name pairs repeat with a number after the first round
+        customer_name = pd.Series(first + ' ' + last) + np.where(rounds > 0, ' ' + (rounds + 1).astype(str), '')
+        country = self.city_countries[city]
+
+        frame = pd.DataFrame({
+            'order_id': pd.Series(country).str[:2].str.upper() + '-' + (order_date.astype('datetime64[Y]').astype(int)
+                                                                       + 1970).astype(str)
+                        + '-' + pd.Series(np.arange(start, start + n)).astype(str).str.zfill(9),
+            'order_date': np.datetime_as_string(order_date),
+            'ship_date': np.datetime_as_string(ship_date),
+            'aging': aging,
+            'ship_mode': pd.Categorical.from_codes(ship_mode, SHIP_MODES[0]),
+            'product_category': self.product_categories[product],
+            'product': self.products.take(product),
+            'sales': sales,
+            'quantity': quantity,
+            'discount': discount,
+            'profit': profit,
+            'shipping_cost': shipping_cost,
+            'order_priority': pd.Categorical.from_codes(_draw(rng, np.cumsum(PRIORITIES[1]), n), PRIORITIES[0]),
+            'customer_id': pd.Series(last).str[:2].str.upper() + '-' + pd.Series(customer).astype(str).str.zfill(7),
+            'customer_name': customer_name,
+            'segment': pd.Categorical.from_codes(self.customer_segments[customer], SEGMENTS[0]),
+            'city': self.city_names[city],
+            'state': self.city_states[city],
+            'country': country,
+            'region': self.city_regions[city],
+            'months': np.array(MONTH_NAMES, dtype=object)[months % 12],
+        })
+        return frame[COLUMNS]
+
+    def blocks(self, first=0, last=None):
+        """Yield blocks first .. last - 1 (every block by default)."""
+        for b in range(first, self.n_blocks if last is None else last):
+            yield self.block(b)
+
+    def frame(self) -> pd.DataFrame:
+        """All rows in one DataFrame (for sizes that fit in memory)."""
+        return pd.concat(list(self.blocks()), ignore_index=True)
+
+
+# generator of the worker processes (set once per process, not sent with every block)
+_worker_generator = None
+
+
+def _init_worker(generator):
+    global _worker_generator
+    _worker_generator = generator
+
+
+def _render_block(b):
+    return _worker_generator.block(b).to_csv(index=False, header=False)
+
+
+def _csv_blocks(generator, first, last, workers=None):
+    """CSV text of blocks first .. last - 1 in order, rendered by `workers` processes if given."""
+    if not workers or workers < 2:
+        for block in generator.blocks(first, last):
+            yield block.to_csv(index=False, header=False)
+        return
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(generator,)) as pool:
+        # map keeps the order; at most a few blocks per worker are pending
+        yield from pool.map(_render_block, range(first, last), chunksize=1)
+
+
+def _write_blocks(path, generator, first, last, workers=None):
+    with open(path, 'w', newline='') as f:
+        f.write(','.join(COLUMNS) + '\n')
+        for text in _csv_blocks(generator, first, last, workers):
+            f.write(text)
+
+
+def write_csv(path, rows, seed=0, workers=None, **kwargs):
+    """
+    Write `rows` synthetic rows to one CSV, block by block
+
+    Args:
+        path (str): Output CSV
+        rows (int | str): Row count or size name
+        seed (int): Random seed
+        workers (int): Processes generating blocks in parallel
+
+    Returns:
+        str: path
+    """
+    generator = SalesGenerator(rows, seed, **kwargs)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    _write_blocks(path, generator, 0, generator.n_blocks, workers)
+    return path
+
+
+def write_csv_files(folder, rows, files, seed=0, workers=None, **kwargs):
+    """
+    Write the same rows as write_csv split over `files` CSVs (whole blocks per
+    file), e.g. for multiple_csvs_to_database
+
+    Returns:
+        list: paths
+    """
+    generator = SalesGenerator(rows, seed, **kwargs)
+    os.makedirs(folder, exist_ok=True)
+    bounds = np.linspace(0, generator.n_blocks, max(1, min(files, generator.n_blocks)) + 1).astype(int)
+    paths = []
+    for i, (first, last) in enumerate(zip(bounds[:-1], bounds[1:])):
+        path = os.path.join(folder, f"sales_part_{i:03d}.csv")
+        _write_blocks(path, generator, first, last, workers)
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("SYNTHETIC SALES DATA - USAGE")
+        print("   python src/synthetic_data.py <rows> <output.csv> [--seed 0] [--workers 4]")
+        print("   python src/synthetic_data.py <rows> <output_folder> --files 8 [--seed 0] [--workers 4]")
+        print(f"   rows: an integer or {' / '.join(SIZES)}")
+        sys.exit(1)
+
+    args = sys.argv[1:]
+    seed = 0
+    if "--seed" in args:
+        i = args.index("--seed")
+        seed = int(args[i + 1])
+        del args[i:i + 2]
+    files = None
+    if "--files" in args:
+        i = args.index("--files")
+        files = int(args[i + 1])
+        del args[i:i + 2]
+    workers = None
+    if "--workers" in args:
+        i = args.index("--workers")
+        workers = int(args[i + 1])
+        del args[i:i + 2]
+    rows, output = parse_rows(args[0]), args[1]
+
+    print("SYNTHETIC SALES DATA")
+    start = time.perf_counter()
+    if files:
+        paths = write_csv_files(output, rows, files, seed, workers)
+        print(f"\n {rows:,} rows in {len(paths)} file(s): {output}")
+    else:
+        write_csv(output, rows, seed, workers)
+        print(f"\n {rows:,} rows: {output} ({os.path.getsize(output) / 1024 / 1024:.1f} MB)")
+    elapsed = time.perf_counter() - start
+    print(f" Time: {elapsed:.2f} s ({rows / max(elapsed, 1e-9):,.0f} rows/sec)")
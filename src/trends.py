@@ -0,0 +1,163 @@
+"""
+Product Trends
+Trend metrics and rising / falling rankings of every product
+
+Input is the product x month sales matrix (SalesAnalytics.Product_matrix:
+a float32 DataFrame, products as index, 'YYYY-MM' months as columns,
+0 where a product sold nothing). It holds 4 bytes per cell instead of a
+long (product, month, monthly_sales) row per cell with two strings, and
+every metric is computed for all products at once:
+- slope: least squares sales trend per month (one matrix-vector product)
+- trend_pct: the slope as % of the product's average monthly sales
+- growth_pct: sales of the last TREND_WINDOW months vs the months before
+- volatility: coefficient of variation of the monthly sales (%)
+top_k() ranks with argpartition, so "top 10 rising of 50k products" does
+not sort all of them.
+
+Usage:
+    python src/trends.py [products] [months]
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    from src.forecasting import series_matrix, synthetic_sales
+except ImportError:  # run as a script: python src/trends.py
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    from src.forecasting import series_matrix, synthetic_sales
+
+# Months compared by growth_pct (last TREND_WINDOW vs the TREND_WINDOW before)
+TREND_WINDOW = 3
+
+TREND_METRICS = ['slope', 'trend_pct', 'growth_pct', 'volatility']
+
+TREND_COLUMNS = ['product', 'total_sales', 'active_months', *TREND_METRICS]
+
+
+def sales_matrix(frame: pd.DataFrame, series='product', month='month', value='monthly_sales') -> pd.DataFrame:
+    """
+    Wide float32 series x month matrix of a long (series, month, value) frame
+
+    Returns:
+        pd.DataFrame: series labels as index, every month from the first to
+                      the last as columns, 0 for months without a row
+    """
+    labels, months, matrix = series_matrix(frame, series, month, value)
+    return pd.DataFrame(matrix.astype(np.float32), index=labels.rename(series), columns=list(months))
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """numerator / denominator * 100, NaN where the denominator is not positive."""
+    out = np.full(numerator.shape, np.nan)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out * 100
+
+
+def trend_metrics(matrix: np.ndarray, window: int = TREND_WINDOW):
+    """
+    Trend metrics of every row of a series x month matrix
+
+    Args:
+        matrix (np.ndarray): Monthly sales, one row per series
+        window (int): Months compared by growth_pct
+
+    Returns:
+        dict: total_sales, active_months and TREND_METRICS, one array each
+    """
+    values = np.asarray(matrix, dtype=np.float64)  # float32 storage, float64 sums
+    n_series, n_months = values.shape
+    total = values.sum(axis=1)
+    mean = total / n_months if n_months else np.zeros(n_series)
+
+    # least squares slope against centred month numbers: sum(t * y) / sum(t^2)
+    t = np.arange(n_months) - (n_months - 1) / 2
+    denominator = (t ** 2).sum()
+    slope = values @ t / denominator if denominator else np.zeros(n_series)
+
+    if n_months >= 2 * window:
+        recent = values[:, n_months - window:].sum(axis=1)
+        prior = values[:, n_months - 2 * window:n_months - window].sum(axis=1)
+        growth = _ratio(recent - prior, prior)
+    else:
+        growth = np.full(n_series, np.nan)
+
+    return {
+        'total_sales': total,
+        'active_months': (values > 0).sum(axis=1),
+        'slope': slope,
+        'trend_pct': _ratio(slope, mean),
+        'growth_pct': growth,
+        'volatility': _ratio(values.std(axis=1) if n_months else np.zeros(n_series), mean),
+    }
+
+
+def trend_frame(matrix: pd.DataFrame, window: int = TREND_WINDOW) -> pd.DataFrame:
+    """TREND_COLUMNS, one row per product of a sales_matrix() frame."""
+    metrics = trend_metrics(matrix.to_numpy(), window)
+    trends = pd.DataFrame({'product': matrix.index.to_numpy(), **metrics})
+    return trends[TREND_COLUMNS]
+
+
+def top_k(values: np.ndarray, k: int, largest: bool = True) -> np.ndarray:
+    """
+    Positions of the k largest (or smallest) values, best first
+
+    Only values above 0 (largest) or below 0 (smallest) qualify: a rising
+    product has a positive trend, a falling one a negative trend. Ties keep
+    the original order.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    signed = values if largest else -values
+    candidates = np.flatnonzero(signed > 0)  # NaN never qualifies
+    k = min(int(k), len(candidates))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    scores = signed[candidates]
+    chosen = np.argpartition(-scores, k - 1)[:k]
+    order = np.lexsort((candidates[chosen], -scores[chosen]))
+    return candidates[chosen][order]
+
+
+# ========================
+# Benchmark
+# ========================
+def benchmark(n_products=50_000, n_months=36, k=10):
+    """Memory of the long table vs the matrix, and the time of the metrics and rankings."""
+    print("PRODUCT TRENDS BENCHMARK")
+    long = synthetic_sales(n_products, n_months)
+    start = time.perf_counter()
+    matrix = sales_matrix(long)
+    built = time.perf_counter() - start
+    long_bytes = long.memory_usage(index=True, deep=True).sum()
+    matrix_bytes = matrix.memory_usage(index=True, deep=True).sum()
+    print(f"\n {n_products:,} products x {n_months} months")
+    print(f"   long table : {len(long):>10,} rows    {long_bytes / 2**20:8.1f} MiB")
+    print(f"   matrix     : {matrix.size:>10,} cells   {matrix_bytes / 2**20:8.1f} MiB "
+          f"({long_bytes / max(matrix_bytes, 1):.1f}x smaller, built in {built:.3f}s)")
+
+    start = time.perf_counter()
+    trends = trend_frame(matrix)
+    rising = trends.iloc[top_k(trends['slope'].to_numpy(), k)]
+    falling = trends.iloc[top_k(trends['slope'].to_numpy(), k, largest=False)]
+    print(f"   metrics + top {k} rising / falling: {time.perf_counter() - start:.3f}s")
+    trend_bytes = trends.memory_usage(index=True, deep=True).sum()
+    print(f"   trend table: {len(trends):>10,} rows    {trend_bytes / 2**20:8.1f} MiB "
+          f"({long_bytes / max(trend_bytes, 1):.1f}x smaller than the long table)")
+    print(f"\n Top {k} rising:")
+    print(rising.head(5).round(2).to_string(index=False))
+    print(f"\n Top {k} falling:")
+    print(falling.head(5).round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    n_products = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    n_months = int(sys.argv[2]) if len(sys.argv) > 2 else 36
+    benchmark(n_products, n_months)
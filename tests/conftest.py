@@ -0,0 +1,44 @@
+"""
+Shared fixtures: one small synthetic sales CSV loaded into every storage
+layout (flat with a Parquet snapshot, rollup, star schema, year partitions)
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.csv_to_database import csv_to_database
+from src.synthetic_data import write_csv
+
+# Rows of the synthetic data set (a few seconds per layout)
+ROWS = 20_000
+
+# layout -> csv_to_database options
+LAYOUTS = {
+    'flat': {'parquet': True},
+    'rollup': {'rollup': True},
+    'star': {'star_schema': True},
+    'partitioned': {'partition': 'year'},
+}
+
+
+@pytest.fixture(scope='session')
+def sales_csv(tmp_path_factory):
+    return write_csv(str(tmp_path_factory.mktemp('csv') / 'sales.csv'), ROWS, seed=0, workers=1)
+
+
+@pytest.fixture(scope='session')
+def databases(sales_csv, tmp_path_factory):
+    """layout -> path of a database holding the synthetic rows as cleaned_sales_data"""
+    paths = {}
+    for layout, options in LAYOUTS.items():
+        db_path = str(tmp_path_factory.mktemp(layout) / 'ecommerce.db')
+        assert csv_to_database(sales_csv, 'cleaned_sales_data', db_path, **options)
+        paths[layout] = db_path
+    return paths
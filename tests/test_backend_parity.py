@@ -0,0 +1,66 @@
+"""
+Every SalesAnalytics method returns identical DataFrames (values and
+dtypes) on the DuckDB backend and on every SQLite storage layout
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import os
+
+import pytest
+
+from src.analytics import SalesAnalytics
+from src.backend_parity import compare_backends, frame_mismatch
+
+
+@pytest.fixture(scope='module')
+def flat(databases):
+    analytics = SalesAnalytics(databases['flat'], use_cache=False, use_rollup=False)
+    yield analytics
+    analytics.close()
+
+
+def test_duckdb_matches_sqlite(databases, flat):
+    pytest.importorskip('duckdb')
+    parquet_path = os.path.join(os.path.dirname(databases['flat']), 'cleaned_sales_data.parquet')
+    duckdb_backend = SalesAnalytics(databases['flat'], backend='duckdb', parquet_relative_path=parquet_path,
+                                    use_cache=False)
+    try:
+        assert compare_backends(flat, duckdb_backend) == []
+    finally:
+        duckdb_backend.close()
+
+
+@pytest.mark.parametrize('layout', ['rollup', 'star', 'partitioned'])
+def test_layout_matches_flat(databases, flat, layout):
+    analytics = SalesAnalytics(databases[layout], use_cache=False)
+    assert analytics.layout == ('flat' if layout == 'rollup' else layout)
+    assert analytics.rollup == (layout == 'rollup')
+    assert compare_backends(flat, analytics) == []
+
+
+# summary methods with a start_date / end_date range, and the others the rollup answers
+DATED_SUMMARIES = ('Monthly_Sales', 'Yearly_Sales', 'Seasonal_demands', 'Product_performance')
+SUMMARIES = DATED_SUMMARIES + ('Count_Total_Orders', 'Sales_generated_Profit', 'Categorical_Sales',
+                               'Regional_Sales', 'Customer_Segments_Profit', 'Optimized_shipping')
+
+
+def test_rollup_with_date_range_matches_flat(databases, flat):
+    # _summary reads the raw rows for any date range: this checks the fallback, not the rollup
+    rollup = SalesAnalytics(databases['rollup'], use_cache=False)
+    dates = {'start_date': '2014-03-15', 'end_date': '2015-06-30'}
+    assert not rollup._summary(**dates)[0]
+    for name in DATED_SUMMARIES:
+        assert frame_mismatch(getattr(flat, name)(**dates), getattr(rollup, name)(**dates)) is None, name
+
+
+def test_filtered_rollup_matches_flat(databases, flat):
+    # region / segment / category / ship_mode are rollup columns: filtered summaries read the rollup
+    rollup = SalesAnalytics(databases['rollup'], use_cache=False)
+    options = rollup.filter_options()
+    filters = {'region': options['region'][0], 'segment': options['segment'][:2]}
+    assert rollup.filter(**filters)._summary()[0]
+    for name in SUMMARIES:
+        expected = getattr(flat.filter(**filters), name)()
+        assert frame_mismatch(expected, getattr(rollup.filter(**filters), name)()) is None, name
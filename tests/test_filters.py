@@ -0,0 +1,41 @@
+"""
+A per-call date range narrows the instance filter, never widens it
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import pandas as pd
+import pytest
+
+from src.analytics import SalesAnalytics
+
+
+@pytest.fixture(scope='module', params=['flat', 'rollup', 'partitioned'])
+def analytics(request, databases):
+    analytics = SalesAnalytics(databases[request.param], use_cache=False)
+    yield analytics
+    analytics.close()
+
+
+@pytest.mark.parametrize('name', ['Monthly_Sales', 'Yearly_Sales', 'Product_performance'])
+def test_call_range_intersects_filter(analytics, name):
+    filtered = analytics.filter(start_date='2015-01-01', end_date='2015-12-31')
+    cases = [({'start_date': '2014-01-01'}, {'start_date': '2015-01-01', 'end_date': '2015-12-31'}),
+             ({'end_date': '2016-06-30'}, {'start_date': '2015-01-01', 'end_date': '2015-12-31'}),
+             ({'start_date': '2015-04-01', 'end_date': '2016-06-30'}, {'start_date': '2015-04-01',
+                                                                       'end_date': '2015-12-31'})]
+    for call, intersection in cases:
+        expected = getattr(analytics, name)(**intersection)
+        pd.testing.assert_frame_equal(getattr(filtered, name)(**call), expected)
+
+
+def test_chained_filters_intersect(analytics):
+    chained = analytics.filter(start_date='2015-01-01').filter(start_date='2014-01-01', end_date='2015-06-30')
+    expected = analytics.filter(start_date='2015-01-01', end_date='2015-06-30')
+    pd.testing.assert_frame_equal(chained.Monthly_Sales(), expected.Monthly_Sales())
+
+
+def test_disjoint_range_matches_nothing(analytics):
+    result = analytics.filter(start_date='2015-01-01').Monthly_Sales(end_date='2014-06-30')
+    assert result.empty
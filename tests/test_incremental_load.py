@@ -0,0 +1,94 @@
+"""
+Incremental loads upsert overlapping files on order_id, keep the rollup
+in step, and skip files already loaded without touching the data version
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.csv_to_database import csv_to_database, get_load_watermark, incremental_load
+from src.result_cache import read_data_version
+from src.rollup import check_rollup
+
+TABLE = 'cleaned_sales_data'
+
+# storage options of the first load; later loads keep the layout
+LAYOUTS = {
+    'flat': {'rollup': True},
+    'star': {'rollup': True, 'star_schema': True},
+    'partitioned': {'rollup': True, 'partition': 'year'},
+}
+
+
+@pytest.fixture(scope='module')
+def parts(sales_csv, tmp_path_factory):
+    """Two CSVs sharing 500 order ids, whose sales differ in the second file."""
+    folder = tmp_path_factory.mktemp('parts')
+    rows = pd.read_csv(sales_csv, nrows=3000)
+    first, second = rows.iloc[:2000], rows.iloc[1500:].copy()
+    second.loc[second.index < 2000, 'sales'] += 1
+    first.to_csv(folder / 'first.csv', index=False)
+    second.to_csv(folder / 'second.csv', index=False)
+    expected = pd.concat([first.iloc[:1500], second])
+    return str(folder / 'first.csv'), str(folder / 'second.csv'), expected
+
+
+def _state(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        rows, orders, sales = conn.execute(
+            f"SELECT COUNT(*), COUNT(DISTINCT order_id), SUM(sales) FROM {TABLE}").fetchone()
+        return {'rows': rows, 'orders': orders, 'sales': sales, 'version': read_data_version(conn),
+                'watermark': get_load_watermark(conn, TABLE), 'rollup_mismatches': len(check_rollup(conn, TABLE))}
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize('layout', list(LAYOUTS))
+def test_overlapping_loads_upsert(parts, tmp_path, layout):
+    first, second, expected = parts
+    db_path = str(tmp_path / 'ecommerce.db')
+    assert csv_to_database(first, TABLE, db_path, incremental=True, **LAYOUTS[layout])
+    assert csv_to_database(second, TABLE, db_path, incremental=True)
+
+    state = _state(db_path)
+    assert state['rows'] == state['orders'] == len(expected)
+    assert state['sales'] == expected['sales'].sum()
+    assert state['rollup_mismatches'] == 0
+    assert state['version'] == 2
+    assert state['watermark']['files'] == 2
+    assert state['watermark']['max_order_date'] == expected['order_date'].max()
+
+
+def test_reload_is_skipped(parts, tmp_path):
+    first, second, _ = parts
+    db_path = str(tmp_path / 'ecommerce.db')
+    assert csv_to_database(first, TABLE, db_path, incremental=True, rollup=True)
+    before = _state(db_path)
+    # same content under another name is skipped too (content hash)
+    copy = tmp_path / 'first_copy.csv'
+    copy.write_bytes(open(first, 'rb').read())
+    for path in (first, str(copy)):
+        assert csv_to_database(path, TABLE, db_path, incremental=True)
+    assert _state(db_path) == before
+
+
+def test_duplicate_keys_cannot_be_upserted(parts, tmp_path):
+    first, second, _ = parts
+    db_path = str(tmp_path / 'ecommerce.db')
+    doubled = tmp_path / 'doubled.csv'
+    pd.concat([pd.read_csv(first)] * 2).to_csv(doubled, index=False)
+    assert csv_to_database(str(doubled), TABLE, db_path)
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        with pytest.raises(ValueError, match="cannot be upserted on 'order_id'"):
+            incremental_load(second, TABLE, conn)
+        assert conn.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0] == 4000
+    finally:
+        conn.close()
@@ -0,0 +1,74 @@
+"""
+Keyset pages of the high risk orders cover exactly the rows of the whole
+sorted query, including sort columns holding NULLs
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import os
+import shutil
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.analytics import SalesAnalytics
+from src.csv_to_database import export_parquet_snapshot
+
+
+@pytest.fixture(scope='module')
+def null_db(databases, tmp_path_factory):
+    """Flat database with NULL city / sales on every 7th / 11th row."""
+    db_path = str(tmp_path_factory.mktemp('nulls') / 'ecommerce.db')
+    shutil.copy(databases['flat'], db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE cleaned_sales_data SET city = NULL WHERE rowid % 7 = 0")
+    conn.execute("UPDATE cleaned_sales_data SET sales = NULL WHERE rowid % 11 = 0")
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+@pytest.fixture(scope='module', params=['sqlite', 'duckdb'])
+def analytics(request, null_db):
+    options = {}
+    if request.param == 'duckdb':
+        pytest.importorskip('duckdb')
+        parquet_path = os.path.join(os.path.dirname(null_db), 'cleaned_sales_data.parquet')
+        if not os.path.exists(parquet_path):
+            export_parquet_snapshot(null_db, parquet_path=parquet_path)
+        options = {'backend': 'duckdb', 'parquet_relative_path': parquet_path}
+    analytics = SalesAnalytics(null_db, use_cache=False, **options)
+    yield analytics
+    analytics.close()
+
+
+@pytest.mark.parametrize('sort', [None, 'city', 'sales', 'order_id'])
+@pytest.mark.parametrize('ascending', [True, False])
+@pytest.mark.parametrize('kind', ['L_Profit', 'H_Aging'])
+def test_pages_match_whole_query(analytics, kind, sort, ascending):
+    query = analytics._high_risk_query(kind, sort=sort, ascending=ascending)
+    expected = analytics._read(*query.to_sql())
+    if sort is not None:
+        assert expected[sort].isna().any() or sort == 'order_id'
+    pages = list(analytics.High_risk_orders_pages(kind, page_size=97, sort=sort, ascending=ascending))
+    assert all(len(page) == 97 for page in pages[:-1])
+    result = pd.concat(pages, ignore_index=True)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_null_rows_first_ascending_last_descending(analytics):
+    ascending = pd.concat(analytics.High_risk_orders_pages('L_Profit', page_size=500, sort='city'))
+    descending = pd.concat(analytics.High_risk_orders_pages('L_Profit', page_size=500, sort='city',
+                                                            ascending=False))
+    nulls = int(ascending['city'].isna().sum())
+    assert nulls and ascending['city'].iloc[:nulls].isna().all()
+    assert descending['city'].iloc[-nulls:].isna().all()
+    assert sorted(ascending['order_id']) == sorted(descending['order_id'])
+
+
+def test_search_pages_match_count(analytics):
+    pages = pd.concat(analytics.High_risk_orders_pages('L_Profit', page_size=50, sort='city', search='city 1'))
+    count, exact = analytics.High_risk_orders_count('L_Profit', search='city 1')
+    assert exact and len(pages) == count > 0
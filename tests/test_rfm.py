@@ -0,0 +1,48 @@
+"""
+Results derived from RFM_scores keep the values and dtypes of the
+per-measure GROUP BY queries they replace
+
+Author: Vishank
+Created: 17 October 2026
+"""
+
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.analytics import SalesAnalytics
+
+
+@pytest.fixture(scope='module')
+def analytics(databases):
+    analytics = SalesAnalytics(databases['flat'], use_cache=False)
+    yield analytics
+    analytics.close()
+
+
+def _query(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    try:
+        return pd.read_sql_query(sql, conn).sort_values('customer_id', ignore_index=True)
+    finally:
+        conn.close()
+
+
+def test_loyal_customers_match_group_by(databases, analytics):
+    expected = _query(databases['flat'], """SELECT customer_id, SUM(sales) AS total_sales,
+                                                   COUNT(order_id) AS total_orders
+                                            FROM cleaned_sales_data
+                                            GROUP BY customer_id
+                                            HAVING total_sales > 5000 OR total_orders > 15""")
+    loyal = analytics.Loyal_customers()[['customer_id', 'total_sales', 'total_orders']]
+    pd.testing.assert_frame_equal(loyal.sort_values('customer_id', ignore_index=True), expected)
+
+
+def test_frequency_signal_matches_group_by(databases, analytics):
+    expected = _query(databases['flat'], """SELECT customer_id, COUNT(order_id) AS total_orders
+                                            FROM cleaned_sales_data
+                                            GROUP BY customer_id""")
+    frequency = analytics.RFM_signals()['Frequency']
+    pd.testing.assert_frame_equal(frequency.sort_values('customer_id', ignore_index=True), expected)
+    assert analytics.RFM_scores()['recency_days'].dtype == 'int64'